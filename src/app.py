@@ -1,6 +1,7 @@
 from dash_extensions.enrich import DashProxy, MultiplexerTransform
 from components.layout import create_layout
 from callbacks import register_callbacks
+from server.metrics import install as install_metrics
 
 app = DashProxy(
     __name__,
@@ -10,6 +11,7 @@ app = DashProxy(
 app.layout = create_layout()
 
 register_callbacks(app)
+install_metrics(app.server)
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,80 @@
+/*
+ * Canvas board painter, used when RENDER_MODE = "canvas".
+ *
+ * paint() draws a compact frame from components/board.py:encode_canvas_frame
+ * onto the #board-canvas element. With GAME_LOOP = "clientside" the frame is
+ * built right here from the game state (paintState), so rendering never
+ * leaves the browser.
+ */
+(function () {
+    "use strict";
+
+    function draw(frame, palette) {
+        const canvas = document.getElementById("board-canvas");
+        if (!canvas) {
+            return;
+        }
+        const ctx = canvas.getContext("2d");
+        const size = palette.cell;
+
+        const fill = (index, color) => {
+            const x = (index % palette.width) * size;
+            const y = Math.floor(index / palette.width) * size;
+            ctx.fillStyle = color;
+            ctx.fillRect(x, y, size, size);
+            ctx.strokeStyle = palette.grid;
+            ctx.strokeRect(x + 0.5, y + 0.5, size - 1, size - 1);
+        };
+
+        const cells = frame ? frame.cells : "";
+        const total = palette.width * palette.height;
+        for (let i = 0; i < total; i++) {
+            fill(i, palette.colors[cells[i] || "0"]);
+        }
+        if (!frame) {
+            return;
+        }
+        for (const index of frame.ghost) {
+            if (cells[index] === "0") {
+                fill(index, palette.ghost);
+            }
+        }
+        const pieceColor = palette.colors[String(frame.piece[0])];
+        for (const index of frame.piece.slice(1)) {
+            fill(index, pieceColor);
+        }
+    }
+
+    // same layout as encode_canvas_frame, built from a game state
+    function frameFromState(state, config) {
+        const engine = window.tetrisEngine;
+        const cp = state.current_piece;
+        const cells = config.pieces[cp.shape][((cp.rotation % 4) + 4) % 4].cells;
+        const ghostY = engine.getGhostPosition(
+            config, state.board, cp.shape, cp.x, cp.y, cp.rotation, state.column_tops
+        );
+        const flat = (y) => cells
+            .filter(([rowI]) => y + rowI >= 0 && y + rowI < config.height)
+            .map(([rowI, colI]) => (y + rowI) * config.width + cp.x + colI);
+        return {
+            cells: state.board.map((row) => row.join("")).join(""),
+            piece: [cp.color_id].concat(flat(cp.y)),
+            ghost: flat(ghostY),
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        board: {
+            paint: function (frame, palette) {
+                draw(frame, palette);
+                return window.dash_clientside.no_update;
+            },
+
+            paintState: function (state, palette, config) {
+                const idle = !state || state.status === config.states.idle;
+                draw(idle ? null : frameFromState(state, config), palette);
+                return window.dash_clientside.no_update;
+            },
+        },
+    });
+})();
@@ -0,0 +1,114 @@
+/*
+ * Client input buffer, used when INPUT_MODE = "batch".
+ *
+ * The "keyboard" EventListener hands every keydown and keyup to buffer(),
+ * a clientside callback, so no key press reaches the server on its own.
+ * Presses and releases are collected for INPUT_BATCH_MS and then written to
+ * the "input-batch" store in one go, in the format game/tetris_engine.py:
+ * apply_key_batch reads. While a repeating key is held, a batch is sent
+ * every max(INPUT_BATCH_MS, ARR_MS) even without new events, so the server
+ * can play its DAS / ARR repeats; the browser's own key repeat is ignored.
+ */
+(function () {
+    "use strict";
+
+    // ── Buffer ──────────────────────────────────────────────────────────────
+
+    function InputBuffer(config) {
+        this.config = config;
+        this.held = {};       // key -> time pressed, for keys down at `start`
+        this.down = {};       // key -> time pressed, for keys down right now
+        this.events = [];
+        this.start = null;
+    }
+
+    InputBuffer.prototype.push = function (event) {
+        const key = event.key;
+        if (!(key in this.config.key_actions)) {
+            return false;
+        }
+        const pressed = event.type !== "keyup";
+        if (pressed && (event.repeat || key in this.down)) {
+            return false;
+        }
+        if (!pressed && !(key in this.down)) {
+            return false;
+        }
+        if (this.start === null) {
+            this.start = event.timeStamp;
+        }
+        this.events.push([event.timeStamp, key, pressed]);
+        if (pressed) {
+            this.down[key] = event.timeStamp;
+        } else {
+            delete this.down[key];
+        }
+        return true;
+    };
+
+    InputBuffer.prototype.repeating = function () {
+        const actions = this.config.key_actions;
+        const repeat = this.config.repeat_actions;
+        return Object.keys(this.down).some((key) => repeat.includes(actions[key]));
+    };
+
+    // The batch for everything since the last flush, up to `now`, or null.
+    InputBuffer.prototype.flush = function (now) {
+        if (!this.events.length && !this.repeating()) {
+            this.start = null;
+            return null;
+        }
+        const batch = {
+            start: this.start === null ? now : this.start,
+            end: now,
+            held: this.held,
+            events: this.events,
+        };
+        this.held = Object.assign({}, this.down);
+        this.events = [];
+        this.start = this.repeating() ? now : null;
+        return batch;
+    };
+
+    // ── Dash clientside callback ────────────────────────────────────────────
+
+    let buffer = null;
+    let timer = null;
+
+    function schedule(config) {
+        const delay = buffer.repeating()
+            ? Math.max(config.window_ms, config.arr_ms)
+            : config.window_ms;
+        timer = setTimeout(function () {
+            timer = null;
+            const batch = buffer.flush(performance.now());
+            if (batch) {
+                window.dash_clientside.set_props("input-batch", { data: batch });
+            }
+            if (buffer.repeating()) {
+                schedule(config);
+            }
+        }, delay);
+    }
+
+    const callbacks = {
+        buffer: function (event, config) {
+            if (event && config) {
+                buffer = buffer || new InputBuffer(config);
+                if (buffer.push(event) && timer === null) {
+                    schedule(config);
+                }
+            }
+            return window.dash_clientside.no_update;
+        },
+    };
+
+    if (typeof window !== "undefined") {
+        window.dash_clientside = Object.assign({}, window.dash_clientside, {
+            input: callbacks,
+        });
+    }
+    if (typeof module !== "undefined" && module.exports) {
+        module.exports = { InputBuffer: InputBuffer };
+    }
+})();
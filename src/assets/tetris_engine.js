@@ -0,0 +1,399 @@
+/*
+ * Clientside port of game/tetris_engine.py, used when GAME_LOOP = "clientside".
+ *
+ * Gravity, movement, rotation, holding and locking run in the browser, so
+ * ticks and key presses no longer round-trip to the server. Piece shapes,
+ * scoring and timing are not duplicated here: they arrive in the
+ * "engine-config" store built by server/clientside.py:engine_config().
+ *
+ * Every function mirrors its Python counterpart and must stay in step with
+ * it — the server replays the recorded inputs with the Python engine at each
+ * checkpoint and resyncs the client when the results differ.
+ */
+(function () {
+    "use strict";
+
+    // ── Piece generator (game/randomizer.py) ────────────────────────────────
+
+    function mulberry32(state) {
+        state = (state + 0x6D2B79F5) >>> 0;
+        let t = Math.imul(state ^ (state >>> 15), state | 1) >>> 0;
+        t = (((t + (Math.imul(t ^ (t >>> 7), t | 61) >>> 0)) >>> 0) ^ t) >>> 0;
+        return [state, (t ^ (t >>> 14)) >>> 0];
+    }
+
+    function randomBelow(gen, n) {
+        const [state, value] = mulberry32(gen.rng);
+        gen.rng = state;
+        return Math.floor((value * n) / 4294967296);
+    }
+
+    function generate(config, gen) {
+        const shapes = config.shapes;
+        if (gen.mode === "uniform") {
+            return shapes[randomBelow(gen, shapes.length)];
+        }
+        if (gen.bag.length === 0) {
+            const bag = shapes.slice();
+            for (let i = bag.length - 1; i > 0; i--) {
+                const j = randomBelow(gen, i + 1);
+                [bag[i], bag[j]] = [bag[j], bag[i]];
+            }
+            gen.bag = bag;
+        }
+        return gen.bag.shift();
+    }
+
+    function nextFromGenerator(config, gen) {
+        const shape = gen.queue.length ? gen.queue.shift() : generate(config, gen);
+        while (gen.queue.length < gen.lookahead) {
+            gen.queue.push(generate(config, gen));
+        }
+        return shape;
+    }
+
+    function drawPiece(config, state) {
+        if (!state.generator) {
+            return config.shapes[Math.floor(Math.random() * config.shapes.length)];
+        }
+        const gen = Object.assign({}, state.generator, {
+            bag: state.generator.bag.slice(),
+            queue: state.generator.queue.slice(),
+        });
+        const shape = nextFromGenerator(config, gen);
+        state.generator = gen;
+        return shape;
+    }
+
+    // ── Board ───────────────────────────────────────────────────────────────
+
+    function orientation(config, shape, rotation) {
+        return config.pieces[shape][((rotation % 4) + 4) % 4];
+    }
+
+    function applyPieceToBoard(board, cells, x, y, colorId) {
+        const newBoard = board.slice();
+        for (const [rowI, colI] of cells) {
+            const row = y + rowI;
+            if (newBoard[row] === board[row]) {
+                newBoard[row] = board[row].slice();
+            }
+            newBoard[row][x + colI] = colorId;
+        }
+        return newBoard;
+    }
+
+    function rowFills(config, board) {
+        return board.map((row) => row.filter((cell) => cell !== 0).length);
+    }
+
+    function stampRowFills(config, fills, board, cells, y) {
+        if (!fills) {
+            return rowFills(config, board);
+        }
+        fills = fills.slice();
+        for (const [rowI] of cells) {
+            fills[y + rowI] += 1;
+        }
+        return fills;
+    }
+
+    function fullRows(config, cells, y, fills) {
+        const rows = [...new Set(cells.map(([rowI]) => y + rowI))];
+        return rows.filter((row) => fills[row] === config.width).sort((a, b) => a - b);
+    }
+
+    function removeRows(board, full, empty) {
+        for (let i = full.length - 1; i >= 0; i--) {
+            board.splice(full[i], 1);
+        }
+        for (let i = 0; i < full.length; i++) {
+            board.unshift(empty());
+        }
+        return board;
+    }
+
+    function columnTops(config, board) {
+        const tops = [];
+        for (let col = 0; col < config.width; col++) {
+            let top = config.height;
+            for (let row = 0; row < config.height; row++) {
+                if (board[row][col] !== 0) {
+                    top = row;
+                    break;
+                }
+            }
+            tops.push(top);
+        }
+        return tops;
+    }
+
+    function updateColumnTops(config, tops, board, cells, x, y, cleared) {
+        if (!tops) {
+            return columnTops(config, board);
+        }
+        tops = tops.slice();
+        for (const [rowI, colI] of cells) {
+            tops[x + colI] = Math.min(tops[x + colI], y + rowI);
+        }
+        if (cleared.length) {
+            for (let col = 0; col < config.width; col++) {
+                let row = tops[col];
+                while (cleared.includes(row)) {
+                    row += 1;
+                }
+                row += cleared.filter((r) => r > row).length;
+                while (row < config.height && board[row][col] === 0) {
+                    row += 1;
+                }
+                tops[col] = row;
+            }
+        }
+        return tops;
+    }
+
+    function isValidPosition(config, board, shape, x, y, rotation) {
+        const o = orientation(config, shape, rotation);
+        if (x + o.min_col < 0 || x + o.max_col >= config.width) {
+            return false;
+        }
+        if (y + o.max_row >= config.height) {
+            return false;
+        }
+        for (const [rowI, colI] of o.cells) {
+            const newY = y + rowI;
+            if (newY >= 0 && board[newY][x + colI] !== 0) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    function getGhostPosition(config, board, shape, x, y, rotation, tops) {
+        let drop = config.height;
+        for (const [colI, rowI] of orientation(config, shape, rotation).bottom) {
+            const col = x + colI;
+            const below = y + rowI + 1;
+            let floor = below;
+            if (tops && tops[col] >= below) {
+                floor = tops[col];
+            } else {
+                while (floor < config.height && board[floor][col] === 0) {
+                    floor += 1;
+                }
+            }
+            drop = Math.min(drop, floor - below);
+        }
+        return y + drop;
+    }
+
+    // ── Scoring ─────────────────────────────────────────────────────────────
+
+    function calculateScore(config, lines, level) {
+        return (config.score_table[lines] || 0) * level;
+    }
+
+    function calculateLevel(linesCleared) {
+        return Math.floor(linesCleared / 10) + 1;
+    }
+
+    function calculateSpeed(config, level) {
+        const speed = config.initial_speed - (level - 1) * config.speed_increment;
+        return Math.max(speed, config.min_speed);
+    }
+
+    // ── Piece actions ───────────────────────────────────────────────────────
+
+    function spawnPiece(config, shape) {
+        return {
+            shape: shape,
+            rotation: 0,
+            x: config.spawn_x,
+            y: 0,
+            color_id: config.piece_ids[shape],
+        };
+    }
+
+    function lockPiece(config, state) {
+        state = Object.assign({}, state);
+        let cp = state.current_piece;
+        const o = orientation(config, cp.shape, cp.rotation);
+
+        const board = applyPieceToBoard(state.board, o.cells, cp.x, cp.y, cp.color_id);
+        const fills = stampRowFills(config, state.row_fills, board, o.cells, cp.y);
+        const full = fullRows(config, o.cells, cp.y, fills);
+        removeRows(board, full, () => new Array(config.width).fill(0));
+        removeRows(fills, full, () => 0);
+        const lines = full.length;
+
+        state.board = board;
+        state.row_fills = fills;
+        state.cleared_rows = full;
+        state.column_tops = updateColumnTops(
+            config, state.column_tops, board, o.cells, cp.x, cp.y, full
+        );
+        state.lines_cleared += lines;
+        state.score += calculateScore(config, lines, state.level);
+        state.level = calculateLevel(state.lines_cleared);
+        state.can_hold = true;
+
+        state.current_piece = spawnPiece(config, state.next_piece);
+        state.next_piece = drawPiece(config, state);
+
+        cp = state.current_piece;
+        if (!isValidPosition(config, state.board, cp.shape, cp.x, cp.y, cp.rotation)) {
+            state.status = config.states.over;
+        }
+        return state;
+    }
+
+    function copyForUpdate(state) {
+        state = Object.assign({}, state);
+        state.current_piece = Object.assign({}, state.current_piece);
+        return state;
+    }
+
+    function handleKeyInput(config, state, key) {
+        if (state.status === config.states.over) {
+            return state;
+        }
+        const action = config.key_actions[key];
+        if (action === undefined) {
+            return state;
+        }
+        if (action === "pause") {
+            state = Object.assign({}, state);
+            if (state.status === config.states.running) {
+                state.status = config.states.paused;
+            } else if (state.status === config.states.paused) {
+                state.status = config.states.running;
+            }
+            return state;
+        }
+        if (state.status !== config.states.running) {
+            return state;
+        }
+
+        state = copyForUpdate(state);
+        const cp = state.current_piece;
+        const fits = (x, y, rotation) =>
+            isValidPosition(config, state.board, cp.shape, x, y, rotation);
+
+        if (action === "move_left") {
+            if (fits(cp.x - 1, cp.y, cp.rotation)) cp.x -= 1;
+        } else if (action === "move_right") {
+            if (fits(cp.x + 1, cp.y, cp.rotation)) cp.x += 1;
+        } else if (action === "soft_drop") {
+            if (fits(cp.x, cp.y + 1, cp.rotation)) {
+                cp.y += 1;
+            } else {
+                state = lockPiece(config, state);
+            }
+        } else if (action === "hard_drop") {
+            cp.y = getGhostPosition(
+                config, state.board, cp.shape, cp.x, cp.y, cp.rotation, state.column_tops
+            );
+            state = lockPiece(config, state);
+        } else if (action === "rotate_clockwise") {
+            const rotation = (cp.rotation + 1) % 4;
+            if (fits(cp.x, cp.y, rotation)) cp.rotation = rotation;
+        } else if (action === "rotate_counter") {
+            const rotation = (((cp.rotation - 1) % 4) + 4) % 4;
+            if (fits(cp.x, cp.y, rotation)) cp.rotation = rotation;
+        } else if (action === "hold_piece") {
+            if (state.can_hold) {
+                const held = state.held_piece;
+                state.held_piece = cp.shape;
+                const nextShape = held ? held : state.next_piece;
+                if (!held) {
+                    state.next_piece = drawPiece(config, state);
+                }
+                state.current_piece = spawnPiece(config, nextShape);
+                state.can_hold = false;
+            }
+        }
+        return state;
+    }
+
+    function applyGameTick(config, state) {
+        if (state.status !== config.states.running) {
+            return state;
+        }
+        state = copyForUpdate(state);
+        const cp = state.current_piece;
+        if (isValidPosition(config, state.board, cp.shape, cp.x, cp.y + 1, cp.rotation)) {
+            cp.y += 1;
+        } else {
+            state = lockPiece(config, state);
+        }
+        state.tick += 1;
+        return state;
+    }
+
+    const engine = {
+        mulberry32, nextFromGenerator, isValidPosition, getGhostPosition,
+        lockPiece, handleKeyInput, applyGameTick, calculateSpeed,
+    };
+
+    // ── Dash clientside callbacks ───────────────────────────────────────────
+    // Inputs are recorded in the "input-log" store (a key string per key
+    // press, null per tick). When a piece locks, the log and the resulting
+    // state go to the "checkpoint" store for the server to validate.
+
+    function record(state, next, log, event, session) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (next === state) {
+            return [noUpdate, noUpdate, noUpdate];
+        }
+        const events = (log || []).concat([event]);
+        const locked = next.board !== state.board || next.status !== state.status;
+        if (locked) {
+            return [next, [], { session: session, events: events, state: next }];
+        }
+        return [next, events, noUpdate];
+    }
+
+    const callbacks = {
+        tick: function (nIntervals, state, log, session, config) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!state || state.status === config.states.idle) {
+                return [noUpdate, config.initial_speed, noUpdate, noUpdate];
+            }
+            const next = applyGameTick(config, state);
+            const [newState, newLog, checkpoint] = record(state, next, log, null, session);
+            return [newState, calculateSpeed(config, next.level), newLog, checkpoint];
+        },
+
+        key: function (event, state, log, session, config) {
+            if (!event || !state || state.status === config.states.idle) {
+                const noUpdate = window.dash_clientside.no_update;
+                return [noUpdate, noUpdate, noUpdate];
+            }
+            const next = handleKeyInput(config, state, event.key);
+            return record(state, next, log, event.key, session);
+        },
+
+        pause: function (nClicks, state, log, session, config) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!state || state.status === config.states.idle) {
+                return [noUpdate, true, noUpdate, noUpdate];
+            }
+            // the pause button behaves exactly like the pause key
+            const next = handleKeyInput(config, state, config.pause_key);
+            const [newState, newLog, checkpoint] = record(
+                state, next, log, config.pause_key, session
+            );
+            return [newState, next.status !== config.states.running, newLog, checkpoint];
+        },
+    };
+
+    if (typeof window !== "undefined") {
+        window.dash_clientside = Object.assign({}, window.dash_clientside, {
+            tetris: callbacks,
+        });
+        window.tetrisEngine = engine;
+    }
+    if (typeof module !== "undefined" && module.exports) {
+        module.exports = engine;
+    }
+})();
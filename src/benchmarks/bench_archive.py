@@ -0,0 +1,53 @@
+"""
+Replay archive benchmark.
+
+Writes simulated games into one archive, then times an index-only scan
+(filter by score), streaming every log, and full re-simulation into
+per-lock events.
+
+Run from src/:
+    python -m benchmarks.bench_archive
+"""
+import os
+import tempfile
+import time
+
+from game.archive import Archive, write_archive
+from game.simulator import run_batch
+
+
+def main(n_games=2_000, max_ticks=500):
+    results = run_batch(
+        range(n_games), policy="hard_drop", max_ticks=max_ticks, record=True
+    )
+    median = sorted(r["score"] for r in results)[n_games // 2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "games.trar")
+        start = time.perf_counter()
+        write_archive(path, [(r["seed"], r["replay"], r["score"]) for r in results])
+        write = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        with Archive(path) as archive:
+            start = time.perf_counter()
+            top = sum(1 for entry in archive.entries() if entry.score >= median)
+            index_scan = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read = sum(len(log) for _, log in archive.games())
+            stream = time.perf_counter() - start
+
+            start = time.perf_counter()
+            locks = sum(1 for _ in archive.all_lock_events())
+            resim = time.perf_counter() - start
+
+    print(f"archive size        : {size / n_games:>12,.1f} bytes/game")
+    print(f"write               : {n_games / write:>12,.0f} games/s")
+    print(f"index scan          : {n_games / index_scan:>12,.0f} games/s ({top} >= {median})")
+    print(f"stream logs         : {n_games / stream:>12,.0f} games/s ({read:,} bytes)")
+    print(f"re-simulate to locks: {locks / resim:>12,.0f} locks/s")
+
+
+if __name__ == "__main__":
+    main()
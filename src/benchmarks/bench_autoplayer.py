@@ -0,0 +1,41 @@
+"""
+Autoplayer benchmark.
+
+Times the placement search alone on a mid-game board, then whole bot games
+through the simulator (one placement per tick).
+
+Run from src/:
+    python -m benchmarks.bench_autoplayer
+"""
+import time
+
+from game.autoplayer import best_placement
+from game.replay import Replay
+from game.simulator import run_batch, simulate_game
+
+
+def main(n_games=20, max_ticks=500, workers=None):
+    # a board the bot built itself, so the search sees a realistic surface
+    midgame = simulate_game(0, policy="autoplay", max_ticks=150, record=True)
+    state = Replay(midgame["replay"]).final_state()
+
+    n = 2_000
+    start = time.perf_counter()
+    for _ in range(n):
+        best_placement(state)
+    search = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    results = run_batch(
+        range(n_games), policy="autoplay", max_ticks=max_ticks, workers=workers
+    )
+    elapsed = time.perf_counter() - start
+    lines = sum(r["lines"] for r in results) / n_games
+
+    print(f"placement search   : {search * 1e3:>10.3f} ms/move")
+    print(f"bot games          : {n_games / elapsed * 60:>10,.0f} games/min "
+          f"({max_ticks} ticks each, {lines:.0f} lines avg)")
+
+
+if __name__ == "__main__":
+    main()
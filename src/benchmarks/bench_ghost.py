@@ -0,0 +1,103 @@
+"""
+Ghost / hard-drop benchmark on tall, sparse boards.
+
+Compares the old row-by-row get_ghost_position (one collision check per
+row fallen) against the bottom-profile drop, with and without the state's
+column tops, and times full hard drops through handle_key_input.
+
+Run from src/:
+    python -m benchmarks.bench_ghost
+"""
+import random
+import time
+
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT
+from game.pieces import PIECE_TABLE
+from game.tetris_engine import (
+    column_tops, create_empty_board, get_ghost_position, handle_key_input,
+    is_valid_position, row_fills, spawn_piece, start_game,
+)
+
+
+def _legacy_get_ghost_position(board, piece, x, y, rotation, tops=None):
+    ghost_y = y
+    while is_valid_position(board, piece, x, ghost_y + 1, rotation):
+        ghost_y += 1
+    return ghost_y
+
+
+def _make_board(seed=0, filled_rows=3, density=0.3):
+    """A mostly empty board: a few ragged rows at the bottom, pieces spawn high."""
+    rng = random.Random(seed)
+    board = create_empty_board()
+    for row in range(BOARD_HEIGHT - filled_rows, BOARD_HEIGHT):
+        board[row] = [1 if rng.random() < density else 0 for _ in range(BOARD_WIDTH)]
+    return board
+
+
+def _make_queries(n, seed=0):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        shape = rng.choice(list(PIECE_TABLE))
+        rotation = rng.randint(0, 3)
+        o = PIECE_TABLE[shape][rotation]
+        x = rng.randint(-o.min_col, BOARD_WIDTH - 1 - o.max_col)
+        queries.append((shape, x, 0, rotation))
+    return queries
+
+
+def calls_per_second(fn, board, queries, tops=None, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for shape, x, y, rotation in queries:
+            fn(board, shape, x, y, rotation, tops)
+        best = min(best, time.perf_counter() - start)
+    return len(queries) / best
+
+
+def hard_drops_per_second(states, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for state in states:
+            handle_key_input(state, " ")
+        best = min(best, time.perf_counter() - start)
+    return len(states) / best
+
+
+def main(n=20_000):
+    board = _make_board()
+    tops = column_tops(board)
+    queries = _make_queries(n)
+
+    # sanity check — every path must agree before we compare speed
+    for shape, x, y, rotation in queries[:2_000]:
+        expected = _legacy_get_ghost_position(board, shape, x, y, rotation)
+        assert get_ghost_position(board, shape, x, y, rotation) == expected
+        assert get_ghost_position(board, shape, x, y, rotation, tops) == expected
+
+    legacy = calls_per_second(_legacy_get_ghost_position, board, queries)
+    profile = calls_per_second(get_ghost_position, board, queries)
+    with_tops = calls_per_second(get_ghost_position, board, queries, tops)
+
+    states = []
+    for shape, x, _, rotation in queries[:n // 4]:
+        state = start_game(seed=0)
+        state["board"] = board
+        state["column_tops"] = tops
+        state["row_fills"] = row_fills(board)
+        state["current_piece"] = dict(spawn_piece(shape), x=x, rotation=rotation)
+        states.append(state)
+    drops = hard_drops_per_second(states)
+
+    print(f"ghost  legacy (row by row)  : {legacy:>12,.0f} calls/s")
+    print(f"ghost  bottom profile       : {profile:>12,.0f} calls/s")
+    print(f"ghost  profile + column tops: {with_tops:>12,.0f} calls/s")
+    print(f"speedup vs legacy           : {with_tops / legacy:>12.1f}x")
+    print(f"hard drop (handle_key_input): {drops:>12,.0f} drops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Bytes-per-keypress benchmark for the hot / cold store split.
+
+Replays the key presses and ticks of a seeded game through on_key / on_tick
+and sums what each round-trip carries for the state stores: the store
+States in the request plus the store Outputs in the response. "before" is
+the single game-state store (the whole state both ways); "after" is
+game-state + game-hot, where an unchanged store is sent as no_update.
+Client storage is measured with both STATE_CODECs.
+
+Run from src/:
+    python -m benchmarks.bench_keypress
+"""
+import random
+
+from dash import no_update
+from plotly.io.json import to_json_plotly
+
+import callbacks
+from game.simulator import random_policy
+from game.tetris_engine import start_game
+from server.session_store import SessionStore
+
+
+class _App:
+    def __init__(self):
+        self.callbacks = {}
+
+    def callback(self, *args, **kwargs):
+        def decorator(fn):
+            self.callbacks[fn.__name__] = fn
+            return fn
+        return decorator
+
+    def clientside_callback(self, *args, **kwargs):
+        pass
+
+
+def _size(*payloads):
+    return sum(
+        len(to_json_plotly(p).encode()) for p in payloads if p is not no_update
+    )
+
+
+def measure(storage, seed=0, ticks=300, codec="json"):
+    """Returns {"key": [(before, after)...], "tick": [...]} byte counts."""
+    callbacks.STATE_STORAGE = storage
+    callbacks.STATE_CODEC = codec
+    callbacks.SESSIONS = SessionStore()
+    app = _App()
+    callbacks.register_callbacks(app)
+    on_key, on_tick = app.callbacks["on_key"], app.callbacks["on_tick"]
+
+    rng = random.Random(seed)
+    data, hot = callbacks.save_state(None, start_game(seed=seed))
+    sizes = {"key": [], "tick": []}
+
+    def round_trip(kind, call):
+        nonlocal data, hot
+        # before the split the one store carried the state (or the session
+        # reference) in the request and again in the response
+        single = callbacks.load_state(data, hot) if storage == "client" else data
+        request = _size(data, hot)
+        new_data, new_hot = call(data, hot)[:2]
+        sizes[kind].append((2 * _size(single), request + _size(new_data, new_hot)))
+        data = data if new_data is no_update else new_data
+        hot = hot if new_hot is no_update else new_hot
+
+    for _ in range(ticks):
+        for key in random_policy(callbacks.load_state(data, hot), rng):
+            round_trip("key", lambda d, h: on_key({"key": key}, d, h))
+        round_trip("tick", lambda d, h: on_tick(1, d, h))
+    return sizes
+
+
+def main():
+    storage, codec = callbacks.STATE_STORAGE, callbacks.STATE_CODEC
+    try:
+        for mode, state_codec in (("client", "json"), ("client", "compact"), ("server", "json")):
+            sizes = measure(mode, codec=state_codec)
+            print(f"STATE_STORAGE = {mode!r}, STATE_CODEC = {state_codec!r}")
+            for kind, pairs in sizes.items():
+                before = sum(b for b, _ in pairs) / len(pairs)
+                after = sum(a for _, a in pairs) / len(pairs)
+                print(
+                    f"  per {kind:<4}: {before:>7,.0f} B before  {after:>7,.0f} B after"
+                    f"  ({before / after:.1f}x)   n={len(pairs):,}"
+                )
+    finally:
+        callbacks.STATE_STORAGE, callbacks.STATE_CODEC = storage, codec
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Lock / line-clear benchmark across board heights.
+
+Compares the old lock (rescan every row for full ones, rebuild the board,
+rescan the column tops after a clear) against lock_piece, which confirms
+the state's row fill counts against the board (each row read up to its
+first gap) and compacts the board in place. The board height is patched for each run, with
+the same few ragged rows at the bottom and one row left a cell short of
+full, so half of the locks clear a line.
+
+Run from src/:
+    python -m benchmarks.bench_lock
+"""
+import random
+import time
+
+import game.tetris_engine as tetris_engine
+from game.constants import BOARD_HEIGHT, BOARD_WIDTH, STATE_OVER
+from game.tetris_engine import (
+    apply_piece_to_board, calculate_level, calculate_score, column_tops, draw_piece,
+    get_piece_orientation, is_valid_position, lock_piece, row_fills, spawn_piece,
+    start_game, update_column_tops,
+)
+
+# BOARD_HEIGHT is the stock board
+HEIGHTS = sorted({20, BOARD_HEIGHT, 40, 80, 160})
+
+
+def _legacy_lock(state):
+    state = dict(state)
+    cp = state["current_piece"]
+    orientation = get_piece_orientation(cp["shape"], cp["rotation"])
+    board = apply_piece_to_board(state["board"], orientation, cp["x"], cp["y"], cp["color_id"])
+    kept = [row for row in board if 0 in row]
+    lines = len(board) - len(kept)
+    state["board"] = [[0] * BOARD_WIDTH for _ in range(lines)] + kept
+    if lines:
+        state["column_tops"] = column_tops(state["board"])
+    else:
+        state["column_tops"] = update_column_tops(
+            state["column_tops"], state["board"], orientation.cells, cp["x"], cp["y"],
+        )
+    state["lines_cleared"] += lines
+    state["score"] += calculate_score(lines, state["level"])
+    state["level"] = calculate_level(state["lines_cleared"])
+    state["can_hold"] = True
+    state["current_piece"] = spawn_piece(state["next_piece"])
+    state["next_piece"] = draw_piece(state)
+    cp = state["current_piece"]
+    if not is_valid_position(state["board"], cp["shape"], cp["x"], cp["y"], cp["rotation"]):
+        state["status"] = STATE_OVER
+    return state
+
+
+def _make_states(height, n=400, seed=0):
+    """States whose I piece stands in the gap of a nearly full bottom row, or next to it."""
+    rng = random.Random(seed)
+    tetris_engine.BOARD_HEIGHT = height
+    base = start_game(seed=seed)
+    states = []
+    for i in range(n):
+        board = [list(row) for row in base["board"]]
+        for row in range(height - 4, height - 1):
+            board[row] = [1 if rng.random() < 0.5 else 0 for _ in range(BOARD_WIDTH)]
+        board[height - 1] = [1] * (BOARD_WIDTH - 1) + [0]
+        piece = spawn_piece("I")
+        piece["rotation"] = 1
+        o = get_piece_orientation("I", 1)
+        piece["x"] = BOARD_WIDTH - 1 - o.min_col - (i % 2)
+        piece["y"] = height - 1 - o.max_row
+        for row in range(piece["y"] + o.min_row, height):
+            board[row][piece["x"] + o.min_col] = 0
+        board[height - 1][piece["x"] + o.min_col] = 0
+        states.append({
+            **base, "board": board, "current_piece": piece,
+            "column_tops": column_tops(board), "row_fills": row_fills(board),
+            "board_hash": None,
+        })
+    return states
+
+
+def locks_per_second(fn, states, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for state in states:
+            fn(state)
+        best = min(best, time.perf_counter() - start)
+    return len(states) / best
+
+
+def main():
+    height = tetris_engine.BOARD_HEIGHT
+    print(f"{'rows':>5}  {'legacy locks/s':>15}  {'lock_piece locks/s':>19}  {'speedup':>8}")
+    try:
+        for rows in HEIGHTS:
+            states = _make_states(rows)
+            legacy = locks_per_second(_legacy_lock, states)
+            current = locks_per_second(lock_piece, states)
+            stock = "  (stock)" if rows == BOARD_HEIGHT else ""
+            print(f"{rows:>5}  {legacy:>15,.0f}  {current:>19,.0f}  {current / legacy:>7.1f}x{stock}")
+    finally:
+        tetris_engine.BOARD_HEIGHT = height
+
+
+if __name__ == "__main__":
+    main()
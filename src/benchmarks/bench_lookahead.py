@@ -0,0 +1,43 @@
+"""
+Lookahead search benchmark.
+
+Times one search per depth on a mid-game board, with and without a cache
+kept across searches, and with the first piece's subtrees on a process pool.
+
+Run from src/:
+    python -m benchmarks.bench_lookahead
+"""
+import time
+
+from game.lookahead import search
+from game.replay import Replay
+from game.simulator import simulate_game
+
+
+def ms_per_search(state, repeat=3, **kwargs):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search(state, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main(workers=None):
+    midgame = simulate_game(0, policy="autoplay", max_ticks=150, record=True)
+    state = Replay(midgame["replay"]).final_state()
+
+    for depth in (1, 2, 3):
+        cold = ms_per_search(state, depth=depth)
+        cache = {}
+        search(state, depth=depth, cache=cache)
+        warm = ms_per_search(state, depth=depth, cache=cache)
+        print(f"depth {depth}: {cold:>9.1f} ms   cached: {warm:>7.1f} ms"
+              f"   ({len(cache):,} positions cached)")
+
+    pooled = ms_per_search(state, repeat=1, depth=3, workers=workers)
+    print(f"depth 3, process pool: {pooled:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
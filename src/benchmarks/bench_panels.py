@@ -0,0 +1,77 @@
+"""
+Side-panel benchmark: rebuilding every panel on every state change vs. the
+render cache plus only sending the panels whose field changed.
+
+Replays the same seeded game as bench_render and, for every state change,
+times update_ui and measures the JSON response it would send.
+
+Run from src/:
+    python -m benchmarks.bench_panels
+"""
+import time
+
+from dash import no_update
+
+import callbacks
+from benchmarks.bench_render import _payload_size, game_states
+from components.board import render_mini_board
+
+
+class _App:
+    def __init__(self):
+        self.callbacks = {}
+
+    def callback(self, *args, **kwargs):
+        def decorator(fn):
+            self.callbacks[fn.__name__] = fn
+            return fn
+        return decorator
+
+    def clientside_callback(self, *args, **kwargs):
+        pass
+
+
+def _unconditional(state):
+    """update_ui as it was: every panel rebuilt and sent on every change."""
+    build = render_mini_board.__wrapped__
+    return (
+        build(state["next_piece"]),
+        build(state.get("held_piece")),
+        str(state["score"]),
+        str(state["level"]),
+        str(state["lines_cleared"]),
+    )
+
+
+def main():
+    app = _App()
+    callbacks.register_callbacks(app)
+    update_ui = app.callbacks["update_ui"]
+    states = game_states()
+
+    start = time.perf_counter()
+    before = [_unconditional(state) for state in states]
+    before_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after, panel = [], None
+    for state in states:
+        outputs = update_ui(state, panel)
+        if outputs[-1] is not no_update:
+            panel = outputs[-1]
+        after.append(outputs)
+    after_time = time.perf_counter() - start
+
+    before_bytes = sum(_payload_size(o) for outputs in before for o in outputs)
+    after_bytes = sum(_payload_size(o) for outputs in after for o in outputs)
+    sent = sum(outputs[0] is not no_update for outputs in after)
+    n = len(states)
+
+    print(f"state changes       : {n:>8,}")
+    print(f"unconditional       : {before_bytes / n:>8.0f} B/change  {before_time / n * 1e6:7.1f}us/change")
+    print(f"cached, changed-only: {after_bytes / n:>8.0f} B/change  {after_time / n * 1e6:7.1f}us/change")
+    print(f"next preview sent   : {sent:>8,} times ({sent / n:.1%} of changes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Bytes-per-tick benchmark for the game-state store.
+
+Compares what an on_tick round-trip carries for the game-state store in
+"client" storage (the whole state, both ways) and "server" storage (a
+session reference both ways), plus the JSON encode/decode cost of it.
+
+Run from src/:
+    python -m benchmarks.bench_payload
+"""
+import json
+import random
+import time
+
+from plotly.io.json import to_json_plotly
+
+from game.simulator import hard_drop_policy
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+from server.session_store import SessionStore
+
+
+def _mid_game_state(seed=0, ticks=400):
+    rng = random.Random(seed)
+    state = start_game(seed=seed)
+    for _ in range(ticks):
+        for key in hard_drop_policy(state, rng):
+            state = handle_key_input(state, key)
+        state = apply_game_tick(state)
+    return state
+
+
+def _round_trip(payload, repeat=2_000):
+    """Returns (bytes per tick, seconds per tick) for one state in + one out."""
+    encoded = to_json_plotly(payload)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(to_json_plotly(payload))   # request: browser -> server
+        to_json_plotly(payload)               # response: server -> browser
+    return 2 * len(encoded.encode()), (time.perf_counter() - start) / repeat
+
+
+def main():
+    state = _mid_game_state()
+    sessions = SessionStore()
+    reference = {"session": sessions.put(None, state), "rev": state["tick"]}
+
+    client_bytes, client_time = _round_trip(state)
+    server_bytes, server_time = _round_trip(reference)
+
+    print(f"client storage: {client_bytes:>6,} B/tick  json {client_time * 1e6:7.1f}us/tick")
+    print(f"server storage: {server_bytes:>6,} B/tick  json {server_time * 1e6:7.1f}us/tick")
+    print(f"reduction     : {client_bytes / server_bytes:>6.1f}x bytes")
+
+
+if __name__ == "__main__":
+    main()
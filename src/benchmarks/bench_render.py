@@ -0,0 +1,83 @@
+"""
+Render benchmark: full div rebuild vs. patch updates vs. canvas frames.
+
+Replays a seeded game and, for every state change, times the board render
+callback and measures the JSON response it would send, in both modes.
+
+Run from src/:
+    python -m benchmarks.bench_render
+"""
+import random
+import statistics
+import time
+
+from dash import no_update
+from plotly.io.json import to_json_plotly
+
+from components.board import (
+    encode_canvas_frame, encode_frame, render_board, render_board_patch,
+)
+from game.simulator import random_policy
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+
+
+def game_states(seed=0, ticks=300):
+    """Every state a seeded random game passes through (keys and ticks)."""
+    rng = random.Random(seed)
+    state = start_game(seed=seed)
+    states = [state]
+    for _ in range(ticks):
+        for key in random_policy(state, rng):
+            state = handle_key_input(state, key)
+            states.append(state)
+        state = apply_game_tick(state)
+        states.append(state)
+    return states
+
+
+def _payload_size(output):
+    if output is no_update:
+        return 0
+    if hasattr(output, "to_plotly_json"):
+        output = output.to_plotly_json()
+    return len(to_json_plotly(output).encode())
+
+
+def measure(states):
+    results = {"full": ([], []), "patch": ([], []), "canvas": ([], [])}
+    frame = encode_frame(states[0])
+    for state in states[1:]:
+        start = time.perf_counter()
+        children = render_board(state)
+        size = _payload_size(children)
+        results["full"][0].append(time.perf_counter() - start)
+        results["full"][1].append(size)
+
+        start = time.perf_counter()
+        children, new_frame = render_board_patch(state, frame)
+        size = _payload_size(children)
+        if new_frame is not no_update:
+            size += len(new_frame) + 2          # the board-frame store, quoted
+        results["patch"][0].append(time.perf_counter() - start)
+        results["patch"][1].append(size)
+        if new_frame is not no_update:
+            frame = new_frame
+
+        start = time.perf_counter()
+        size = _payload_size(encode_canvas_frame(state))
+        results["canvas"][0].append(time.perf_counter() - start)
+        results["canvas"][1].append(size)
+    return results
+
+
+def main():
+    states = game_states()
+    for mode, (times, sizes) in measure(states).items():
+        print(
+            f"{mode:<6}  render+encode mean={statistics.mean(times) * 1e3:6.2f}ms"
+            f"  response mean={statistics.mean(sizes):>8,.0f} B  max={max(sizes):>8,} B"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Replay log benchmark.
+
+Records simulated games, then reports the log size per tick against a JSON
+dump of every state, headless playback speed, and how much the snapshots
+speed up seeking.
+
+Run from src/:
+    python -m benchmarks.bench_replay
+"""
+import json
+import random
+import time
+
+from game.replay import Replay
+from game.simulator import simulate_game
+
+
+def main(n_games=20, max_ticks=2_000):
+    results = [
+        simulate_game(seed, policy="random", max_ticks=max_ticks, record=True)
+        for seed in range(n_games)
+    ]
+    ticks = sum(r["ticks"] for r in results)
+    log_bytes = sum(len(r["replay"]) for r in results)
+
+    # what storing one state per tick would cost, estimated from the final state
+    sample = Replay(results[0]["replay"]).final_state()
+    state_bytes = len(json.dumps(sample))
+
+    start = time.perf_counter()
+    for r in results:
+        Replay(r["replay"]).final_state()
+    playback = time.perf_counter() - start
+
+    rng = random.Random(0)
+    replay = Replay(results[0]["replay"], snapshot_every=100)
+    replay.final_state()   # fills the snapshots
+    targets = [rng.randint(0, replay.total_ticks) for _ in range(50)]
+    start = time.perf_counter()
+    for tick in targets:
+        replay.seek(tick)
+    seek_snap = (time.perf_counter() - start) / len(targets)
+    start = time.perf_counter()
+    for tick in targets:
+        Replay(results[0]["replay"], snapshot_every=10**9).seek(tick)
+    seek_zero = (time.perf_counter() - start) / len(targets)
+
+    print(f"replay log         : {log_bytes / ticks:>10.2f} bytes/tick")
+    print(f"JSON state per tick: {state_bytes:>10,} bytes/tick")
+    print(f"headless playback  : {ticks / playback:>10,.0f} ticks/s")
+    print(f"seek from tick 0   : {seek_zero * 1e3:>10.2f} ms")
+    print(f"seek from snapshot : {seek_snap * 1e3:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Scaling benchmark for the headless batch simulator.
+
+Runs the same set of seeded games with an increasing number of worker
+processes and reports games/s and the speedup over one worker.
+
+Run from src/:
+    python -m benchmarks.bench_simulator
+"""
+import os
+import time
+
+from game.simulator import run_batch
+
+
+def main(n_games=200, policy="hard_drop", max_ticks=2_000):
+    seeds = range(n_games)
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        results = run_batch(seeds, policy=policy, max_ticks=max_ticks, workers=workers)
+        elapsed = time.perf_counter() - start
+        ticks = sum(r["ticks"] for r in results)
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers:<3} games/s={n_games / elapsed:8.1f}"
+            f"  ticks/s={ticks / elapsed:10,.0f}  speedup={baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-transition latency and allocation benchmark.
+
+Drives handle_key_input / apply_game_tick with a long seeded random key
+sequence and reports the latency of each transition plus the tracemalloc
+peak while it runs, for the structural-sharing transitions and for the old
+path that deep-copied the whole state first.
+
+Run from src/:
+    python -m benchmarks.bench_transitions
+"""
+import copy
+import random
+import statistics
+import time
+import tracemalloc
+
+from game.constants import KEY_ACTIONS, STATE_OVER
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+
+# pause keys would freeze the run, so they are left out of the sequence
+KEYS = [key for key, action in KEY_ACTIONS.items() if action != "pause"]
+
+
+def _legacy_handle_key_input(state, key):
+    return handle_key_input(copy.deepcopy(state), key)
+
+
+def _legacy_apply_game_tick(state):
+    return apply_game_tick(copy.deepcopy(state))
+
+
+def _key_sequence(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(KEYS) for _ in range(n)]
+
+
+def _transitions(keys, legacy=False):
+    """Yields (label, fn, arg) — one tick after every fourth key."""
+    key_fn = _legacy_handle_key_input if legacy else handle_key_input
+    tick_fn = _legacy_apply_game_tick if legacy else apply_game_tick
+    for i, key in enumerate(keys):
+        yield "key", key_fn, key
+        if i % 4 == 3:
+            yield "tick", tick_fn, None
+
+
+def _games(seed):
+    """Seeded games, a new one (seed + 1, ...) after each game over."""
+    while True:
+        yield start_game(seed=seed)
+        seed += 1
+
+
+def measure_latency(n=20_000, seed=0, legacy=False):
+    games = _games(seed)
+    state = next(games)
+    samples = {"key": [], "tick": []}
+    for label, fn, arg in _transitions(_key_sequence(n, seed), legacy):
+        if state["status"] == STATE_OVER:
+            state = next(games)
+        start = time.perf_counter()
+        state = fn(state, arg) if arg is not None else fn(state)
+        samples[label].append(time.perf_counter() - start)
+    return samples
+
+
+def measure_allocations(n=5_000, seed=0, legacy=False):
+    """Returns the mean and max tracemalloc peak of a transition, in bytes."""
+    games = _games(seed)
+    state = next(games)
+    per_call = []
+    tracemalloc.start()
+    for label, fn, arg in _transitions(_key_sequence(n, seed), legacy):
+        if state["status"] == STATE_OVER:
+            state = next(games)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        state = fn(state, arg) if arg is not None else fn(state)
+        _, peak = tracemalloc.get_traced_memory()
+        per_call.append(peak - before)
+    tracemalloc.stop()
+    return statistics.mean(per_call), max(per_call)
+
+
+def _report(label, samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[int(len(samples) * 0.99)]
+    print(
+        f"{label:<5} n={len(samples):>6}  mean={statistics.mean(samples) * 1e6:7.2f}us"
+        f"  p50={p50 * 1e6:7.2f}us  p99={p99 * 1e6:7.2f}us"
+    )
+
+
+def main():
+    for name, legacy in (("deepcopy (legacy)", True), ("structural sharing", False)):
+        print(name)
+        samples = measure_latency(legacy=legacy)
+        _report("key", samples["key"])
+        _report("tick", samples["tick"])
+        mean_bytes, max_bytes = measure_allocations(legacy=legacy)
+        print(f"alloc peak per transition: mean={mean_bytes:,.0f} B  max={max_bytes:,.0f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Zobrist hashing benchmark.
+
+Compares keeping state["board_hash"] up to date incrementally against
+re-hashing all cells after every step, and times transposition table
+lookups keyed by state_hash().
+
+Run from src/:
+    python -m benchmarks.bench_zobrist
+"""
+import time
+
+from game.autoplayer import choose_keys
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+from game.zobrist import TranspositionTable, board_hash, state_hash
+
+
+def _bot_inputs(n):
+    """Keys the autoplayer presses before each of n ticks."""
+    state = start_game(seed=0)
+    inputs = []
+    for _ in range(n):
+        keys = choose_keys(state)
+        for key in keys:
+            state = handle_key_input(state, key)
+        state = apply_game_tick(state)
+        inputs.append(keys)
+    return inputs
+
+
+def _play(inputs, hashing):
+    state = start_game(seed=0, hashing=hashing)
+    states = []
+    for keys in inputs:
+        for key in keys:
+            state = handle_key_input(state, key)
+        state = apply_game_tick(state)
+        states.append(state)
+    return states
+
+
+def _seconds(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n=2_000):
+    inputs = _bot_inputs(n)
+    states = _play(inputs, hashing=True)
+
+    full = _seconds(lambda: [board_hash(state["board"]) for state in states]) / n
+    # the same game with and without the hash kept up to date
+    with_hash = _seconds(_play, inputs, True)
+    without = _seconds(_play, inputs, False)
+
+    table = TranspositionTable(max_entries=n)
+    start = time.perf_counter()
+    for state in states + states:
+        key = state_hash(state)
+        if table.get(key) is None:
+            table.put(key, state["score"])
+    lookups = 2 * n / (time.perf_counter() - start)
+
+    print(f"full re-hash            : {full * 1e6:>10.2f} us/step")
+    print(f"engine step, hash kept  : {with_hash / n * 1e6:>10.2f} us/step")
+    print(f"engine step, no hash    : {without / n * 1e6:>10.2f} us/step")
+    print(f"state_hash + table      : {lookups:>10,.0f} lookups/s")
+    print(f"table stats             : {table.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Load generator: N simulated players against one server.
+
+Each player is a thread that starts a game, then sends a tick every
+--tick-ms and random key presses in between, keeping its stores the way the
+browser would (responses update them, no_update leaves them alone). With
+--render it also requests the board and side-panel renders a browser would
+trigger. Reports the p50 / p99 latency of every kind of callback request.
+
+Without --url the app is served in-process through Flask's test client, so
+players and callbacks share one interpreter; point it at a real server to
+measure that instead. From src/:
+
+    gunicorn -c gunicorn.conf.py wsgi:server &
+    python -m benchmarks.load_test --url http://127.0.0.1:8050 --players 200
+"""
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from game.constants import KEY_ACTIONS
+
+PLAY_KEYS = [key for key, action in KEY_ACTIONS.items() if action != "pause"]
+
+
+# ── Transport ─────────────────────────────────────────────────────────────────
+
+class _HttpTransport:
+    """One keep-alive connection to a running server (one per player)."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self._conn = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+
+    def request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self._conn.request(
+            method, path, body=json.dumps(body) if body is not None else None,
+            headers=headers,
+        )
+        response = self._conn.getresponse()
+        data = response.read()
+        return response.status, json.loads(data) if data else None
+
+
+class _InProcessTransport:
+    """The app's Flask test client, for runs without a server."""
+
+    def __init__(self, server):
+        self._client = server.test_client()
+
+    def request(self, method, path, body=None):
+        response = self._client.open(path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+
+def _transport_factory(url):
+    if url:
+        return lambda: _HttpTransport(url)
+    from app import app
+    return lambda: _InProcessTransport(app.server)
+
+
+# ── Dash protocol ─────────────────────────────────────────────────────────────
+
+def _output_specs(output):
+    """The "outputs" of a request, from a /_dash-dependencies output string."""
+    def spec(part):
+        cid, prop = part.split(".", 1)
+        return {"id": cid, "property": prop}
+
+    if output.startswith(".."):
+        return [spec(part) for part in output[2:-2].split("...")]
+    return spec(output)
+
+
+def _store_defaults(layout):
+    """Initial data of every dcc.Store in a /_dash-layout tree."""
+    stores = {}
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict) and "props" in node:
+            props = node["props"]
+            if node.get("type") == "Store":
+                stores[(props["id"], "data")] = props.get("data")
+            stack.append(props.get("children"))
+    return stores
+
+
+class App:
+    """The callbacks a player needs, found by what triggers them."""
+
+    def __init__(self, transport):
+        _, self.dependencies = transport.request("GET", "/_dash-dependencies")
+        _, layout = transport.request("GET", "/_dash-layout")
+        self.defaults = _store_defaults(layout)
+        by_input = {}
+        for dep in self.dependencies:
+            if dep.get("clientside_function"):
+                continue
+            by_input[tuple(i["id"] for i in dep["inputs"])] = dep
+        self.start = by_input[("start-btn", "restart-btn")]
+        self.tick = by_input[("game-tick",)]
+        self.key = by_input.get(("keyboard",))
+        self.batch = by_input.get(("input-batch",))
+        self.renders = [
+            dep for ids, dep in by_input.items()
+            if ids in (("game-state", "game-hot"), ("game-state",))
+        ]
+
+
+class Player:
+    """One simulated browser: its store values and the requests it sends."""
+
+    def __init__(self, app, transport, rng, latencies):
+        self.app = app
+        self.transport = transport
+        self.rng = rng
+        self.latencies = latencies
+        self.values = dict(app.defaults)
+        self.errors = 0
+
+    def call(self, kind, dep, triggered):
+        """Sends one callback request; `triggered` is {(id, prop): value}."""
+        self.values.update(triggered)
+
+        def spec(item):
+            key = (item["id"], item["property"])
+            return {**item, "value": self.values.get(key)}
+
+        body = {
+            "output": dep["output"],
+            "outputs": _output_specs(dep["output"]),
+            "inputs": [spec(i) for i in dep["inputs"]],
+            "state": [spec(s) for s in dep["state"]],
+            "changedPropIds": [f"{cid}.{prop}" for cid, prop in triggered],
+        }
+        start = time.perf_counter()
+        status, payload = self.transport.request("POST", "/_dash-update-component", body)
+        self.latencies[kind].append(time.perf_counter() - start)
+        if status == 204:
+            return False
+        if status != 200:
+            self.errors += 1
+            return False
+        for cid, props in payload.get("response", {}).items():
+            for prop, value in props.items():
+                self.values[(cid, prop.split("@")[0])] = value
+        return True
+
+    def render(self):
+        for dep in self.app.renders:
+            self.call("render", dep, {})
+
+    def play(self, duration, tick_ms, keys_per_tick, render):
+        app = self.app
+        changed = self.call("start", app.start, {("start-btn", "n_clicks"): 1})
+        if render and changed:
+            self.render()
+        ticks, deadline = 0, time.perf_counter() + duration
+        next_tick = time.perf_counter()
+        while time.perf_counter() < deadline:
+            for _ in range(self._n_keys(keys_per_tick)):
+                changed = self._press(self.rng.choice(PLAY_KEYS))
+                if render and changed:
+                    self.render()
+            next_tick += tick_ms / 1000
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+            ticks += 1
+            changed = self.call("tick", app.tick, {("game-tick", "n_intervals"): ticks})
+            if render and changed:
+                self.render()
+
+    def _n_keys(self, rate):
+        whole = int(rate)
+        return whole + (self.rng.random() < rate - whole)
+
+    def _press(self, key):
+        if self.app.key is not None:
+            event = {"key": key, "code": key}
+            return self.call("key", self.app.key, {("keyboard", "event"): event})
+        now = time.perf_counter() * 1000
+        batch = {"start": now, "end": now + 16, "held": {},
+                 "events": [[now, key, True], [now + 1, key, False]]}
+        return self.call("key", self.app.batch, {("input-batch", "data"): batch})
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+
+def percentiles(samples):
+    """(p50, p99) of a list of durations, in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] * 1e3 if samples else float("nan")
+        return value, value
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49] * 1e3, cuts[98] * 1e3
+
+
+def run(players=50, duration=10.0, tick_ms=500, keys_per_tick=1.0,
+        render=False, url=None, seed=0):
+    """Runs the players to completion; returns (latencies by kind, errors, wall time)."""
+    make_transport = _transport_factory(url)
+    app = App(make_transport())
+    latencies = defaultdict(list)
+    simulated = [
+        Player(app, make_transport(), random.Random(seed + i), latencies)
+        for i in range(players)
+    ]
+    threads = [
+        threading.Thread(
+            target=p.play, args=(duration, tick_ms, keys_per_tick, render), daemon=True
+        )
+        for p in simulated
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return latencies, sum(p.errors for p in simulated), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="server to load; in-process when omitted")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--tick-ms", type=int, default=500)
+    parser.add_argument("--keys-per-tick", type=float, default=1.0)
+    parser.add_argument("--render", action="store_true", help="request renders too")
+    args = parser.parse_args()
+
+    latencies, errors, wall = run(
+        args.players, args.duration, args.tick_ms, args.keys_per_tick,
+        args.render, args.url,
+    )
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{args.players} players, {total:,} requests in {wall:.1f}s "
+          f"({total / wall:,.0f} req/s), {errors} errors")
+    for kind, samples in sorted(latencies.items()):
+        p50, p99 = percentiles(samples)
+        print(f"  {kind:<7}: {len(samples):>7,}  p50 {p50:7.2f}ms  p99 {p99:7.2f}ms")
+    p50, p99 = percentiles([s for samples in latencies.values() for s in samples])
+    print(f"  {'all':<7}: {total:>7,}  p50 {p50:7.2f}ms  p99 {p99:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
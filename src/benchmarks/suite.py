@@ -0,0 +1,304 @@
+"""
+Engine benchmark suite with a tracked baseline.
+
+Times the engine's hot functions, the board renderers and whole seeded
+games, and reports for each case its throughput (ops/s), per-call latency
+percentiles and the peak memory traced while it runs. Each case is timed in
+--repeats rounds: its ops/s is the best round and its noise how far the
+median round fell short of that. Results are written as JSON and compared
+against a stored baseline: a case whose ops/s drops by more than
+--threshold (a fraction) plus the larger of the two runs' noise is a
+regression and the run exits with status 1. Everything runs headless;
+renders only build the component trees.
+
+Baselines are machine specific: record one on the machine that will run
+the comparisons. From src/:
+
+    python -m benchmarks.suite --save-baseline            # record
+    python -m benchmarks.suite                            # compare
+    python -m benchmarks.suite --quick --filter handle_key_input -o out.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from pathlib import Path
+
+from components.board import render_board, render_mini_board
+from game.constants import BOARD_HEIGHT, BOARD_WIDTH, KEY_ACTIONS
+from game.pieces import PIECE_TABLE
+from game.simulator import hard_drop_policy, simulate_game
+from game.tetris_engine import (
+    apply_game_tick, clear_lines, get_ghost_position, handle_key_input,
+    is_valid_position, lock_piece, start_game,
+)
+
+BASELINE = Path(__file__).with_name("baseline.json")
+THRESHOLD = 0.25
+REPEATS = 5
+
+# a case's setup returns (function, list of argument tuples); the calls cycle
+# through the argument tuples
+Case = namedtuple("Case", ["name", "setup"])
+
+
+# ── Inputs ────────────────────────────────────────────────────────────────────
+
+def _mid_game_states(n=64, seed=0):
+    """States from a seeded hard-drop game, one every few ticks."""
+    rng = random.Random(seed)
+    state = start_game(seed=seed)
+    states = []
+    while len(states) < n:
+        for key in hard_drop_policy(state, rng):
+            state = handle_key_input(state, key)
+        state = apply_game_tick(state)
+        if state["status"] != "running":
+            state = start_game(seed=seed + len(states))
+        if state["tick"] % 3 == 0:
+            states.append(state)
+    return states
+
+
+def _queries(states, n=512, seed=1):
+    rng = random.Random(seed)
+    shapes = list(PIECE_TABLE)
+    return [
+        (
+            rng.choice(states)["board"], rng.choice(shapes),
+            rng.randint(-2, BOARD_WIDTH), rng.randint(0, BOARD_HEIGHT), rng.randint(0, 3),
+        )
+        for _ in range(n)
+    ]
+
+
+# ── Cases ─────────────────────────────────────────────────────────────────────
+
+def _is_valid_position():
+    return is_valid_position, _queries(_mid_game_states())
+
+
+def _get_ghost_position():
+    args = []
+    for state in _mid_game_states():
+        cp = state["current_piece"]
+        args.append((
+            state["board"], cp["shape"], cp["x"], cp["y"], cp["rotation"],
+            state["column_tops"],
+        ))
+    return get_ghost_position, args
+
+
+def _clear_lines():
+    args = []
+    for state in _mid_game_states(16):
+        board = [list(row) for row in state["board"]]
+        board[-1] = [1] * BOARD_WIDTH
+        board[-3] = [2] * BOARD_WIDTH
+        args.append((board,))
+    return clear_lines, args
+
+
+def _lock_piece():
+    args = []
+    for state in _mid_game_states():
+        cp = state["current_piece"]
+        landed = dict(state, current_piece={**cp, "y": get_ghost_position(
+            state["board"], cp["shape"], cp["x"], cp["y"], cp["rotation"],
+        )})
+        args.append((landed,))
+    return lock_piece, args
+
+
+def _key_case(key):
+    def setup():
+        return handle_key_input, [(state, key) for state in _mid_game_states()]
+    return setup
+
+
+def _apply_game_tick():
+    return apply_game_tick, [(state,) for state in _mid_game_states()]
+
+
+def _render_board():
+    return render_board, [(state,) for state in _mid_game_states(16)]
+
+
+def _render_mini_board():
+    return render_mini_board, [(shape,) for shape in [*PIECE_TABLE, None]]
+
+
+def _render_mini_board_uncached():
+    return render_mini_board.__wrapped__, [(shape,) for shape in [*PIECE_TABLE, None]]
+
+
+def _seeded_games():
+    def play(seed):
+        return simulate_game(seed, policy="hard_drop", max_ticks=500)
+    return play, [(seed,) for seed in range(4)]
+
+
+# one case per action (the first key bound to it)
+_ACTION_KEYS = {}
+for _key, _action in KEY_ACTIONS.items():
+    _ACTION_KEYS.setdefault(_action, _key)
+
+CASES = [
+    Case("is_valid_position", _is_valid_position),
+    Case("get_ghost_position", _get_ghost_position),
+    Case("clear_lines", _clear_lines),
+    Case("lock_piece", _lock_piece),
+    *[
+        Case(f"handle_key_input[{action}]", _key_case(key))
+        for action, key in _ACTION_KEYS.items()
+    ],
+    Case("apply_game_tick", _apply_game_tick),
+    Case("render_board", _render_board),
+    Case("render_mini_board", _render_mini_board),
+    Case("render_mini_board[uncached]", _render_mini_board_uncached),
+    Case("seeded_game[hard_drop, 500 ticks]", _seeded_games),
+]
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+
+def measure(fn, args, min_time=0.5, repeats=REPEATS):
+    """
+    Calls fn over args (cycling) in `repeats` rounds of at least
+    min_time / repeats seconds, timing each call, then once more under
+    tracemalloc. Returns the case's result dict.
+    """
+    for a in args:                                   # warm up
+        fn(*a)
+    timer = time.perf_counter_ns
+    samples = []
+    rates = []
+    for _ in range(repeats):
+        first = len(samples)
+        deadline = time.perf_counter() + min_time / repeats
+        while time.perf_counter() < deadline:
+            for a in args:
+                start = timer()
+                fn(*a)
+                samples.append(timer() - start)
+        rates.append((len(samples) - first) / (sum(samples[first:]) / 1e9))
+
+    tracemalloc.start()
+    try:
+        for a in args:
+            fn(*a)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "calls":       len(samples),
+        "ops_per_sec": max(rates),
+        "noise":       1 - statistics.median(rates) / max(rates),
+        "p50_us":      cuts[49] / 1e3,
+        "p95_us":      cuts[94] / 1e3,
+        "p99_us":      cuts[98] / 1e3,
+        "peak_kib":    peak / 1024,
+    }
+
+
+def run_suite(cases=CASES, min_time=0.5, name_filter=None, repeats=REPEATS):
+    results = {}
+    for case in cases:
+        if name_filter and name_filter not in case.name:
+            continue
+        fn, args = case.setup()
+        results[case.name] = measure(fn, args, min_time, repeats)
+    return {
+        "meta": {
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "machine":  platform.machine(),
+            "time":     time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "min_time": min_time,
+            "repeats":  repeats,
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Returns (name, baseline ops/s, ops/s, change) for every case present in
+    both whose ops/s fell by more than `threshold` (0.25 = 25 %) plus the
+    larger noise of the two runs.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        noise = max(result.get("noise", 0), base.get("noise", 0))
+        if change < -(threshold + noise):
+            regressions.append((name, base["ops_per_sec"], result["ops_per_sec"], change))
+    return regressions
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+
+def print_report(results, baseline=None):
+    base = baseline["results"] if baseline else {}
+    print(f"{'case':<36} {'ops/s':>12} {'noise':>6} {'p50 us':>9} {'p95 us':>9} "
+          f"{'p99 us':>9} {'peak KiB':>9} {'vs base':>8}")
+    for name, r in results["results"].items():
+        vs = ""
+        if name in base:
+            vs = f"{r['ops_per_sec'] / base[name]['ops_per_sec'] - 1:+.0%}"
+        print(f"{name:<36} {r['ops_per_sec']:>12,.0f} {r.get('noise', 0):>6.0%} "
+              f"{r['p50_us']:>9.2f} {r['p95_us']:>9.2f} {r['p99_us']:>9.2f} "
+              f"{r['peak_kib']:>9.1f} {vs:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output", help="write the results JSON here")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed ops/s drop before a case regresses (fraction), "
+                             "on top of the measured noise")
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help="timing rounds per case; the best one counts")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the baseline")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="short runs (noisier)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(min_time=0.05 if args.quick else 0.5, name_filter=args.filter,
+                        repeats=args.repeats)
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text())
+    print_report(results, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"baseline saved to {baseline_path}")
+        return 0
+    if baseline is None:
+        print(f"no baseline at {baseline_path}; run with --save-baseline first")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after, change in regressions:
+        print(f"REGRESSION {name}: {before:,.0f} -> {after:,.0f} ops/s ({change:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
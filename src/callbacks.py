@@ -1,107 +1,487 @@
-from dash import Input, Output, State, set_props
-from game.tetris_engine import handle_key_input, apply_game_tick, start_game, calculate_speed
-from game.constants import STATE_RUNNING, STATE_PAUSED, INITIAL_SPEED_MS
-from components.board import render_board, render_mini_board
+from contextlib import nullcontext
+from functools import lru_cache
+
+from dash import ClientsideFunction, Input, Output, State, no_update, set_props
+from game.compact import decode_state, encode_state
+from game.tetris_engine import batch_keys, start_game, calculate_speed
+from game.constants import (
+    STATE_RUNNING, STATE_PAUSED, STATE_OVER, INITIAL_SPEED_MS, STATE_STORAGE,
+    GAME_LOOP, RENDER_MODE, ZOBRIST_HASHING, INPUT_MODE, STATE_CODEC,
+)
+from components.board import (
+    encode_canvas_frame, render_board, render_board_patch, render_mini_board,
+)
+from server.clientside import validate_checkpoint
+from server.metrics import instrument_app
+from server.profiling import PAUSE_KEY, PROFILES, profiled, profiling_requested
+from server.serving import batch_step, key_step, run_engine, tick_step
+from server.session_store import create_session_store
+
+# server-side states: the live game with STATE_STORAGE == "server", the last
+# validated checkpoint with GAME_LOOP == "clientside"
+SESSIONS = (
+    create_session_store()
+    if STATE_STORAGE == "server" or GAME_LOOP == "clientside"
+    else None
+)
+
+
+# ── State transport ───────────────────────────────────────────────────────────
+# The server loop splits the state over two stores. game-hot holds the
+# HOT_FIELDS, which change on nearly every key press and tick; game-state
+# holds the rest (board, score, pieces, generator...) and is only written
+# when one of those changes: on a lock, clear, hold, pause or new game.
+# A move or a gravity step therefore ships the falling piece and nothing else.
+#
+# That split is for "client" storage, where the state itself crosses the
+# wire. In "server" storage game-state is {"session": id, "rev": n}: the
+# state stays in SESSIONS and only the id crosses the wire, so it is written
+# on every save (`rev` changes so the render callbacks still fire) and
+# game-hot is never used. Neither is it with the clientside loop, which keeps
+# the whole state in game-state.
+#
+# With STATE_CODEC = "compact", client storage writes game-state as an
+# encode_state() string of the whole state (game-hot, still JSON, overrides
+# its hot fields).
+
+HOT_FIELDS = ("current_piece", "tick")
+
+# a game-state blob is read by the renderers and the next key or tick alike,
+# so it is decoded once; states are never mutated, so sharing them is safe
+_decode_state = lru_cache(maxsize=256)(decode_state)
+
+
+def load_state(data, hot=None):
+    """Returns the game state behind the game-state and game-hot payloads (or None)."""
+    if STATE_STORAGE != "server":
+        if isinstance(data, str):
+            data = _decode_state(data)
+        if not data or not hot:
+            return data
+        return {**data, **hot}
+    if not data or not data.get("session"):
+        return None
+    return SESSIONS.get(data["session"])
+
+
+def _changed(state, previous, fields):
+    return any(
+        state.get(field) is not previous.get(field)
+        and state.get(field) != previous.get(field)
+        for field in fields
+    )
+
+
+def save_state(data, state, previous=None):
+    """
+    Stores state and returns the (game-state, game-hot) payloads. In
+    "client" storage either is no_update when none of its fields changed
+    since `previous`, the state it was loaded from (None writes both).
+    """
+    if STATE_STORAGE == "server":
+        sid = data.get("session") if data else None
+        rev = data.get("rev", 0) if data else 0
+        return {"session": SESSIONS.put(sid, state), "rev": rev + 1}, no_update
+
+    hot, cold = no_update, no_update
+    if previous is None or _changed(state, previous, HOT_FIELDS):
+        hot = {field: state[field] for field in HOT_FIELDS}
+    cold_fields = [field for field in state if field not in HOT_FIELDS]
+    if previous is None or _changed(state, previous, cold_fields):
+        if STATE_CODEC == "compact":
+            cold = encode_state(state)
+        else:
+            cold = {field: state[field] for field in cold_fields}
+    return cold, hot
+
+
+def session_id(data):
+    """The server session behind a game-state payload; None in client storage."""
+    if STATE_STORAGE != "server" or not data:
+        return None
+    return data.get("session")
+
+
+def session_lock(data):
+    """
+    Serializes the callbacks of one server-side session, which may run in
+    parallel request threads (see server/serving.py). Client storage needs
+    no lock: each request carries its own copy of the state.
+    """
+    sid = session_id(data)
+    if not sid:
+        return nullcontext()
+    return SESSIONS.lock(sid)
+
+
+def new_game(data, state, search=None, demo=False):
+    """
+    Saves a freshly started game in place of the one in `data`, and profiles
+    it if the page asked for that (see server/profiling.py).
+    """
+    PROFILES.stop(load_state(data), session_id(data))
+    cold, hot = save_state(data, state)
+    if profiling_requested(search):
+        PROFILES.start(state, session=session_id(cold), demo=demo)
+    return cold, hot
+
+
+def panel_fields(state):
+    """The fields the side panels show, in panel order, as stored in panel-state."""
+    return [
+        state["next_piece"], state.get("held_piece"),
+        state["score"], state["level"], state["lines_cleared"],
+    ]
 
 
 def register_callbacks(app):
+    app = instrument_app(app)   # the app itself unless METRICS_ENABLED
+    if GAME_LOOP == "clientside":
+        if STATE_STORAGE == "server":
+            raise ValueError('GAME_LOOP = "clientside" needs STATE_STORAGE = "client"')
+        if ZOBRIST_HASHING:
+            raise ValueError('GAME_LOOP = "clientside" cannot keep ZOBRIST_HASHING')
+        if INPUT_MODE == "batch":
+            raise ValueError('INPUT_MODE = "batch" needs GAME_LOOP = "server"')
+        if STATE_CODEC == "compact":
+            raise ValueError('STATE_CODEC = "compact" needs GAME_LOOP = "server"')
+        register_clientside_loop(app)
+    else:
+        register_server_loop(app)
+    register_renderers(app)
+
+
+def register_server_loop(app):
 
     # ── Start / Restart ───────────────────────────────────────────────────────
 
     @app.callback(
         Output("game-state", "data"),
+        Output("game-hot", "data"),
         Input("start-btn", "n_clicks"),
         Input("restart-btn", "n_clicks"),
+        State("game-state", "data"),
+        State("url", "search"),
         prevent_initial_call=True,
     )
-    def on_start_restart(start_clicks, restart_clicks):
+    def on_start_restart(start_clicks, restart_clicks, data, search=None):
         state = start_game()
         #enable dcc.interval
         set_props("game-tick", {"disabled": False})
-        return state
+        set_props("demo-mode", {"data": False})
+        with session_lock(data):
+            return new_game(data, state, search)
+
+
+    # ── Demo mode ─────────────────────────────────────────────────────────────
+
+    @app.callback(
+        Output("game-state", "data"),
+        Output("game-hot", "data"),
+        Output("demo-mode", "data"),
+        Input("demo-btn", "n_clicks"),
+        State("game-state", "data"),
+        State("url", "search"),
+        prevent_initial_call=True,
+    )
+    def on_demo(n_clicks, data, search=None):
+        # a fresh game that the autoplayer plays on each tick
+        set_props("game-tick", {"disabled": False})
+        with session_lock(data):
+            return *new_game(data, start_game(), search, demo=True), True
 
 
     # ── Pause button ──────────────────────────────────────────────────────────
 
     @app.callback(
         Output("game-state", "data"),
+        Output("game-hot", "data"),
         Output("game-tick", "disabled"),
         Input("pause-btn", "n_clicks"),
         State("game-state", "data"),
+        State("game-hot", "data"),
         prevent_initial_call=True,
     )
-    def on_pause(n_clicks, state):
-        if not state:
-            return state, True
-        if state["status"] == STATE_RUNNING:
-            state["status"] = STATE_PAUSED
-            return state, True
-        elif state["status"] == STATE_PAUSED:
-            state["status"] = STATE_RUNNING
-            return state, False
-        return state, True
+    def on_pause(n_clicks, data, hot=None):
+        with session_lock(data):
+            state = load_state(data, hot)
+            if not state:
+                return no_update, no_update, True
+            PROFILES.record(state, [PAUSE_KEY], session_id(data))
+            if state["status"] == STATE_RUNNING:
+                paused = {**state, "status": STATE_PAUSED}
+                return *save_state(data, paused, state), True
+            elif state["status"] == STATE_PAUSED:
+                running = {**state, "status": STATE_RUNNING}
+                return *save_state(data, running, state), False
+            return no_update, no_update, True
 
 
     # ── Keyboard ──────────────────────────────────────────────────────────────
+    # "event" input: one request per keydown. "batch" input: key events stay in
+    # the browser (assets/input_buffer.js), which sends one input-batch per
+    # window, played in one go by apply_key_batch.
+
+    if INPUT_MODE == "batch":
+        app.clientside_callback(
+            ClientsideFunction(namespace="input", function_name="buffer"),
+            Output("input-batch", "data"),
+            Input("keyboard", "event"),
+            State("input-config", "data"),
+            prevent_initial_call=True,
+        )
+
+        @app.callback(
+            Output("game-state", "data"),
+            Output("game-hot", "data"),
+            Input("input-batch", "data"),
+            State("game-state", "data"),
+            State("game-hot", "data"),
+            prevent_initial_call=True,
+        )
+        def on_key_batch(batch, data, hot=None):
+            with session_lock(data):
+                state = load_state(data, hot)
+                if batch and state:
+                    with profiled(state, batch_keys(batch), session_id(data)):
+                        new_state = run_engine(batch_step, state, batch)
+                    return save_state(data, new_state, state)
+                return no_update, no_update
+
+    else:
+
+        @app.callback(
+            Output("game-state", "data"),
+            Output("game-hot", "data"),
+            Input("keyboard", "event"),
+            State("game-state", "data"),
+            State("game-hot", "data"),
+            prevent_initial_call=True,
+        )
+        def on_key(event, data, hot=None):
+            with session_lock(data):
+                state = load_state(data, hot)
+                if event and state:
+                    with profiled(state, [event["key"]], session_id(data)):
+                        new_state = run_engine(key_step, state, event["key"])
+                    return save_state(data, new_state, state)
+                return no_update, no_update
+
+
+    # ── Game tick ─────────────────────────────────────────────────────────────
 
     @app.callback(
         Output("game-state", "data"),
-        Input("keyboard", "event"),
+        Output("game-hot", "data"),
+        Output("game-tick", "interval"),
+        Input("game-tick", "n_intervals"),
         State("game-state", "data"),
+        State("game-hot", "data"),
+        State("demo-mode", "data"),
         prevent_initial_call=True,
     )
-    def on_key(event, state):
-        if event and state:
-            return handle_key_input(state, event["key"])
-        return state
+    def on_tick(n_intervals, data, hot=None, demo=False):
+        with session_lock(data):
+            previous = load_state(data, hot)
+            if not previous:
+                return no_update, no_update, INITIAL_SPEED_MS
+            with profiled(previous, [None], session_id(data)):
+                state = run_engine(tick_step, previous, demo)
+            if state["status"] == STATE_OVER:
+                PROFILES.stop(state, session_id(data))
+            speed = calculate_speed(state["level"])
+            return *save_state(data, state, previous), speed
 
 
-    # ── Game tick ─────────────────────────────────────────────────────────────
+def register_clientside_loop(app):
+    """
+    Gravity and input run in the browser (assets/tetris_engine.js); the
+    server only starts games and validates checkpoints.
+    """
+
+    # ── Start / Restart ───────────────────────────────────────────────────────
 
     @app.callback(
+        Output("game-state", "data"),
+        Output("session-id", "data"),
+        Output("input-log", "data"),
+        Input("start-btn", "n_clicks"),
+        Input("restart-btn", "n_clicks"),
+        prevent_initial_call=True,
+    )
+    def on_start_restart(start_clicks, restart_clicks):
+        state = start_game()
+        set_props("game-tick", {"disabled": False})
+        return state, SESSIONS.put(None, state), []
+
+
+    # ── Checkpoint validation ─────────────────────────────────────────────────
+
+    @app.callback(
+        Output("game-state", "data"),
+        Output("input-log", "data"),
+        Output("checkpoint-status", "data"),
+        Input("checkpoint", "data"),
+        prevent_initial_call=True,
+    )
+    def on_checkpoint(checkpoint):
+        sid = checkpoint.get("session") if checkpoint else None
+        authoritative = SESSIONS.get(sid) if sid else None
+        if authoritative is None:
+            return no_update, no_update, {"ok": False, "reason": "unknown session"}
+        ok, replayed = validate_checkpoint(authoritative, checkpoint)
+        SESSIONS.put(sid, replayed)
+        status = {"ok": ok, "tick": replayed["tick"], "score": replayed["score"]}
+        if ok:
+            return no_update, no_update, status
+        # the client drifted: push the replayed state back and restart its log
+        return replayed, [], status
+
+
+    # ── Ticks, keys and the pause button run clientside ───────────────────────
+
+    loop_state = [
+        State("game-state", "data"),
+        State("input-log", "data"),
+        State("session-id", "data"),
+        State("engine-config", "data"),
+    ]
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="tetris", function_name="tick"),
         Output("game-state", "data"),
         Output("game-tick", "interval"),
+        Output("input-log", "data"),
+        Output("checkpoint", "data"),
         Input("game-tick", "n_intervals"),
-        State("game-state", "data"),
+        *loop_state,
         prevent_initial_call=True,
     )
-    def on_tick(n_intervals, state):
-        if not state:
-            return state, INITIAL_SPEED_MS
-        state = apply_game_tick(state)
-        speed = calculate_speed(state["level"])
-        return state, speed
 
+    app.clientside_callback(
+        ClientsideFunction(namespace="tetris", function_name="key"),
+        Output("game-state", "data"),
+        Output("input-log", "data"),
+        Output("checkpoint", "data"),
+        Input("keyboard", "event"),
+        *loop_state,
+        prevent_initial_call=True,
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="tetris", function_name="pause"),
+        Output("game-state", "data"),
+        Output("game-tick", "disabled"),
+        Output("input-log", "data"),
+        Output("checkpoint", "data"),
+        Input("pause-btn", "n_clicks"),
+        *loop_state,
+        prevent_initial_call=True,
+    )
+
+
+def register_renderers(app):
 
     # ── Render board ──────────────────────────────────────────────────────────
 
-    @app.callback(
-        Output("board-container", "children"),
-        Input("game-state", "data"),
-    )
-    def render(state):
-        if not state or state["status"] == "idle":
-            return []
-        return render_board(state)
+    if RENDER_MODE == "patch":
+
+        @app.callback(
+            Output("board-container", "children"),
+            Output("board-frame", "data"),
+            Input("game-state", "data"),
+            Input("game-hot", "data"),
+            State("board-frame", "data"),
+        )
+        def render(data, hot, frame):
+            state = load_state(data, hot)
+            if not state or state["status"] == "idle":
+                return [], None
+            with profiled(state, session=session_id(data)):
+                return render_board_patch(state, frame)
+
+    elif RENDER_MODE == "canvas":
+        # the canvas is painted client side; with the clientside game loop
+        # the frame is even built there, so rendering needs no server at all
+        if GAME_LOOP == "clientside":
+            app.clientside_callback(
+                ClientsideFunction(namespace="board", function_name="paintState"),
+                Output("board-canvas", "className"),
+                Input("game-state", "data"),
+                State("board-palette", "data"),
+                State("engine-config", "data"),
+            )
+        else:
+
+            @app.callback(
+                Output("board-frame", "data"),
+                Input("game-state", "data"),
+                Input("game-hot", "data"),
+            )
+            def render(data, hot=None):
+                state = load_state(data, hot)
+                if not state or state["status"] == "idle":
+                    return None
+                with profiled(state, session=session_id(data)):
+                    return encode_canvas_frame(state)
+
+            app.clientside_callback(
+                ClientsideFunction(namespace="board", function_name="paint"),
+                Output("board-canvas", "className"),
+                Input("board-frame", "data"),
+                State("board-palette", "data"),
+            )
+
+    else:
+
+        @app.callback(
+            Output("board-container", "children"),
+            Input("game-state", "data"),
+            Input("game-hot", "data"),
+        )
+        def render(data, hot=None):
+            state = load_state(data, hot)
+            if not state or state["status"] == "idle":
+                return []
+            with profiled(state, session=session_id(data)):
+                return render_board(state)
 
 
     # ── Render side panels ────────────────────────────────────────────────────
 
+    # the panels only show cold fields, so they ignore game-hot; panel-state
+    # keeps the fields they were last rendered from, so only the panels whose
+    # field changed are sent again
+
     @app.callback(
         Output("next-piece-display", "children"),
         Output("held-piece-display", "children"),
         Output("score-display", "children"),
         Output("level-display", "children"),
         Output("lines-display", "children"),
+        Output("panel-state", "data"),
         Input("game-state", "data"),
+        State("panel-state", "data"),
     )
-    def update_ui(state):
+    def update_ui(data, panel=None):
+        state = load_state(data)
         if not state:
-            return [], [], "0", "1", "0"
-        return (
-            render_mini_board(state["next_piece"]),
-            render_mini_board(state.get("held_piece")),
-            str(state["score"]),
-            str(state["level"]),
-            str(state["lines_cleared"]),
-        )
+            return [], [], "0", "1", "0", None
+        fields = panel_fields(state)
+        if fields == panel:
+            return (no_update,) * 6
+        next_piece, held_piece, score, level, lines = fields
+        with profiled(state, session=session_id(data)):
+            outputs = (
+                render_mini_board(next_piece),
+                render_mini_board(held_piece),
+                str(score),
+                str(level),
+                str(lines),
+            )
+        if panel:
+            outputs = tuple(
+                no_update if new == old else output
+                for output, new, old in zip(outputs, fields, panel)
+            )
+        return (*outputs, fields)
@@ -1,8 +1,24 @@
-from dash import html
-from game.constants import COLORS, BOARD_WIDTH, BOARD_HEIGHT, CELL_SIZE
-from game.tetris_engine import get_piece_matrix, get_ghost_position
+from functools import lru_cache
 
+from dash import Patch, html, no_update
+from game.constants import COLORS, BOARD_WIDTH, BOARD_HEIGHT, CELL_SIZE, PIECE_IDS
+from game.pieces import PIECE_TABLE
+from game.tetris_engine import get_piece_orientation, get_ghost_position
 
+# ── Render cache ──────────────────────────────────────────────────────────────
+# A cell or a piece preview depends only on its (hashable, immutable) inputs,
+# so each distinct component tree is built once and then shared. Dash only
+# reads components when serializing a response, so handing out the same
+# instance every time is safe — callers must not mutate what they get back.
+
+
+def clear_render_cache():
+    """Drops every memoized component (e.g. after COLORS is changed in tests)."""
+    render_cell.cache_clear()
+    render_mini_board.cache_clear()
+
+
+@lru_cache(maxsize=None)
 def render_cell(color_id, is_ghost=False):
     """Returns a single colored cell div."""
     color = COLORS.get("ghost") if is_ghost else COLORS.get(color_id, COLORS[0])
@@ -16,26 +32,38 @@ def render_cell(color_id, is_ghost=False):
     })
 
 
-def render_board(state):
+def board_with_piece(state):
     """
-    Renders the full 10x8 game board as a grid of divs.
+    Returns the board rows with the current piece drawn in. Only the rows the
+    piece covers are copied; the others are the state's own rows.
     """
-    import copy
-    board = copy.deepcopy(state["board"])
+    board = list(state["board"])
     cp    = state["current_piece"]
+    orientation = get_piece_orientation(cp["shape"], cp["rotation"])
+
+    for row_i, col_i in orientation.cells:
+        px = cp["x"] + col_i
+        py = cp["y"] + row_i
+        if 0 <= px < BOARD_WIDTH and 0 <= py < BOARD_HEIGHT:
+            if board[py] is state["board"][py]:
+                board[py] = list(board[py])
+            board[py][px] = cp["color_id"]
+    return board
 
-    # ── Overlay current piece ─────────────────────────────────────────────────
-    piece_cells = set()
-    piece_matrix = get_piece_matrix(cp["shape"], cp["rotation"])
 
-    for row_i, row in enumerate(piece_matrix):
-        for col_i, cell in enumerate(row):
-            if cell:
-                px = cp["x"] + col_i
-                py = cp["y"] + row_i
-                if 0 <= px < BOARD_WIDTH and 0 <= py < BOARD_HEIGHT:
-                    piece_cells.add((py, px))
-                    board[py][px] = cp["color_id"]
+def encode_frame(state):
+    """
+    Encodes what the board shows as one character per cell (the COLORS id),
+    row by row — BOARD_HEIGHT * BOARD_WIDTH characters in all.
+    """
+    return "".join(str(cell) for row in board_with_piece(state) for cell in row)
+
+
+def render_board(state):
+    """
+    Renders the full 10x8 game board as a grid of divs.
+    """
+    board = board_with_piece(state)
 
     # ── Build rows of divs ────────────────────────────────────────────────────
     rows = []
@@ -55,27 +83,98 @@ def render_board(state):
     )
 
 
+def render_board_patch(state, previous_frame):
+    """
+    Incremental render for RENDER_MODE = "patch". Returns (children, frame):
+    a dash Patch recoloring only the cells that differ from previous_frame
+    (the encode_frame of the last render), or the full board when there is
+    no usable previous frame.
+    """
+    frame = encode_frame(state)
+    if not previous_frame or len(previous_frame) != len(frame):
+        return render_board(state), frame
+    if previous_frame == frame:
+        return no_update, no_update
+
+    patch = Patch()
+    rows = patch["props"]["children"]
+    for i, (old, new) in enumerate(zip(previous_frame, frame)):
+        if old != new:
+            row_i, col_i = divmod(i, BOARD_WIDTH)
+            cell = rows[row_i]["props"]["children"][col_i]
+            cell["props"]["style"]["backgroundColor"] = COLORS.get(int(new), COLORS[0])
+    return patch, frame
+
+
+# ── Canvas renderer ───────────────────────────────────────────────────────────
+# RENDER_MODE = "canvas" ships a compact frame instead of components, and
+# assets/board_canvas.js paints it onto one <canvas>:
+#   cells : one character per board cell (the COLORS id), row by row
+#   piece : [color_id, flat index, ...] of the falling piece
+#   ghost : [flat index, ...] where a hard drop would land it
+# A flat index is row * BOARD_WIDTH + col.
+
+def encode_canvas_frame(state):
+    """Returns the compact canvas frame for a state."""
+    cp = state["current_piece"]
+    orientation = get_piece_orientation(cp["shape"], cp["rotation"])
+    ghost_y = get_ghost_position(
+        state["board"], cp["shape"], cp["x"], cp["y"], cp["rotation"],
+        state.get("column_tops"),
+    )
+
+    def flat(y):
+        return [
+            (y + row_i) * BOARD_WIDTH + cp["x"] + col_i
+            for row_i, col_i in orientation.cells
+            if 0 <= y + row_i < BOARD_HEIGHT
+        ]
+
+    return {
+        "cells": "".join(str(cell) for row in state["board"] for cell in row),
+        "piece": [cp["color_id"]] + flat(cp["y"]),
+        "ghost": flat(ghost_y),
+    }
+
+
+def canvas_palette():
+    """Colors and geometry the canvas painter needs; sent once with the layout."""
+    return {
+        "colors": {str(k): v for k, v in COLORS.items() if isinstance(k, int)},
+        "ghost":  COLORS["ghost"],
+        "grid":   COLORS["grid"],
+        "cell":   CELL_SIZE,
+        "width":  BOARD_WIDTH,
+        "height": BOARD_HEIGHT,
+    }
+
+
+def render_canvas():
+    """The single canvas element the board is painted on."""
+    return html.Canvas(
+        id="board-canvas",
+        width=BOARD_WIDTH * CELL_SIZE,
+        height=BOARD_HEIGHT * CELL_SIZE,
+    )
+
+
+@lru_cache(maxsize=None)
 def render_mini_board(shape, label=""):
     """
     Renders a small 4x4 preview grid for NEXT and HOLD panels.
     Pass shape=None to render an empty panel.
     """
-    from game.pieces import TETROMINOES
-    from game.constants import PIECE_IDS
-
     MINI_SIZE = 25
     grid = [[0] * 4 for _ in range(4)]
 
     if shape:
-        matrix = TETROMINOES[shape]
+        orientation = PIECE_TABLE[shape][0]
         color_id = PIECE_IDS[shape]
         # center the piece in the 4x4 grid
-        offset_r = (4 - len(matrix)) // 2
-        offset_c = (4 - len(matrix[0])) // 2
-        for r, row in enumerate(matrix):
-            for c, cell in enumerate(row):
-                if cell:
-                    grid[r + offset_r][c + offset_c] = color_id
+        offset_r = (4 - orientation.height) // 2
+        offset_c = (4 - orientation.width) // 2
+        for r, c in orientation.cells:
+            grid[r + offset_r][c + offset_c] = color_id
 
     rows = []
     for row in grid:
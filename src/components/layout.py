@@ -1,6 +1,12 @@
 from dash import dcc, html
 from dash_extensions import EventListener
-from game.constants import INITIAL_GAME_STATE, INITIAL_SPEED_MS
+from game.constants import (
+    INITIAL_GAME_STATE, INITIAL_SPEED_MS, STATE_STORAGE, GAME_LOOP, RENDER_MODE,
+    INPUT_MODE, INPUT_BATCH_MS, ARR_MS, KEY_ACTIONS, REPEAT_ACTIONS, STATE_CODEC,
+)
+from components.board import canvas_palette, render_canvas
+from game.compact import encode_state
+from server.clientside import engine_config
 
 
 def create_layout():
@@ -9,7 +15,15 @@ def create_layout():
         children=[
 
             # ── Stores ───────────────────────────────────────────────────────
-            dcc.Store(id="game-state", data=INITIAL_GAME_STATE),
+            dcc.Store(id="game-state", data=_initial_store_data()),
+            dcc.Store(id="game-hot"),
+            dcc.Store(id="panel-state"),
+            *_clientside_stores(),
+            *_demo_stores(),
+            *_input_stores(),
+            *_render_stores(),
+            # page URL; ?profile=1 profiles this player's games (server loop)
+            dcc.Location(id="url", refresh=False),
 
             # ── Ticker ───────────────────────────────────────────────────────
             dcc.Interval(
@@ -20,10 +34,7 @@ def create_layout():
             ),
 
             # ── Keyboard listener ─────────────────────────────────────────────
-            EventListener(
-                id="keyboard",
-                events=[{"event": "keydown", "props": ["key", "code"]}],
-            ),
+            EventListener(id="keyboard", events=_keyboard_events()),
 
             # ── Game wrapper ──────────────────────────────────────────────────
             html.Div(
@@ -41,6 +52,75 @@ def create_layout():
 # ── Private helpers ───────────────────────────────────────────────────────────
 # These are only used inside this file, hence the underscore prefix.
 
+def _initial_store_data():
+    # with server-side sessions the store only ever holds a session reference
+    if STATE_STORAGE == "server":
+        return {"session": None, "rev": 0}
+    if STATE_CODEC == "compact":
+        return encode_state(INITIAL_GAME_STATE)
+    return INITIAL_GAME_STATE
+
+
+def _render_stores():
+    # patch: the last frame the browser painted, diffed against on render
+    # canvas: the frame to paint, and the palette to paint it with
+    if RENDER_MODE == "patch":
+        return [dcc.Store(id="board-frame")]
+    if RENDER_MODE == "canvas":
+        return [
+            dcc.Store(id="board-frame"),
+            dcc.Store(id="board-palette", data=canvas_palette()),
+        ]
+    return []
+
+
+def _clientside_stores():
+    # stores the browser-side game loop reads and writes (see callbacks.py)
+    if GAME_LOOP != "clientside":
+        return []
+    return [
+        dcc.Store(id="engine-config", data=engine_config()),
+        dcc.Store(id="session-id"),
+        dcc.Store(id="input-log", data=[]),
+        dcc.Store(id="checkpoint"),
+        dcc.Store(id="checkpoint-status"),
+    ]
+
+
+def _demo_stores():
+    # demo mode: the autoplayer (game/autoplayer.py) plays on every server tick
+    if GAME_LOOP != "server":
+        return []
+    return [dcc.Store(id="demo-mode", data=False)]
+
+
+def _keyboard_events():
+    # batch: assets/input_buffer.js needs releases and timestamps too
+    if INPUT_MODE != "batch":
+        return [{"event": "keydown", "props": ["key", "code"]}]
+    props = ["key", "code", "type", "repeat", "timeStamp"]
+    return [{"event": "keydown", "props": props}, {"event": "keyup", "props": props}]
+
+
+def _input_stores():
+    # batch: what the input buffer needs, and the batches it sends
+    if INPUT_MODE != "batch":
+        return []
+    config = {
+        "window_ms":      INPUT_BATCH_MS,
+        "arr_ms":         ARR_MS,
+        "key_actions":    dict(KEY_ACTIONS),
+        "repeat_actions": list(REPEAT_ACTIONS),
+    }
+    return [dcc.Store(id="input-config", data=config), dcc.Store(id="input-batch")]
+
+
+def _demo_button():
+    if GAME_LOOP != "server":
+        return []
+    return [html.Button("DEMO", id="demo-btn", n_clicks=0)]
+
+
 def _left_panel():
     return html.Div(
         id="left-panel",
@@ -55,7 +135,10 @@ def _board_panel():
     return html.Div(
         id="board-panel",
         children=[
-            html.Div(id="board-container"),       # updated by callback
+            html.Div(
+                id="board-container",             # updated by callback
+                children=render_canvas() if RENDER_MODE == "canvas" else [],
+            ),
             html.Div(
                 id="game-overlay",                # shown on pause / game over
                 children=[],
@@ -84,5 +167,6 @@ def _right_panel():
             html.Button("START",  id="start-btn",  n_clicks=0),
             html.Button("PAUSE",  id="pause-btn",  n_clicks=0),
             html.Button("RESTART",id="restart-btn",n_clicks=0),
+            *_demo_button(),
         ]
     )
@@ -0,0 +1,181 @@
+import mmap
+import struct
+from collections import namedtuple
+
+from game.replay import Replay, apply_event, decode_replay
+from game.tetris_engine import calculate_score
+
+# ── Replay archive ────────────────────────────────────────────────────────────
+# Packs many replay logs (game/replay.py) into one file that is read through
+# mmap, so scanning hundreds of thousands of games never loads the archive
+# into memory: the OS pages in only the bytes that are touched.
+#
+# Layout:
+#   MAGIC, VERSION byte
+#   replay logs, back to back
+#   index : one fixed-size ENTRY record per game, in insertion order
+#   footer: index offset, game count (FOOTER), MAGIC
+#
+# The index keeps each game's id, seed, final score and where its log sits,
+# so filtering by score or seed never touches the logs themselves.
+
+MAGIC = b"TRAR"
+VERSION = 1
+
+ENTRY = struct.Struct("<QIqQI")     # game_id, seed, score, offset, length
+FOOTER = struct.Struct("<QQ")       # index offset, game count
+
+IndexEntry = namedtuple("IndexEntry", ["game_id", "seed", "score", "offset", "length"])
+
+
+class ArchiveWriter:
+    """
+    Appends replay logs to a new archive; close() (or leaving the `with`
+    block) writes the index. Scores are taken from a replay of each log
+    unless the caller already knows them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]))
+        self._offset = len(MAGIC) + 1
+        self._entries = []
+
+    def add(self, game_id, replay, score=None):
+        header, _ = decode_replay(replay)
+        if score is None:
+            score = Replay(replay).final_state()["score"]
+        self._file.write(replay)
+        self._entries.append(
+            IndexEntry(game_id, header["seed"], score, self._offset, len(replay))
+        )
+        self._offset += len(replay)
+
+    def close(self):
+        if self._file.closed:
+            return
+        for entry in self._entries:
+            self._file.write(ENTRY.pack(*entry))
+        self._file.write(FOOTER.pack(self._offset, len(self._entries)) + MAGIC)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_archive(path, games):
+    """Writes (game_id, replay) or (game_id, replay, score) tuples to path."""
+    with ArchiveWriter(path) as writer:
+        for game in games:
+            writer.add(*game)
+
+
+class Archive:
+    """Read-only, memory-mapped view of an archive written by ArchiveWriter."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC or self._map[-len(MAGIC):] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a replay archive")
+        if self._map[len(MAGIC)] != VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported archive version {self._map[len(MAGIC)]}")
+        footer_at = len(self._map) - len(MAGIC) - FOOTER.size
+        self._index_offset, self._count = FOOTER.unpack_from(self._map, footer_at)
+        self._by_id = None
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    # ── Index ─────────────────────────────────────────────────────────────────
+
+    def entry(self, i):
+        """Returns the i-th IndexEntry."""
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return IndexEntry(*ENTRY.unpack_from(self._map, self._index_offset + i * ENTRY.size))
+
+    def entries(self):
+        for i in range(self._count):
+            yield self.entry(i)
+
+    def find(self, game_id):
+        """Returns the IndexEntry of a game id (KeyError if absent)."""
+        if self._by_id is None:
+            # game_id -> position; built once, on the first lookup
+            self._by_id = {entry.game_id: i for i, entry in enumerate(self.entries())}
+        return self.entry(self._by_id[game_id])
+
+    def replay_bytes(self, entry):
+        """The game's log; only its own bytes are read from the mapping."""
+        return self._map[entry.offset:entry.offset + entry.length]
+
+    # ── Streaming ─────────────────────────────────────────────────────────────
+
+    def games(self, min_score=None, seed=None):
+        """Yields (entry, replay log) for the games matching the filters."""
+        for entry in self.entries():
+            if min_score is not None and entry.score < min_score:
+                continue
+            if seed is not None and entry.seed != seed:
+                continue
+            yield entry, self.replay_bytes(entry)
+
+    def lock_events(self, entry):
+        """
+        Re-simulates one game and yields a dict per locked piece: game_id,
+        tick, shape, lines, level (before the lock), points and score.
+        """
+        replay = Replay(self.replay_bytes(entry))
+        state = replay.initial_state
+        for event in replay.events():
+            before = state
+            state = apply_event(state, event)
+            if state["board"] is not before["board"]:
+                lines = state["lines_cleared"] - before["lines_cleared"]
+                yield {
+                    "game_id": entry.game_id,
+                    "tick":    state["tick"],
+                    "shape":   before["current_piece"]["shape"],
+                    "lines":   lines,
+                    "level":   before["level"],
+                    "points":  calculate_score(lines, before["level"]),
+                    "score":   state["score"],
+                }
+
+    def all_lock_events(self, **filters):
+        for entry, _ in self.games(**filters):
+            yield from self.lock_events(entry)
+
+    # ── Verification ──────────────────────────────────────────────────────────
+
+    def verify(self, entry):
+        """
+        Recomputes a game's score from its line clears with calculate_score
+        and checks it against the index. Returns (ok, recomputed score).
+        """
+        score = sum(lock["points"] for lock in self.lock_events(entry))
+        return score == entry.score, score
+
+    def mismatches(self):
+        """Yields (entry, recomputed score) for every game that fails verify()."""
+        for entry in self.entries():
+            ok, score = self.verify(entry)
+            if not ok:
+                yield entry, score
@@ -0,0 +1,222 @@
+from collections import namedtuple
+
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT, STATE_RUNNING
+from game.pieces import PIECE_TABLE
+from game.tetris_engine import column_tops, spawn_piece
+
+# ── Autoplayer ────────────────────────────────────────────────────────────────
+# Picks where the falling piece goes: every rotation × column it can reach by
+# rotating and shifting at its current row and then hard dropping, for the
+# current piece and — if hold is allowed — for the piece hold would bring in.
+# Each placement is scored with a board heuristic and the best one is turned
+# into the key presses that play it.
+#
+# Nothing here calls is_valid_position. A placement is reachable when the
+# piece's bottom profile stays above the column tops on the way there, and
+# the landing row is read straight off the tops, so evaluating one placement
+# costs a few lookups (plus a rescan only when it clears lines).
+
+# heuristic weights (aggregate height, complete lines, holes, bumpiness)
+WEIGHTS = {
+    "height": -0.510066,
+    "lines": 0.760666,
+    "holes": -0.35663,
+    "bumpiness": -0.184483,
+}
+
+SPAWN_X = spawn_piece(next(iter(PIECE_TABLE)))["x"]
+
+# (col, row) of the highest cell in each column of every orientation; a piece
+# landed above the stack becomes the new top of exactly those columns
+def _top_profile(orientation):
+    top = {}
+    for row, col in orientation.cells:
+        top[col] = min(top.get(col, row), row)
+    return tuple(sorted(top.items()))
+
+
+TOP_PROFILE = {
+    shape: tuple(_top_profile(o) for o in rotations)
+    for shape, rotations in PIECE_TABLE.items()
+}
+
+Placement = namedtuple("Placement", ["hold", "shape", "rotation", "x", "y", "score"])
+
+
+def count_holes(board, tops):
+    """Empty cells below the top of their column."""
+    return sum(
+        1
+        for col in range(BOARD_WIDTH)
+        for row in range(tops[col] + 1, BOARD_HEIGHT)
+        if not board[row][col]
+    )
+
+
+def _surface(tops):
+    heights = [BOARD_HEIGHT - top for top in tops]
+    bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+    return sum(heights), bumpiness
+
+
+def _fits_above(orientation, x, y, tops):
+    """True when the piece at (x, y) is on the board and clear of every column top."""
+    if x + orientation.min_col < 0 or x + orientation.max_col >= BOARD_WIDTH:
+        return False
+    return all(y + row < tops[x + col] for col, row in orientation.bottom)
+
+
+def _landing_row(orientation, x, tops):
+    return min(tops[x + col] - 1 - row for col, row in orientation.bottom)
+
+
+def _rotation_path(start, rotation):
+    """Rotations passed through (and the keys pressed) to get from start to rotation."""
+    turns = (rotation - start) % 4
+    if turns == 3:
+        return [rotation], ["z"]
+    return [(start + i) % 4 for i in range(1, turns + 1)], ["ArrowUp"] * turns
+
+
+class _Evaluator:
+    """
+    Scores placements on one board. The board's holes, height and bumpiness
+    are computed once; a placement that clears no lines only changes the
+    columns under the piece, so its features are updated from those alone.
+    """
+
+    def __init__(self, board, tops=None, weights=WEIGHTS):
+        self.board = board
+        self.tops = tops if tops is not None else column_tops(board)
+        self.weights = weights
+        self.holes = count_holes(board, self.tops)
+        self.height, self.bumpiness = _surface(self.tops)
+        self.row_zeros = [row.count(0) for row in board]
+
+    def score(self, orientation, top_profile, x, y):
+        per_row = {}
+        for row, _ in orientation.cells:
+            per_row[y + row] = per_row.get(y + row, 0) + 1
+        lines = sum(1 for row, n in per_row.items() if self.row_zeros[row] == n)
+
+        if lines:
+            board = self._place(orientation, x, y)
+            tops = column_tops(board)
+            holes = count_holes(board, tops)
+            height, bumpiness = _surface(tops)
+        else:
+            holes, height, bumpiness = self._features(orientation, top_profile, x, y)
+
+        w = self.weights
+        return (
+            w["height"] * height + w["lines"] * lines
+            + w["holes"] * holes + w["bumpiness"] * bumpiness
+        )
+
+    def _features(self, orientation, top_profile, x, y):
+        tops = self.tops
+        holes = self.holes
+        for col, row in orientation.bottom:
+            # empty cells between the piece and the old top get covered
+            holes += tops[x + col] - (y + row) - 1
+        new = list(tops)
+        height = self.height
+        for col, row in top_profile:
+            new[x + col] = y + row
+            height += tops[x + col] - (y + row)
+
+        bumpiness = self.bumpiness
+        first = max(x + orientation.min_col, 1)
+        last = min(x + orientation.max_col + 1, BOARD_WIDTH - 1)
+        for col in range(first, last + 1):      # the pairs (col - 1, col)
+            bumpiness += abs(new[col] - new[col - 1]) - abs(tops[col] - tops[col - 1])
+        return holes, height, bumpiness
+
+    def _place(self, orientation, x, y):
+        board = [list(row) for row in self.board]
+        for row, col in orientation.cells:
+            board[y + row][x + col] = 1
+        kept = [row for row in board if 0 in row]
+        return [[0] * BOARD_WIDTH for _ in range(BOARD_HEIGHT - len(kept))] + kept
+
+
+def placement_keys(x, rotation, target_rotation, target_x):
+    """Keys that rotate a piece at (x, rotation) in place, shift it and hard drop."""
+    _, keys = _rotation_path(rotation, target_rotation)
+    shift = target_x - x
+    keys = keys + (["ArrowLeft"] * -shift if shift < 0 else ["ArrowRight"] * shift)
+    return keys + [" "]
+
+
+def reachable_placements(shape, x, y, rotation, tops):
+    """
+    Yields (rotation, x, landing_y) for every placement of `shape` reachable
+    from (x, y, rotation): rotate in place, shift along row y, hard drop.
+    Rotations with the same cells are only tried once.
+    """
+    rotations = PIECE_TABLE[shape]
+    seen = set()
+    for target in range(4):
+        path, _ = _rotation_path(rotation, target)
+        if not all(_fits_above(rotations[r], x, y, tops) for r in path + [rotation]):
+            continue
+        orientation = rotations[target]
+        if orientation.cells in seen:
+            continue
+        seen.add(orientation.cells)
+        for step in (-1, 1):
+            target_x = x if step < 0 else x + 1
+            while _fits_above(orientation, target_x, y, tops):
+                yield target, target_x, _landing_row(orientation, target_x, tops)
+                target_x += step
+
+
+def enumerate_placements(board, shape, x, y, rotation, tops=None, evaluator=None):
+    """Yields (rotation, x, landing_y, score) for each reachable placement."""
+    evaluator = evaluator or _Evaluator(board, tops)
+    for target, target_x, land in reachable_placements(
+        shape, x, y, rotation, evaluator.tops
+    ):
+        score = evaluator.score(
+            PIECE_TABLE[shape][target], TOP_PROFILE[shape][target], target_x, land
+        )
+        yield target, target_x, land, score
+
+
+def best_placement(state, weights=WEIGHTS):
+    """
+    Returns (Placement, keys) for the best move in a running state, trying
+    hold when allowed, or (None, []) when nothing can be placed.
+    """
+    board = state["board"]
+    evaluator = _Evaluator(board, state.get("column_tops"), weights)
+    cp = state["current_piece"]
+    options = [(False, cp["shape"], cp["x"], cp["y"], cp["rotation"])]
+    if state["can_hold"]:
+        swap = state["held_piece"] or state["next_piece"]
+        options.append((True, swap, SPAWN_X, 0, 0))
+
+    best, start = None, None
+    for hold, shape, x, y, rotation in options:
+        for target, target_x, land, score in enumerate_placements(
+            board, shape, x, y, rotation, evaluator=evaluator
+        ):
+            if best is None or score > best.score:
+                best = Placement(hold, shape, target, target_x, land, score)
+                start = (x, rotation)
+    if best is None:
+        return None, []
+    keys = placement_keys(*start, best.rotation, best.x)
+    return best, (["c"] if best.hold else []) + keys
+
+
+def choose_keys(state, weights=WEIGHTS):
+    """The keys that play the best placement, or [] when not running."""
+    if state["status"] != STATE_RUNNING:
+        return []
+    return best_placement(state, weights)[1]
+
+
+def autoplay_policy(state, rng):
+    """Simulator policy: plays the best placement every tick."""
+    return choose_keys(state)
@@ -0,0 +1,297 @@
+import numpy as np
+
+from game.constants import (
+    BOARD_WIDTH, BOARD_HEIGHT, PIECE_IDS,
+    STATE_IDLE, STATE_RUNNING, STATE_PAUSED, STATE_OVER,
+)
+from game.pieces import PIECE_TABLE
+from game.randomizer import PieceGenerator
+from game.tetris_engine import (
+    calculate_score, calculate_level, random_piece, spawn_piece, start_game,
+)
+
+# ── Vectorized batch engine ───────────────────────────────────────────────────
+# Holds B games as one (B, BOARD_HEIGHT, BOARD_WIDTH) uint8 array plus one
+# array per piece/score field, and applies a tick or an action to every game
+# at once. Rules mirror tetris_engine exactly: BatchGames.from_states(...)
+# followed by the same ticks/actions gives the same states as the scalar
+# apply_game_tick/handle_key_input, game for game.
+#
+# Each game keeps its own PieceGenerator, so piece sequences stay per game and
+# deterministic. States without a generator fall back to random_piece(), drawn
+# in ascending game order like a scalar loop over the batch would.
+
+SHAPE_NAMES = tuple(PIECE_TABLE)
+SHAPE_INDEX = {name: i for i, name in enumerate(SHAPE_NAMES)}
+SHAPE_COLORS = np.array([PIECE_IDS[name] for name in SHAPE_NAMES], dtype=np.uint8)
+
+# (shape, rotation, cell) -> row / col offset; every tetromino has 4 cells
+CELL_ROWS = np.array(
+    [[[r for r, _ in o.cells] for o in PIECE_TABLE[name]] for name in SHAPE_NAMES],
+    dtype=np.int32,
+)
+CELL_COLS = np.array(
+    [[[c for _, c in o.cells] for o in PIECE_TABLE[name]] for name in SHAPE_NAMES],
+    dtype=np.int32,
+)
+
+# points for 0..4 lines at level 1, taken from calculate_score
+SCORE_LOOKUP = np.array([calculate_score(n, 1) for n in range(5)], dtype=np.int64)
+
+SPAWN_X = spawn_piece(SHAPE_NAMES[0])["x"]
+NO_PIECE = -1
+
+STATUS_NAMES = (STATE_IDLE, STATE_RUNNING, STATE_PAUSED, STATE_OVER)
+IDLE, RUNNING, PAUSED, OVER = range(4)
+
+# action codes accepted by BatchGames.act (values of KEY_ACTIONS, plus "none")
+ACTIONS = (
+    "none",
+    "move_left", "move_right",
+    "soft_drop", "hard_drop",
+    "rotate_clockwise", "rotate_counter",
+    "hold_piece", "pause",
+)
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+_ROWS = np.arange(BOARD_HEIGHT)
+
+
+class BatchGames:
+    """B games stepped in lockstep with NumPy."""
+
+    def __init__(self, size):
+        self.size = size
+        self.boards = np.zeros((size, BOARD_HEIGHT, BOARD_WIDTH), dtype=np.uint8)
+        self.shape = np.zeros(size, dtype=np.int32)
+        self.rotation = np.zeros(size, dtype=np.int32)
+        self.x = np.full(size, SPAWN_X, dtype=np.int32)
+        self.y = np.zeros(size, dtype=np.int32)
+        self.next_shape = np.zeros(size, dtype=np.int32)
+        self.held = np.full(size, NO_PIECE, dtype=np.int32)
+        self.can_hold = np.ones(size, dtype=bool)
+        self.score = np.zeros(size, dtype=np.int64)
+        self.level = np.ones(size, dtype=np.int64)
+        self.lines = np.zeros(size, dtype=np.int64)
+        self.status = np.full(size, RUNNING, dtype=np.int8)
+        self.tick_count = np.zeros(size, dtype=np.int64)
+        self.generators = [None] * size
+        self.cleared_rows = [[] for _ in range(size)]
+
+    # ── Conversion ────────────────────────────────────────────────────────────
+
+    @classmethod
+    def start(cls, size, seeds=None, mode=None):
+        """Starts `size` fresh games; seeds[i], if given, seeds game i."""
+        seeds = [None] * size if seeds is None else list(seeds)
+        return cls.from_states([start_game(seed=seed, mode=mode, hashing=False) for seed in seeds])
+
+    @classmethod
+    def from_states(cls, states):
+        games = cls(len(states))
+        for i, state in enumerate(states):
+            cp = state["current_piece"]
+            games.boards[i] = state["board"]
+            games.shape[i] = SHAPE_INDEX[cp["shape"]]
+            games.rotation[i] = cp["rotation"] % 4
+            games.x[i] = cp["x"]
+            games.y[i] = cp["y"]
+            games.next_shape[i] = SHAPE_INDEX[state["next_piece"]]
+            held = state["held_piece"]
+            games.held[i] = SHAPE_INDEX[held] if held else NO_PIECE
+            games.can_hold[i] = state["can_hold"]
+            games.score[i] = state["score"]
+            games.level[i] = state["level"]
+            games.lines[i] = state["lines_cleared"]
+            games.status[i] = STATUS_NAMES.index(state["status"])
+            games.tick_count[i] = state["tick"]
+            if state.get("generator"):
+                games.generators[i] = PieceGenerator.from_dict(state["generator"])
+            games.cleared_rows[i] = list(state.get("cleared_rows") or [])
+        return games
+
+    def to_state(self, i):
+        """Returns game i as a regular engine state dict."""
+        held = int(self.held[i])
+        generator = self.generators[i]
+        filled = self.boards[i] != 0
+        tops = np.where(filled.any(axis=0), filled.argmax(axis=0), BOARD_HEIGHT)
+        return {
+            "board": self.boards[i].tolist(),
+            "current_piece": {
+                "shape":    SHAPE_NAMES[self.shape[i]],
+                "rotation": int(self.rotation[i]),
+                "x":        int(self.x[i]),
+                "y":        int(self.y[i]),
+                "color_id": int(SHAPE_COLORS[self.shape[i]]),
+            },
+            "next_piece":    SHAPE_NAMES[self.next_shape[i]],
+            "held_piece":    SHAPE_NAMES[held] if held != NO_PIECE else None,
+            "can_hold":      bool(self.can_hold[i]),
+            "score":         int(self.score[i]),
+            "level":         int(self.level[i]),
+            "lines_cleared": int(self.lines[i]),
+            "status":        STATUS_NAMES[self.status[i]],
+            "tick":          int(self.tick_count[i]),
+            "generator":     generator.to_dict() if generator else None,
+            "column_tops":   tops.tolist(),
+            "row_fills":     filled.sum(axis=1).tolist(),
+            "cleared_rows":  list(self.cleared_rows[i]),
+            "board_hash":    None,
+        }
+
+    def to_states(self):
+        return [self.to_state(i) for i in range(self.size)]
+
+    # ── Collision ─────────────────────────────────────────────────────────────
+
+    def _fits(self, idx, shape, rotation, x, y):
+        """Vectorized is_valid_position for the games in `idx`."""
+        rows = y[:, None] + CELL_ROWS[shape, rotation]
+        cols = x[:, None] + CELL_COLS[shape, rotation]
+        inside = (cols >= 0) & (cols < BOARD_WIDTH) & (rows < BOARD_HEIGHT)
+        cells = self.boards[
+            idx[:, None],
+            np.clip(rows, 0, BOARD_HEIGHT - 1),
+            np.clip(cols, 0, BOARD_WIDTH - 1),
+        ]
+        blocked = (cells != 0) & (rows >= 0) & inside
+        return inside.all(axis=1) & ~blocked.any(axis=1)
+
+    def _fits_at(self, idx, dx=0, dy=0, rotation=None):
+        if rotation is None:
+            rotation = self.rotation[idx]
+        return self._fits(
+            idx, self.shape[idx], rotation, self.x[idx] + dx, self.y[idx] + dy
+        )
+
+    # ── Piece supply ──────────────────────────────────────────────────────────
+
+    def _draw(self, idx):
+        """Draws one new shape per game in idx, in ascending game order."""
+        shapes = [
+            self.generators[i].next() if self.generators[i] else random_piece()
+            for i in idx.tolist()
+        ]
+        return np.array([SHAPE_INDEX[shape] for shape in shapes], dtype=np.int32)
+
+    def _spawn(self, idx, shape):
+        self.shape[idx] = shape
+        self.rotation[idx] = 0
+        self.x[idx] = SPAWN_X
+        self.y[idx] = 0
+
+    # ── Locking ───────────────────────────────────────────────────────────────
+
+    def _lock(self, idx, next_shapes=None):
+        """
+        Vectorized lock_piece: stamp, clear lines, score, spawn next.
+        `next_shapes` are pre-drawn replacements for next_shape, if any.
+        """
+        if idx.size == 0:
+            return
+        shape, rotation = self.shape[idx], self.rotation[idx]
+        rows = self.y[idx, None] + CELL_ROWS[shape, rotation]
+        cols = self.x[idx, None] + CELL_COLS[shape, rotation]
+        self.boards[idx[:, None], rows, cols] = SHAPE_COLORS[shape][:, None]
+
+        boards = self.boards[idx]
+        full = (boards != 0).all(axis=2)
+        cleared = full.sum(axis=1)
+        for i, rows in zip(idx.tolist(), full):
+            self.cleared_rows[i] = np.flatnonzero(rows).tolist()
+        if cleared.any():
+            # stable sort puts full rows on top, the rest keep their order
+            order = np.argsort(~full, axis=1, kind="stable")
+            boards = np.take_along_axis(boards, order[:, :, None], axis=1)
+            boards[_ROWS[None, :] < cleared[:, None]] = 0
+            self.boards[idx] = boards
+
+        self.score[idx] += SCORE_LOOKUP[cleared] * self.level[idx]
+        self.lines[idx] += cleared
+        self.level[idx] = calculate_level(self.lines[idx])
+        self.can_hold[idx] = True
+
+        self._spawn(idx, self.next_shape[idx])
+        self.next_shape[idx] = self._draw(idx) if next_shapes is None else next_shapes
+
+        blocked = ~self._fits_at(idx)
+        self.status[idx[blocked]] = OVER
+
+    # ── Transitions ───────────────────────────────────────────────────────────
+
+    def tick(self):
+        """Vectorized apply_game_tick for every running game."""
+        idx = np.flatnonzero(self.status == RUNNING)
+        down = self._fits_at(idx, dy=1)
+        self.y[idx[down]] += 1
+        self._lock(idx[~down])
+        self.tick_count[idx] += 1
+
+    def act(self, actions):
+        """
+        Vectorized handle_key_input. `actions` is one action code (or name)
+        for every game, or a single one applied to all of them.
+        """
+        actions = self._action_codes(actions)
+
+        pause = np.flatnonzero(actions == ACTION_CODES["pause"])
+        status = self.status[pause]
+        self.status[pause] = np.where(
+            status == RUNNING, PAUSED, np.where(status == PAUSED, RUNNING, status)
+        )
+
+        running = (self.status == RUNNING) & (actions != ACTION_CODES["pause"])
+
+        for name, dx in (("move_left", -1), ("move_right", 1)):
+            idx = np.flatnonzero(running & (actions == ACTION_CODES[name]))
+            self.x[idx[self._fits_at(idx, dx=dx)]] += dx
+
+        for name, turn in (("rotate_clockwise", 1), ("rotate_counter", -1)):
+            idx = np.flatnonzero(running & (actions == ACTION_CODES[name]))
+            rotation = (self.rotation[idx] + turn) % 4
+            ok = self._fits_at(idx, rotation=rotation)
+            self.rotation[idx[ok]] = rotation[ok]
+
+        soft = np.flatnonzero(running & (actions == ACTION_CODES["soft_drop"]))
+        down = self._fits_at(soft, dy=1)
+        self.y[soft[down]] += 1
+
+        hard = np.flatnonzero(running & (actions == ACTION_CODES["hard_drop"]))
+        falling = hard
+        while falling.size:
+            falling = falling[self._fits_at(falling, dy=1)]
+            self.y[falling] += 1
+
+        hold = np.flatnonzero(
+            running & (actions == ACTION_CODES["hold_piece"]) & self.can_hold
+        )
+        hold_empty = hold[self.held[hold] == NO_PIECE]
+
+        # locks and first-time holds both draw a piece; draw them together so
+        # the draws stay in ascending game order
+        lock = np.union1d(soft[~down], hard)
+        drawing = np.union1d(lock, hold_empty)
+        drawn = np.full(self.size, NO_PIECE, dtype=np.int32)
+        drawn[drawing] = self._draw(drawing)
+
+        self._hold(hold, drawn)
+        self._lock(lock, drawn[lock])
+
+    def _hold(self, idx, drawn):
+        """Vectorized hold_piece: swap with the held piece, or take the next one."""
+        held = self.held[idx]
+        empty = held == NO_PIECE
+        spawn = np.where(empty, self.next_shape[idx], held)
+        self.held[idx] = self.shape[idx]
+        self.next_shape[idx[empty]] = drawn[idx[empty]]
+        self._spawn(idx, spawn)
+        self.can_hold[idx] = False
+
+    def _action_codes(self, actions):
+        if isinstance(actions, str):
+            actions = ACTION_CODES[actions]
+        actions = np.asarray(actions)
+        if actions.dtype.kind in "US":
+            actions = np.array([ACTION_CODES[a] for a in actions])
+        return np.broadcast_to(actions, (self.size,))
@@ -0,0 +1,96 @@
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT
+
+# ── Bitboard backend ──────────────────────────────────────────────────────────
+# Each board row is mirrored as one integer with bit c set when column c is
+# filled. Collision becomes one shift-and-AND per piece row, a full line is a
+# compare against FULL_ROW, and a line clear is a list splice.
+#
+# BitBoard is still a list of row lists, so dcc.Store and every renderer see
+# the usual list-of-lists board. Rows must not be mutated in place — the
+# engine always replaces a row, which keeps `bits` in sync.
+
+FULL_ROW = (1 << BOARD_WIDTH) - 1
+
+
+def row_to_bits(row):
+    """Returns the bitmask for one board row (bit c set if column c is filled)."""
+    bits = 0
+    for col_i, cell in enumerate(row):
+        if cell:
+            bits |= 1 << col_i
+    return bits
+
+
+class BitBoard(list):
+    """A list-of-lists board that also keeps one occupancy bitmask per row."""
+
+    def __init__(self, rows=(), bits=None):
+        super().__init__(rows)
+        self.bits = bits if bits is not None else [row_to_bits(row) for row in self]
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            ([0] * BOARD_WIDTH for _ in range(BOARD_HEIGHT)),
+            [0] * BOARD_HEIGHT,
+        )
+
+    @classmethod
+    def from_board(cls, board):
+        if isinstance(board, cls):
+            return board
+        return cls(board)
+
+    def to_list(self):
+        """Plain list-of-lists copy for serialization."""
+        return [list(row) for row in self]
+
+    def fits(self, orientation, x, y):
+        """Collision test for a PieceOrientation at (x, y)."""
+        if x + orientation.min_col < 0 or x + orientation.max_col >= BOARD_WIDTH:
+            return False
+        if y + orientation.max_row >= BOARD_HEIGHT:
+            return False
+        bits = self.bits
+        for row_i, mask in orientation.row_bits:
+            new_y = y + row_i
+            if new_y < 0:
+                continue
+            shifted = mask << x if x >= 0 else mask >> -x
+            if bits[new_y] & shifted:
+                return False
+        return True
+
+    def stamp(self, cells, x, y, color_id):
+        """Returns a new BitBoard with the given (row, col) cells set to color_id."""
+        rows = list(self)
+        bits = list(self.bits)
+        touched = {}
+        for row_i, col_i in cells:
+            new_y = y + row_i
+            if new_y not in touched:
+                touched[new_y] = list(rows[new_y])
+            touched[new_y][x + col_i] = color_id
+            bits[new_y] |= 1 << (x + col_i)
+        for new_y, row in touched.items():
+            rows[new_y] = row
+        return BitBoard(rows, bits)
+
+    def full_rows(self):
+        return [row_i for row_i, bits in enumerate(self.bits) if bits == FULL_ROW]
+
+    def clear_lines(self):
+        """Returns (new BitBoard, lines cleared) with full rows spliced out."""
+        full = self.full_rows()
+        if not full:
+            return self, 0
+        return BitBoard(list(self), list(self.bits)).remove_rows(full), len(full)
+
+    def remove_rows(self, full):
+        """Splices the `full` rows (ascending) out in place, topping up with empty rows."""
+        for row_i in reversed(full):
+            del self[row_i]
+            del self.bits[row_i]
+        self[:0] = [[0] * BOARD_WIDTH for _ in full]
+        self.bits[:0] = [0] * len(full)
+        return self
@@ -0,0 +1,288 @@
+import base64
+from array import array
+
+from game.bitboard import BitBoard
+from game.constants import (
+    BOARD_WIDTH, BOARD_HEIGHT, STATE_IDLE, STATE_RUNNING, STATE_PAUSED, STATE_OVER,
+)
+from game.randomizer import MODES, SHAPES
+from game.replay import read_varint, write_varint
+
+# ── Compact game state ────────────────────────────────────────────────────────
+# CompactState holds a game state as small ints: the board is one bytearray
+# (row-major, one byte per cell) and every piece is an index into SHAPES.
+# CompactState.from_state(...).to_state() gives back an equal state dict, so
+# the engine keeps working on dicts and this is only how a state is stored
+# or sent.
+#
+# Binary layout (to_bytes / from_bytes; varints as in game/replay.py, signed
+# values zigzag encoded):
+#   VERSION byte, flags byte (FLAG_*), status index byte
+#   current piece: shape + 1, rotation, zigzag x, zigzag y, color_id
+#   next piece + 1, held piece + 1 (0 = none)
+#   varints: score, level, lines_cleared, tick
+#   generator (FLAG_GENERATOR): seed, mode index, lookahead, rng,
+#                               bag length + shapes, queue length + shapes
+#   board_hash (FLAG_HASH)
+#   column_tops: one byte per column
+#   cleared_rows: count, then the row indices
+#   board: number of leading empty rows, the row_fills of the other rows (of
+#          every row with FLAG_FILLS, when an empty row's count is not 0),
+#          one byte each, then the other cells two per byte
+# column_tops and row_fills are stored as they are rather than rebuilt from
+# the board, so packing and unpacking never rescan it.
+# encode_state() wraps that in base64, for a dcc.Store.
+
+VERSION = 3
+
+FLAG_CAN_HOLD = 1
+FLAG_GENERATOR = 2
+FLAG_HASH = 4
+FLAG_BITBOARD = 16
+FLAG_FILLS = 32
+
+STATUS_NAMES = (STATE_IDLE, STATE_RUNNING, STATE_PAUSED, STATE_OVER)
+SHAPE_INDEX = {name: i for i, name in enumerate(SHAPES)}
+
+FIELDS = (
+    "board", "current_piece", "next_piece", "held_piece", "can_hold", "score",
+    "level", "lines_cleared", "status", "tick", "generator", "column_tops", "row_fills",
+    "cleared_rows", "board_hash",
+)
+PIECE_FIELDS = ("shape", "rotation", "x", "y", "color_id")
+
+
+def _zigzag(n):
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def _unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _read_varints(data, pos, n):
+    values = array("H")
+    for _ in range(n):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values, pos
+
+
+def _shape_code(shape):
+    return 0 if shape is None else SHAPE_INDEX[shape] + 1
+
+
+def _shape_name(code):
+    return None if code == 0 else SHAPES[code - 1]
+
+
+class CompactState:
+    """One game state packed into ints, bytes and a bytearray board."""
+
+    __slots__ = (
+        "board", "bitboard", "shape", "rotation", "x", "y", "color_id",
+        "next_piece", "held_piece", "can_hold", "score", "level", "lines",
+        "status", "tick", "generator", "bag", "queue", "column_tops", "row_fills",
+        "cleared_rows", "board_hash",
+    )
+
+    # ── Conversion ────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_state(cls, state):
+        if set(state) != set(FIELDS) or set(state["current_piece"]) != set(PIECE_FIELDS):
+            raise ValueError("CompactState only packs states shaped like INITIAL_GAME_STATE")
+        board = state["board"]
+        cells = bytearray(BOARD_WIDTH * BOARD_HEIGHT)
+        for row_i, row in enumerate(board):
+            cells[row_i * BOARD_WIDTH:(row_i + 1) * BOARD_WIDTH] = bytes(row)
+        if max(cells) > 0xF:
+            raise ValueError("Board cells must fit in 4 bits")
+
+        compact = cls.__new__(cls)
+        compact.board = cells
+        compact.bitboard = isinstance(board, BitBoard)
+        cp = state["current_piece"]
+        compact.shape = SHAPE_INDEX[cp["shape"]]
+        compact.rotation = cp["rotation"]
+        compact.x = cp["x"]
+        compact.y = cp["y"]
+        compact.color_id = cp["color_id"]
+        compact.next_piece = _shape_code(state["next_piece"])
+        compact.held_piece = _shape_code(state["held_piece"])
+        compact.can_hold = state["can_hold"]
+        compact.score = state["score"]
+        compact.level = state["level"]
+        compact.lines = state["lines_cleared"]
+        compact.status = STATUS_NAMES.index(state["status"])
+        compact.tick = state["tick"]
+
+        generator = state["generator"]
+        compact.generator = None
+        compact.bag = compact.queue = b""
+        if generator is not None:
+            compact.generator = (
+                generator["seed"], MODES.index(generator["mode"]),
+                generator["lookahead"], generator["rng"],
+            )
+            compact.bag = bytes(SHAPE_INDEX[s] for s in generator["bag"])
+            compact.queue = bytes(SHAPE_INDEX[s] for s in generator["queue"])
+
+        compact.column_tops = bytes(state["column_tops"])
+        compact.row_fills = bytes(state["row_fills"])
+        compact.cleared_rows = array("H", state["cleared_rows"])
+        compact.board_hash = state["board_hash"]
+        return compact
+
+    def rows(self):
+        cells = self.board
+        return [
+            list(cells[row_i * BOARD_WIDTH:(row_i + 1) * BOARD_WIDTH])
+            for row_i in range(BOARD_HEIGHT)
+        ]
+
+    def to_state(self):
+        board = self.rows()
+        if self.bitboard:
+            board = BitBoard(board)
+        generator = None
+        if self.generator is not None:
+            seed, mode, lookahead, rng = self.generator
+            generator = {
+                "seed":      seed,
+                "mode":      MODES[mode],
+                "lookahead": lookahead,
+                "rng":       rng,
+                "bag":       [SHAPES[i] for i in self.bag],
+                "queue":     [SHAPES[i] for i in self.queue],
+            }
+        return {
+            "board": board,
+            "current_piece": {
+                "shape":    SHAPES[self.shape],
+                "rotation": self.rotation,
+                "x":        self.x,
+                "y":        self.y,
+                "color_id": self.color_id,
+            },
+            "next_piece":    _shape_name(self.next_piece),
+            "held_piece":    _shape_name(self.held_piece),
+            "can_hold":      self.can_hold,
+            "score":         self.score,
+            "level":         self.level,
+            "lines_cleared": self.lines,
+            "status":        STATUS_NAMES[self.status],
+            "tick":          self.tick,
+            "generator":     generator,
+            "column_tops":   list(self.column_tops),
+            "row_fills":     list(self.row_fills),
+            "cleared_rows":  list(self.cleared_rows),
+            "board_hash":    self.board_hash,
+        }
+
+    # ── Binary form ───────────────────────────────────────────────────────────
+
+    def to_bytes(self):
+        cells = self.board
+        empty_rows = (len(cells) - len(cells.lstrip(b"\0"))) // BOARD_WIDTH
+        all_fills = any(self.row_fills[:empty_rows])
+        flags = (
+            FLAG_CAN_HOLD * bool(self.can_hold)
+            | FLAG_GENERATOR * (self.generator is not None)
+            | FLAG_HASH * (self.board_hash is not None)
+            | FLAG_BITBOARD * self.bitboard
+            | FLAG_FILLS * all_fills
+        )
+        buf = bytearray((VERSION, flags, self.status, self.shape + 1, self.rotation))
+        write_varint(buf, _zigzag(self.x))
+        write_varint(buf, _zigzag(self.y))
+        buf += bytes((self.color_id, self.next_piece, self.held_piece))
+        for value in (self.score, self.level, self.lines, self.tick):
+            write_varint(buf, value)
+        if self.generator is not None:
+            for value in self.generator:
+                write_varint(buf, value)
+            for shapes in (self.bag, self.queue):
+                write_varint(buf, len(shapes))
+                buf += shapes
+        if self.board_hash is not None:
+            write_varint(buf, self.board_hash)
+        buf += self.column_tops
+        write_varint(buf, len(self.cleared_rows))
+        for row in self.cleared_rows:
+            write_varint(buf, row)
+
+        write_varint(buf, empty_rows)
+        buf += self.row_fills if all_fills else self.row_fills[empty_rows:]
+        rest = cells[empty_rows * BOARD_WIDTH:]
+        if len(rest) % 2:
+            rest.append(0)
+        buf += bytes(hi << 4 | lo for hi, lo in zip(rest[::2], rest[1::2]))
+        return bytes(buf)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data or data[0] != VERSION:
+            raise ValueError(f"Unsupported compact state version {data[0] if data else None}")
+        flags, status, shape, rotation = data[1], data[2], data[3], data[4]
+        compact = cls.__new__(cls)
+        compact.status = status
+        compact.shape = shape - 1
+        compact.rotation = rotation
+        x, pos = read_varint(data, 5)
+        y, pos = read_varint(data, pos)
+        compact.x, compact.y = _unzigzag(x), _unzigzag(y)
+        compact.color_id, compact.next_piece, compact.held_piece = data[pos:pos + 3]
+        pos += 3
+        values = []
+        for _ in range(4):
+            value, pos = read_varint(data, pos)
+            values.append(value)
+        compact.score, compact.level, compact.lines, compact.tick = values
+        compact.can_hold = bool(flags & FLAG_CAN_HOLD)
+        compact.bitboard = bool(flags & FLAG_BITBOARD)
+
+        compact.generator = None
+        compact.bag = compact.queue = b""
+        if flags & FLAG_GENERATOR:
+            values = []
+            for _ in range(4):
+                value, pos = read_varint(data, pos)
+                values.append(value)
+            compact.generator = tuple(values)
+            shapes = []
+            for _ in range(2):
+                n, pos = read_varint(data, pos)
+                shapes.append(bytes(data[pos:pos + n]))
+                pos += n
+            compact.bag, compact.queue = shapes
+        compact.board_hash = None
+        if flags & FLAG_HASH:
+            compact.board_hash, pos = read_varint(data, pos)
+        compact.column_tops = bytes(data[pos:pos + BOARD_WIDTH])
+        pos += BOARD_WIDTH
+        n, pos = read_varint(data, pos)
+        compact.cleared_rows, pos = _read_varints(data, pos, n)
+
+        empty_rows, pos = read_varint(data, pos)
+        n = BOARD_HEIGHT if flags & FLAG_FILLS else BOARD_HEIGHT - empty_rows
+        compact.row_fills = bytes(BOARD_HEIGHT - n) + bytes(data[pos:pos + n])
+        pos += n
+        cells = bytearray(empty_rows * BOARD_WIDTH)
+        for byte in data[pos:]:
+            cells.append(byte >> 4)
+            cells.append(byte & 0xF)
+        if len(cells) < BOARD_WIDTH * BOARD_HEIGHT:
+            raise ValueError("Truncated compact state: the board is incomplete")
+        compact.board = cells[:BOARD_WIDTH * BOARD_HEIGHT]
+        return compact
+
+
+def encode_state(state):
+    """Packs a state dict into a base64 string (see CompactState)."""
+    return base64.b64encode(CompactState.from_state(state).to_bytes()).decode("ascii")
+
+
+def decode_state(blob):
+    """The state dict behind an encode_state() string."""
+    return CompactState.from_bytes(base64.b64decode(blob)).to_state()
@@ -2,12 +2,89 @@
 BOARD_WIDTH = 16
 BOARD_HEIGHT = 25
 CELL_SIZE = 35          # pixels per cell
+# Board renderer:
+#   "full"   — rebuild every cell div on each state change
+#   "patch"  — send only the cells that changed (dash Patch)
+#   "canvas" — send a compact frame, painted on one <canvas> client side
+RENDER_MODE = "full"
+
+# Board storage used by create_empty_board / start_game:
+#   "lists"    — plain list of row lists (default)
+#   "bitboard" — game.bitboard.BitBoard, rows mirrored as integer bitmasks
+BOARD_BACKEND = "lists"
+
+# Keep a Zobrist hash of the board in the state (state["board_hash"], see
+# game/zobrist.py). Not mirrored by assets/tetris_engine.js, so it cannot be
+# combined with GAME_LOOP = "clientside".
+ZOBRIST_HASHING = False
 
 # Game timing
 INITIAL_SPEED_MS = 500  # how fast pieces fall (milliseconds)
 SPEED_INCREMENT = 50    # speed increase per level
 MIN_SPEED_MS = 100      # max speed cap
 
+# Piece generator (game/randomizer.py)
+RANDOMIZER_MODE = "uniform"   # "uniform" or "bag" (7-bag)
+LOOKAHEAD = 3                 # upcoming pieces kept queued after next_piece
+
+# Where the game state lives between callbacks:
+#   "client" — the state round-trips through the game-state and game-hot
+#              stores (see "State transport" in callbacks.py)
+#   "server" — dcc.Store only holds a session id; see server/session_store.py
+STATE_STORAGE = "client"
+SESSION_TTL_S = 30 * 60             # idle sessions expire after this
+SESSION_MAX = 1000                  # LRU cap on sessions kept in memory
+SESSION_BACKEND = "memory"          # "memory" or "sqlite"
+SESSION_DB_PATH = "sessions.sqlite3"
+# How "client" storage writes game-state:
+#   "json"    — the state dict itself
+#   "compact" — a base64 string from game/compact.py (a few hundred bytes
+#               instead of a few KB); needs GAME_LOOP = "server"
+STATE_CODEC = "json"
+
+# Production serving (src/wsgi.py, src/gunicorn.conf.py)
+SERVER_BIND = "0.0.0.0:8050"
+# Processes; more than 1 needs STATE_STORAGE = "client", since sessions live in
+# one process's memory
+SERVER_WORKERS = 1
+SERVER_THREADS = 32       # request threads per process
+# Where callbacks run the engine: None (in the request thread), "thread" or
+# "process" (a pool of ENGINE_POOL_SIZE; see server/serving.py)
+ENGINE_POOL = None
+ENGINE_POOL_SIZE = 4
+
+# Instrumentation (server/metrics.py): callback and engine latency histograms,
+# payload sizes and allocation counts, served as Prometheus text at /metrics
+# and logged every METRICS_LOG_INTERVAL_S. Off, nothing is wrapped at all.
+METRICS_ENABLED = False
+METRICS_LOG_INTERVAL_S = 60
+METRICS_PATH = "/metrics"
+
+# Profiling mode (server/profiling.py): games started with PROFILE_ENV set
+# (e.g. TETRIS_PROFILE=1 python app.py), or from a page opened with
+# ?profile=1, dump cProfile stats, the top PROFILE_TOP_N allocation sites and
+# a replay log to PROFILE_DIR every PROFILE_EVERY_TICKS ticks
+PROFILE_ENV = "TETRIS_PROFILE"
+PROFILE_DIR = "profiles"
+PROFILE_EVERY_TICKS = 200
+PROFILE_TOP_N = 25
+
+# Where gravity and input run:
+#   "server"     — dcc.Interval / keyboard events call the Python engine
+#   "clientside" — assets/tetris_engine.js runs them in the browser; the server
+#                  only validates checkpoints (needs STATE_STORAGE = "client")
+GAME_LOOP = "server"
+
+# Keyboard path with the server game loop:
+#   "event" — every keydown is its own on_key request
+#   "batch" — assets/input_buffer.js coalesces presses and releases over
+#             INPUT_BATCH_MS into one "input-batch" request, which the engine
+#             plays with apply_key_batch; held keys repeat with DAS / ARR
+INPUT_MODE = "event"
+INPUT_BATCH_MS = 16     # one frame at 60 Hz
+DAS_MS = 170            # delayed auto shift: how long a key is held before it repeats
+ARR_MS = 50             # auto repeat rate: then one repeat every ARR_MS
+
 # Colors (one per tetromino type + empty)
 COLORS = {
     0: "#1a1a2e",        # empty cell
@@ -53,7 +130,12 @@ INITIAL_GAME_STATE = {
     "level": 1,
     "lines_cleared": 0,
     "status": STATE_IDLE,
-    "tick": 0
+    "tick": 0,
+    "generator": None,   # PieceGenerator.to_dict(), set by start_game
+    "column_tops": [BOARD_HEIGHT] * BOARD_WIDTH,   # see tetris_engine.column_tops
+    "row_fills": [0] * BOARD_HEIGHT,    # filled cells per row, see tetris_engine.row_fills
+    "cleared_rows": [],  # rows the last lock cleared (indices before the clear)
+    "board_hash": None,  # set by start_game when ZOBRIST_HASHING is on
 }
 
 # Key bindings
@@ -69,6 +151,9 @@ KEY_ACTIONS = {
     "Escape":     "pause",
 }
 
+# actions that repeat while their key is held (see apply_key_batch)
+REPEAT_ACTIONS = ("move_left", "move_right", "soft_drop")
+
 PIECE_IDS = {
     "I": 1,
     "O": 2,
@@ -0,0 +1,296 @@
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game.autoplayer import (
+    WEIGHTS, SPAWN_X, Placement, _rotation_path, placement_keys,
+    reachable_placements,
+)
+from game.constants import BOARD_HEIGHT, BOARD_WIDTH, PIECE_IDS, STATE_RUNNING
+from game.pieces import PIECE_TABLE
+from game.tetris_engine import upcoming_pieces
+from game.zobrist import CELL_KEYS, TranspositionTable, board_hash
+
+# ── Lookahead search ──────────────────────────────────────────────────────────
+# Extends the autoplayer to several pieces: the current one, then next_piece
+# and the generator's queue. A line of play is worth the lines it clears along
+# the way plus the heuristic of the board it ends on; the search plays the
+# first move of the best line. Hold is only considered for the first piece.
+#
+# Per board, every placement of the piece is stamped into one stacked
+# (N, BOARD_HEIGHT, BOARD_WIDTH) array and all N results are featurized at
+# once. Stamping and clearing follow apply_piece_to_board / clear_lines
+# exactly (the piece's color id, full rows removed, empty rows on top).
+# Values of (board, pieces left) are cached, since different move orders
+# often reach the same position; the root's subtrees can be farmed out to a
+# process pool. When the state carries a Zobrist board_hash, the children's
+# hashes are derived from it (the piece's cells XORed in, a rehash after a
+# clear) and key the cache; otherwise the board bytes do.
+
+# (rotation, cell) -> row / col offset of every shape, for fancy-index stamping
+_CELL_ROWS = {
+    shape: np.array([[r for r, _ in o.cells] for o in rotations])
+    for shape, rotations in PIECE_TABLE.items()
+}
+_CELL_COLS = {
+    shape: np.array([[c for _, c in o.cells] for o in rotations])
+    for shape, rotations in PIECE_TABLE.items()
+}
+# (row, col, color) -> Zobrist key, for stamping a whole stack's hashes at once
+_CELL_KEYS = np.array(CELL_KEYS, dtype=np.uint64)
+
+def _spawn_candidates(shape):
+    """
+    Every in-bounds (rotation, x) of a freshly spawned piece, as arrays, with
+    the bottom profile of each padded to 4 (col, row) pairs, plus how to
+    test reachability the way autoplayer.reachable_placements does.
+    """
+    rotations = PIECE_TABLE[shape]
+    rot, xs, cols, rows = [], [], [], []
+    sweeps = []   # (rotation path candidates, leftward candidates, rightward candidates)
+    seen = set()
+    for target, o in enumerate(rotations):
+        first = len(rot)
+        for x in range(-o.min_col, BOARD_WIDTH - o.max_col):
+            profile = list(o.bottom) + [o.bottom[-1]] * (4 - len(o.bottom))
+            rot.append(target)
+            xs.append(x)
+            cols.append([x + c for c, _ in profile])
+            rows.append([r for _, r in profile])
+        if o.cells in seen:
+            continue
+        seen.add(o.cells)
+        index = {x: first + i for i, x in enumerate(xs[first:])}
+        path, _ = _rotation_path(0, target)
+        sweeps.append((
+            target,
+            [(r, SPAWN_X) for r in path + [0]],
+            [index[x] for x in range(SPAWN_X, -o.min_col - 1, -1)],
+            [index[x] for x in range(SPAWN_X + 1, BOARD_WIDTH - o.max_col)],
+        ))
+    lookup = {(r, x): i for i, (r, x) in enumerate(zip(rot, xs))}
+    sweeps = [
+        (target, [lookup[c] for c in path], left, right)
+        for target, path, left, right in sweeps
+    ]
+    return np.array(rot), np.array(xs), np.array(cols), np.array(rows), sweeps
+
+
+_SPAWN = {shape: _spawn_candidates(shape) for shape in PIECE_TABLE}
+
+
+def spawn_placements(tops, shape):
+    """
+    reachable_placements() from the spawn position for every row of `tops`
+    (N, BOARD_WIDTH) at once. Returns (parents, rotation, x, y) arrays.
+    """
+    rot, xs, cols, rows, sweeps = _SPAWN[shape]
+    below = tops[:, cols]                                   # (N, K, 4)
+    fits = (rows < below).all(axis=2)                       # piece at row 0 clears the tops
+    land = (below - 1 - rows).min(axis=2)
+    reach = np.zeros_like(fits)
+    for _, path, left, right in sweeps:
+        ok = fits[:, path].all(axis=1, keepdims=True)
+        reach[:, left] = ok & np.logical_and.accumulate(fits[:, left], axis=1)
+        if right:
+            reach[:, right] = ok & np.logical_and.accumulate(fits[:, right], axis=1)
+    parents, k = np.nonzero(reach)
+    return parents, rot[k], xs[k], land[parents, k]
+
+
+def board_tops(boards):
+    """column_tops() for a numpy board, or for each board of a stack."""
+    filled = boards != 0
+    return np.where(filled.any(axis=-2), filled.argmax(axis=-2), BOARD_HEIGHT)
+
+
+def place_all(boards, parents, shape, rotation, x, y):
+    """
+    Returns (children, lines): for every i, `shape` placed at (rotation[i],
+    x[i], y[i]) on boards[parents[i]], stacked, and the lines each cleared.
+    """
+    children = boards[parents]
+    rows = _CELL_ROWS[shape][rotation] + y[:, None]
+    cols = _CELL_COLS[shape][rotation] + x[:, None]
+    children[np.arange(len(children))[:, None], rows, cols] = PIECE_IDS[shape]
+    full = (children != 0).all(axis=2)
+    lines = full.sum(axis=1)
+    for i in np.flatnonzero(lines):
+        kept = children[i][~full[i]]
+        children[i] = 0
+        children[i, BOARD_HEIGHT - len(kept):] = kept
+    return children, lines
+
+
+def place_hashes(hashes, parents, shape, rotation, x, y, children, lines):
+    """
+    Zobrist hashes of place_all's children, from their parents' `hashes`:
+    the piece's cells XORed in, or the child rehashed when it cleared lines.
+    """
+    rows = _CELL_ROWS[shape][rotation] + y[:, None]
+    cols = _CELL_COLS[shape][rotation] + x[:, None]
+    cell_keys = _CELL_KEYS[rows, cols, PIECE_IDS[shape]]
+    child_hashes = hashes[parents] ^ np.bitwise_xor.reduce(cell_keys, axis=1)
+    for i in np.flatnonzero(lines):
+        child_hashes[i] = board_hash(children[i].tolist())
+    return child_hashes
+
+
+def board_features(boards):
+    """Vectorized (aggregate height, holes, bumpiness) of stacked boards."""
+    filled = boards != 0
+    heights = BOARD_HEIGHT - np.where(
+        filled.any(axis=1), filled.argmax(axis=1), BOARD_HEIGHT
+    )
+    # every cell from a column's top down is either filled or a hole
+    holes = heights.sum(axis=1) - filled.sum(axis=(1, 2))
+    bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+    return heights.sum(axis=1), holes, bumpiness
+
+
+def score_boards(boards, lines, weights=WEIGHTS):
+    height, holes, bumpiness = board_features(boards)
+    return (
+        weights["height"] * height + weights["lines"] * lines
+        + weights["holes"] * holes + weights["bumpiness"] * bumpiness
+    )
+
+
+def line_values(boards, pieces, weights=WEIGHTS, cache=None, hashes=None):
+    """
+    Best value reachable on each of the stacked `boards` by playing `pieces`
+    in order from their spawn position; -inf when one cannot be placed.
+    The whole next layer of the search is stacked and scored at once.
+    `hashes` (the boards' Zobrist hashes, uint64) key the cache when given.
+    Keys include the weights, so one cache can serve searches that differ.
+    """
+    cache = {} if cache is None else cache
+    shape, suffix = pieces[0], "".join(pieces)
+    weights_key = tuple(sorted(weights.items()))
+    values = np.full(len(boards), -np.inf)
+    if hashes is None:
+        keys = [(board.tobytes(), suffix, weights_key) for board in boards]
+    else:
+        keys = [(h, suffix, weights_key) for h in hashes.tolist()]
+    todo = []
+    for i, key in enumerate(keys):
+        value = cache.get(key)
+        if value is None:
+            todo.append(i)
+        else:
+            values[i] = value
+
+    todo = np.array(todo, dtype=np.intp)
+    parents, rotation, x, y = spawn_placements(board_tops(boards[todo]), shape)
+    if len(parents):
+        parents = todo[parents]
+        children, lines = place_all(boards, parents, shape, rotation, x, y)
+        if len(pieces) == 1:
+            child_values = score_boards(children, lines, weights)
+        else:
+            child_hashes = None
+            if hashes is not None:
+                child_hashes = place_hashes(
+                    hashes, parents, shape, rotation, x, y, children, lines
+                )
+            child_values = weights["lines"] * lines + line_values(
+                children, pieces[1:], weights, cache, child_hashes
+            )
+        np.maximum.at(values, parents, child_values)
+    for i in todo:
+        cache[keys[i]] = values[i]
+    return values
+
+
+# per-process cache for pool workers, kept between the chunks of a search
+_WORKER_CACHE = TranspositionTable()
+
+# search pools by worker count, created on first use and kept for later searches
+_POOLS = {}
+
+
+def _search_pool(n_workers):
+    pool = _POOLS.get(n_workers)
+    if pool is None:
+        pool = _POOLS[n_workers] = ProcessPoolExecutor(max_workers=n_workers)
+        atexit.register(pool.shutdown)
+    return pool
+
+
+def _subtree_job(job):
+    boards, pieces, weights, hashes = job
+    return line_values(boards, pieces, weights, _WORKER_CACHE, hashes)
+
+
+def _subtree_values(boards, pieces, weights, workers, cache, hashes=None):
+    if workers == 1 or len(boards) < 2:
+        return line_values(boards, pieces, weights, cache, hashes)
+    n_workers = workers or os.cpu_count() or 1
+    n_chunks = min(len(boards), n_workers * 4)
+    chunks = np.array_split(boards, n_chunks)
+    hash_chunks = [None] * n_chunks if hashes is None else np.array_split(hashes, n_chunks)
+    jobs = [(c, pieces, weights, h) for c, h in zip(chunks, hash_chunks)]
+    parts = _search_pool(n_workers).map(_subtree_job, jobs)
+    return np.concatenate(list(parts))
+
+
+def search(state, depth=2, weights=WEIGHTS, workers=1, cache=None):
+    """
+    Returns (Placement, keys) for the first move of the best line over
+    `depth` pieces (limited by the known upcoming pieces), or (None, []).
+    `workers` other than 1 spreads the first piece's subtrees over a
+    process pool; `cache` (a dict or a zobrist.TranspositionTable) can be
+    kept between calls.
+    """
+    if state["status"] != STATE_RUNNING:
+        return None, []
+    board = np.array(state["board"], dtype=np.uint8)[None]
+    h = state.get("board_hash")
+    root_hashes = None if h is None else np.array([h], dtype=np.uint64)
+    cp = state["current_piece"]
+    upcoming = upcoming_pieces(state)
+
+    roots = [(False, cp["shape"], cp["x"], cp["y"], cp["rotation"], upcoming)]
+    if state["can_hold"]:
+        if state["held_piece"]:
+            roots.append((True, state["held_piece"], SPAWN_X, 0, 0, upcoming))
+        else:
+            roots.append((True, upcoming[0], SPAWN_X, 0, 0, upcoming[1:]))
+
+    best, best_value, start = None, -np.inf, None
+    tops = board_tops(board[0]).tolist()
+    for hold, shape, x, y, rotation, rest in roots:
+        placements = list(reachable_placements(shape, x, y, rotation, tops))
+        if not placements:
+            continue
+        targets, xs, ys = np.array(placements).T
+        parents = np.zeros(len(placements), dtype=np.intp)
+        children, lines = place_all(board, parents, shape, targets, xs, ys)
+        rest = list(rest[:depth - 1])
+        if rest:
+            hashes = None
+            if root_hashes is not None:
+                hashes = place_hashes(
+                    root_hashes, parents, shape, targets, xs, ys, children, lines
+                )
+            values = weights["lines"] * lines + _subtree_values(
+                children, rest, weights, workers, cache, hashes
+            )
+        else:
+            values = score_boards(children, lines, weights)
+        i = int(np.argmax(values))
+        if best is None or values[i] > best_value:
+            best_value = values[i]
+            best = Placement(hold, shape, *placements[i], float(values[i]))
+            start = (x, rotation)
+    if best is None:
+        return None, []
+    keys = placement_keys(*start, best.rotation, best.x)
+    return best, (["c"] if best.hold else []) + keys
+
+
+def lookahead_policy(state, rng):
+    """Simulator policy: two-piece lookahead search every tick."""
+    return search(state, depth=2)[1]
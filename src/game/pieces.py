@@ -1,3 +1,5 @@
+from collections import namedtuple
+
 import numpy as np
 
 # All 7 tetrominoes in their default rotation
@@ -30,3 +32,58 @@ TETROMINOES = {
                    [1,1,1],
                    [0,0,0]]),
 }
+
+
+# ── Precomputed orientations ──────────────────────────────────────────────────
+# Every (shape, rotation) pair is resolved once at import, so the hot paths
+# (collision, ghost, rendering) never call np.rot90 or walk the zero cells.
+#
+#   cells  : tuple of (row, col) offsets of the filled cells, row-major
+#   height : rows of the rotated matrix      width   : cols of the rotated matrix
+#   min_row/max_row/min_col/max_col : bounding box of the filled cells
+#   row_bits : tuple of (row, mask) with bit c set for each filled column c,
+#              used by the bitboard backend (game/bitboard.py)
+#   bottom   : tuple of (col, row) giving the lowest filled cell of each
+#              filled column — the profile that lands first on a hard drop
+
+PieceOrientation = namedtuple(
+    "PieceOrientation",
+    [
+        "cells", "height", "width",
+        "min_row", "max_row", "min_col", "max_col",
+        "row_bits", "bottom",
+    ],
+)
+
+
+def _build_orientation(matrix):
+    cells = tuple(
+        (int(r), int(c)) for r, c in zip(*np.nonzero(matrix))
+    )
+    rows = [r for r, _ in cells]
+    cols = [c for _, c in cells]
+    row_bits = {}
+    bottom = {}
+    for r, c in cells:
+        row_bits[r] = row_bits.get(r, 0) | (1 << c)
+        bottom[c] = max(bottom.get(c, r), r)
+    return PieceOrientation(
+        cells=cells,
+        height=matrix.shape[0],
+        width=matrix.shape[1],
+        min_row=min(rows),
+        max_row=max(rows),
+        min_col=min(cols),
+        max_col=max(cols),
+        row_bits=tuple(sorted(row_bits.items())),
+        bottom=tuple(sorted(bottom.items())),
+    )
+
+
+PIECE_TABLE = {
+    shape: tuple(
+        _build_orientation(np.rot90(matrix, k=-rotation))   # clockwise
+        for rotation in range(4)
+    )
+    for shape, matrix in TETROMINOES.items()
+}
@@ -0,0 +1,109 @@
+import secrets
+
+from game.pieces import TETROMINOES
+
+# ── Piece generator ───────────────────────────────────────────────────────────
+# A per-game, seedable source of pieces. Its whole state is a small
+# JSON-friendly dict, so it lives in the game state (state["generator"]) and
+# survives the dcc.Store round-trip; the same seed always replays the same
+# sequence.
+#
+# The PRNG is mulberry32: one 32-bit integer of state, cheap in Python and
+# exact in JavaScript (numbers stay below 2**53), so the browser can follow
+# the same sequence.
+
+SHAPES = tuple(TETROMINOES)
+
+MODE_UNIFORM = "uniform"   # every draw is an independent pick of the 7 shapes
+MODE_BAG = "bag"           # 7-bag: each run of 7 draws holds every shape once
+MODES = (MODE_UNIFORM, MODE_BAG)
+
+_MASK = 0xFFFFFFFF
+
+
+def mulberry32(state):
+    """Advances a mulberry32 state; returns (new_state, 32-bit output)."""
+    state = (state + 0x6D2B79F5) & _MASK
+    t = ((state ^ (state >> 15)) * (state | 1)) & _MASK
+    t = ((t + (((t ^ (t >> 7)) * (t | 61)) & _MASK)) & _MASK) ^ t
+    return state, (t ^ (t >> 14)) & _MASK
+
+
+def new_seed():
+    return secrets.randbits(32)
+
+
+class PieceGenerator:
+    """
+    Draws pieces for one game. `lookahead` upcoming pieces are kept in a
+    queue so previews (and bots) can see them before they are drawn.
+    """
+
+    def __init__(self, seed=None, mode=MODE_UNIFORM, lookahead=0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown randomizer mode {mode!r}, expected one of {MODES}")
+        self.seed = new_seed() if seed is None else seed & _MASK
+        self.mode = mode
+        self.lookahead = lookahead
+        self.rng = self.seed
+        self.bag = []
+        self.queue = []
+        self._fill_queue()
+
+    # ── Drawing ───────────────────────────────────────────────────────────────
+
+    def _random_below(self, n):
+        self.rng, value = mulberry32(self.rng)
+        return value * n >> 32
+
+    def _generate(self):
+        if self.mode == MODE_UNIFORM:
+            return SHAPES[self._random_below(len(SHAPES))]
+        if not self.bag:
+            bag = list(SHAPES)
+            for i in range(len(bag) - 1, 0, -1):   # Fisher-Yates
+                j = self._random_below(i + 1)
+                bag[i], bag[j] = bag[j], bag[i]
+            self.bag = bag
+        return self.bag.pop(0)
+
+    def _fill_queue(self):
+        while len(self.queue) < self.lookahead:
+            self.queue.append(self._generate())
+
+    def next(self):
+        """Returns the next piece and refills the lookahead queue."""
+        if self.queue:
+            shape = self.queue.pop(0)
+        else:
+            shape = self._generate()
+        self._fill_queue()
+        return shape
+
+    def peek(self, n=None):
+        """Returns up to n (default: all) queued upcoming pieces."""
+        n = self.lookahead if n is None else n
+        return list(self.queue[:n])
+
+    # ── Serialization ─────────────────────────────────────────────────────────
+
+    def to_dict(self):
+        return {
+            "seed":      self.seed,
+            "mode":      self.mode,
+            "lookahead": self.lookahead,
+            "rng":       self.rng,
+            "bag":       list(self.bag),
+            "queue":     list(self.queue),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        generator = cls.__new__(cls)
+        generator.seed = data["seed"]
+        generator.mode = data["mode"]
+        generator.lookahead = data["lookahead"]
+        generator.rng = data["rng"]
+        generator.bag = list(data["bag"])
+        generator.queue = list(data["queue"])
+        return generator
@@ -0,0 +1,249 @@
+from game.constants import KEY_ACTIONS, LOOKAHEAD, STATE_RUNNING
+from game.randomizer import MODES, MODE_UNIFORM
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+
+# ── Replay log ────────────────────────────────────────────────────────────────
+# A game is fully determined by its generator settings and its inputs, so a
+# replay stores only those — never a state. Events use the same convention as
+# server/clientside.py: a key string per key press, None per tick.
+#
+# Binary layout (all integers are LEB128 varints):
+#   header : MAGIC, VERSION byte, seed, mode index (into MODES), lookahead
+#   runs   : one varint per run of identical events,
+#            (count - 1) << OP_BITS | op   with op 0 = tick, i + 1 = ACTIONS[i]
+# Keys are stored as their action, so "p" and "Escape" encode the same way.
+# Runs are appended as they close, which keeps the log append-only; a run of
+# ticks is effectively the delta between two inputs, so idle stretches cost a
+# byte or two.
+
+MAGIC = b"TRPL"
+VERSION = 1
+
+# fixed order: the op codes are part of the file format
+ACTIONS = (
+    "move_left", "move_right", "soft_drop", "rotate_clockwise",
+    "rotate_counter", "hard_drop", "hold_piece", "pause",
+)
+ACTION_KEYS = {
+    action: next(key for key, a in KEY_ACTIONS.items() if a == action)
+    for action in ACTIONS
+}
+OP_TICK = 0
+OP_BITS = 4
+
+SNAPSHOT_EVERY = 500   # ticks between the states Replay keeps for seeking
+
+
+def write_varint(buf, value):
+    """Appends an unsigned LEB128 varint to a bytearray."""
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def read_varint(data, pos):
+    """Reads a varint at data[pos]; returns (value, next position)."""
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated replay: varint runs past the end")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def event_op(event):
+    """Returns the op code of an event, or None for keys that do nothing."""
+    if event is None:
+        return OP_TICK
+    action = KEY_ACTIONS.get(event)
+    return ACTIONS.index(action) + 1 if action else None
+
+
+def op_event(op):
+    return None if op == OP_TICK else ACTION_KEYS[ACTIONS[op - 1]]
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+class ReplayRecorder:
+    """
+    Builds a replay log event by event. With a `stream` (a binary file
+    opened for appending), flush() writes out everything recorded so far
+    that is not written yet.
+    """
+
+    def __init__(self, seed, mode=MODE_UNIFORM, lookahead=LOOKAHEAD, stream=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown randomizer mode {mode!r}, expected one of {MODES}")
+        self.seed = seed
+        self.mode = mode
+        self.lookahead = lookahead
+        self.stream = stream
+        self.data = bytearray(MAGIC)
+        self.data.append(VERSION)
+        write_varint(self.data, seed)
+        write_varint(self.data, MODES.index(mode))
+        write_varint(self.data, lookahead)
+        self._written = 0
+        self._op = None
+        self._count = 0
+
+    @classmethod
+    def for_state(cls, state, stream=None):
+        """A recorder for a fresh start_game() state, taken from its generator."""
+        generator = state["generator"]
+        return cls(
+            generator["seed"], generator["mode"], generator["lookahead"], stream
+        )
+
+    def record(self, event):
+        op = event_op(event)
+        if op is None:
+            return
+        if op == self._op:
+            self._count += 1
+            return
+        self._close_run()
+        self._op, self._count = op, 1
+
+    def key(self, key):
+        self.record(key)
+
+    def tick(self):
+        self.record(None)
+
+    def _close_run(self):
+        if self._op is not None:
+            write_varint(self.data, (self._count - 1) << OP_BITS | self._op)
+            self._op, self._count = None, 0
+
+    def flush(self):
+        """Closes the open run and appends the unwritten bytes to the stream."""
+        self._close_run()
+        if self.stream is not None:
+            self.stream.write(self.data[self._written:])
+            self.stream.flush()
+            self._written = len(self.data)
+
+    def to_bytes(self):
+        self._close_run()
+        return bytes(self.data)
+
+
+def encode_replay(seed, events, mode=MODE_UNIFORM, lookahead=LOOKAHEAD):
+    recorder = ReplayRecorder(seed, mode, lookahead)
+    for event in events:
+        recorder.record(event)
+    return recorder.to_bytes()
+
+
+def decode_replay(data):
+    """Returns (header, runs): header has seed, mode and lookahead; runs are (op, count)."""
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a replay log (bad magic)")
+    pos = len(MAGIC)
+    if data[pos] != VERSION:
+        raise ValueError(f"Unsupported replay version {data[pos]}")
+    seed, pos = read_varint(data, pos + 1)
+    mode, pos = read_varint(data, pos)
+    lookahead, pos = read_varint(data, pos)
+    header = {"seed": seed, "mode": MODES[mode], "lookahead": lookahead}
+
+    runs = []
+    while pos < len(data):
+        word, pos = read_varint(data, pos)
+        runs.append((word & ((1 << OP_BITS) - 1), (word >> OP_BITS) + 1))
+    return header, runs
+
+
+def _expand(runs):
+    for op, count in runs:
+        event = op_event(op)
+        for _ in range(count):
+            yield event
+
+
+def iter_events(data):
+    """Yields the recorded events one by one (a key string, None per tick)."""
+    _, runs = decode_replay(data)
+    return _expand(runs)
+
+
+def apply_event(state, event):
+    """Applies one recorded event to a state."""
+    if event is None:
+        return apply_game_tick(state)
+    return handle_key_input(state, event)
+
+
+# ── Playback ──────────────────────────────────────────────────────────────────
+
+class Replay:
+    """
+    Re-runs a replay log headless through the engine. The states reached
+    every `snapshot_every` ticks are kept, so seek() restarts from the
+    nearest one instead of tick 0. Engine states are never mutated, so a
+    snapshot is just a reference, not a copy.
+    """
+
+    def __init__(self, data, snapshot_every=SNAPSHOT_EVERY):
+        self.header, self.runs = decode_replay(data)
+        self.snapshot_every = snapshot_every
+        self.total_ticks = sum(count for op, count in self.runs if op == OP_TICK)
+        initial = start_game(
+            seed=self.header["seed"],
+            mode=self.header["mode"],
+            lookahead=self.header["lookahead"],
+        )
+        # (ticks played, run index, events used in that run, state)
+        self.snapshots = [(0, 0, 0, initial)]
+
+    @property
+    def initial_state(self):
+        return self.snapshots[0][3]
+
+    def events(self):
+        return _expand(self.runs)
+
+    def _play(self, snapshot, target):
+        """Plays from a snapshot until `target` ticks (None: to the end)."""
+        ticks, run_i, used, state = snapshot
+        if ticks == target:
+            return state
+        while run_i < len(self.runs):
+            op, count = self.runs[run_i]
+            if op != OP_TICK:
+                key = op_event(op)
+                for _ in range(count - used):
+                    state = handle_key_input(state, key)
+            else:
+                while used < count:
+                    # a tick only does something to a running game
+                    if state["status"] == STATE_RUNNING:
+                        state = apply_game_tick(state)
+                    used += 1
+                    ticks += 1
+                    if ticks % self.snapshot_every == 0 and ticks > self.snapshots[-1][0]:
+                        self.snapshots.append((ticks, run_i, used, state))
+                    if ticks == target:
+                        return state
+            run_i, used = run_i + 1, 0
+        return state
+
+    def seek(self, tick):
+        """Returns the state right after the tick-th tick event."""
+        if not 0 <= tick <= self.total_ticks:
+            raise ValueError(f"tick {tick} outside 0..{self.total_ticks}")
+        snapshot = max(
+            (s for s in self.snapshots if s[0] <= tick), key=lambda s: s[0]
+        )
+        return self._play(snapshot, tick)
+
+    def final_state(self):
+        """Returns the state after every recorded event."""
+        return self._play(self.snapshots[-1], None)
@@ -0,0 +1,142 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game.autoplayer import autoplay_policy
+from game.constants import KEY_ACTIONS, STATE_OVER
+from game.lookahead import lookahead_policy
+from game.replay import ReplayRecorder
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+
+# ── Headless simulation ───────────────────────────────────────────────────────
+# Runs games straight against tetris_engine, with no Dash involved. A game is
+# driven either by a policy — a function (state, rng) -> list of keys pressed
+# before the next tick — or by a script, a list with the keys for each tick.
+# Policies must be module-level functions (or POLICIES names) so they can be
+# pickled into worker processes. Each game's seed fixes its piece sequence.
+
+# pause keys would freeze a headless game, so random play never uses them
+PLAY_KEYS = [key for key, action in KEY_ACTIONS.items() if action != "pause"]
+
+
+def idle_policy(state, rng):
+    """Never presses anything — pieces just fall."""
+    return []
+
+
+def random_policy(state, rng):
+    """Presses one random non-pause key per tick."""
+    return [rng.choice(PLAY_KEYS)]
+
+
+def hard_drop_policy(state, rng):
+    """Shifts the piece a random amount, then hard drops it."""
+    shift = rng.randint(-4, 4)
+    key = "ArrowLeft" if shift < 0 else "ArrowRight"
+    return [key] * abs(shift) + [" "]
+
+
+POLICIES = {
+    "idle":      idle_policy,
+    "random":    random_policy,
+    "hard_drop": hard_drop_policy,
+    "autoplay":  autoplay_policy,
+    "lookahead": lookahead_policy,
+}
+
+
+def _resolve_policy(policy):
+    if callable(policy):
+        return policy
+    try:
+        return POLICIES[policy]
+    except KeyError:
+        raise ValueError(
+            f"Unknown policy {policy!r}, expected one of {list(POLICIES)}"
+        ) from None
+
+
+def simulate_game(
+    seed, policy="random", script=None, max_ticks=10_000, mode=None, record=False
+):
+    """
+    Plays one game headless and returns its summary:
+    seed, score, lines, level, ticks, status and wall_time (seconds).
+    With record=True the summary also holds the game's replay log
+    (game/replay.py) under "replay".
+
+    With a script, the keys for tick i are script[i]; the game stops when the
+    script runs out. Otherwise `policy` picks the keys before every tick.
+    The seed drives both the piece generator (in `mode`) and the policy RNG.
+    """
+    policy = _resolve_policy(policy)
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    state = start_game(seed=seed, mode=mode)
+    recorder = ReplayRecorder.for_state(state) if record else None
+    while state["status"] != STATE_OVER and state["tick"] < max_ticks:
+        if script is not None:
+            if state["tick"] >= len(script):
+                break
+            keys = script[state["tick"]]
+        else:
+            keys = policy(state, rng)
+        for key in keys:
+            state = handle_key_input(state, key)
+        state = apply_game_tick(state)
+        if recorder is not None:
+            for key in keys:
+                recorder.key(key)
+            recorder.tick()
+
+    summary = {
+        "seed":      seed,
+        "score":     state["score"],
+        "lines":     state["lines_cleared"],
+        "level":     state["level"],
+        "ticks":     state["tick"],
+        "status":    state["status"],
+        "wall_time": time.perf_counter() - start,
+    }
+    if recorder is not None:
+        summary["replay"] = recorder.to_bytes()
+    return summary
+
+
+def _simulate_job(job):
+    seed, policy, script, max_ticks, mode, record = job
+    return simulate_game(
+        seed, policy=policy, script=script, max_ticks=max_ticks, mode=mode,
+        record=record,
+    )
+
+
+def run_batch(
+    seeds, policy="random", scripts=None, max_ticks=10_000, workers=None, mode=None,
+    record=False,
+):
+    """
+    Runs one game per seed and returns their summaries in seed order.
+
+    `scripts`, if given, holds one script per seed. Games are fanned out over
+    a ProcessPoolExecutor with `workers` processes (default: CPU count);
+    workers=1 runs everything in the current process.
+    """
+    seeds = list(seeds)
+    if scripts is None:
+        scripts = [None] * len(seeds)
+    jobs = [
+        (seed, policy, script, max_ticks, mode, record)
+        for seed, script in zip(seeds, scripts, strict=True)
+    ]
+
+    if workers == 1:
+        return [_simulate_job(job) for job in jobs]
+
+    n_workers = workers or os.cpu_count() or 1
+    # a few chunks per worker keeps IPC low while still balancing load
+    chunksize = max(1, len(jobs) // (n_workers * 4))
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(_simulate_job, jobs, chunksize=chunksize))
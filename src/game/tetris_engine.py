@@ -1,37 +1,189 @@
-import copy
+import math
 import random
 import numpy as np
 
 from game.constants import (
     BOARD_WIDTH, BOARD_HEIGHT,
     SCORE_TABLE, SPEED_INCREMENT, MIN_SPEED_MS, INITIAL_SPEED_MS,
-    KEY_ACTIONS, INITIAL_GAME_STATE, PIECE_IDS,
+    KEY_ACTIONS, INITIAL_GAME_STATE, PIECE_IDS, BOARD_BACKEND,
+    RANDOMIZER_MODE, LOOKAHEAD, ZOBRIST_HASHING,
+    REPEAT_ACTIONS, DAS_MS, ARR_MS,
     STATE_RUNNING, STATE_PAUSED, STATE_OVER,
 )
-from game.pieces import TETROMINOES
+from game.pieces import TETROMINOES, PIECE_TABLE, PieceOrientation
+from game.bitboard import BitBoard, FULL_ROW
+from game.randomizer import PieceGenerator, SHAPES
+from game.zobrist import board_hash, clear_hash, stamp_hash
 
 # ── Board ─────────────────────────────────────────────────────────────────────
 
-def create_empty_board():
+def create_empty_board(backend=None):
+    """Returns an empty board using BOARD_BACKEND unless a backend is given."""
+    if (backend or BOARD_BACKEND) == "bitboard":
+        return BitBoard.empty()
     return [[0] * BOARD_WIDTH for _ in range(BOARD_HEIGHT)]
 
 
 def apply_piece_to_board(board, piece_matrix, x, y, color_id):
-    """Stamps the current piece onto the board permanently (when it lands)."""
-    new_board = copy.deepcopy(board)
-    for row_i, row in enumerate(piece_matrix):
-        for col_i, cell in enumerate(row):
-            if cell:
-                new_board[y + row_i][x + col_i] = color_id
+    """
+    Stamps the current piece onto the board permanently (when it lands).
+    Accepts either a piece matrix or a PieceOrientation from PIECE_TABLE.
+    """
+    if isinstance(piece_matrix, PieceOrientation):
+        cells = piece_matrix.cells
+    else:
+        cells = [
+            (row_i, col_i)
+            for row_i, row in enumerate(piece_matrix)
+            for col_i, cell in enumerate(row)
+            if cell
+        ]
+    if isinstance(board, BitBoard):
+        return board.stamp(cells, x, y, color_id)
+    # only the rows the piece lands in are copied; the rest are shared
+    new_board = list(board)
+    for row_i, col_i in cells:
+        row = y + row_i
+        if new_board[row] is board[row]:
+            new_board[row] = list(board[row])
+        new_board[row][x + col_i] = color_id
     return new_board
 
 
 def clear_lines(board):
     """Removes full rows, returns new board and number of lines cleared."""
-    new_board = [row for row in board if any(cell == 0 for cell in row)]
-    lines_cleared = BOARD_HEIGHT - len(new_board)
-    empty_rows = [([0] * BOARD_WIDTH) for _ in range(lines_cleared)]
-    return empty_rows + new_board, lines_cleared
+    if isinstance(board, BitBoard):
+        return board.clear_lines()
+    full = full_rows(board)
+    return remove_rows(list(board), full), len(full)
+
+
+# ── Line clears ───────────────────────────────────────────────────────────────
+# state["row_fills"][r] counts the filled cells of row r. lock_piece adds the
+# piece's cells to the rows it lands in, then check_row_fills confirms the
+# counts against the board: a row counted full must have no gap and every
+# other row must have one, which reads each row only up to its first gap.
+# Counts that disagree (state["board"] was edited directly) are rebuilt, so
+# full rows anywhere on the board are cleared. The full rows are then removed
+# from the freshly stamped board in place, and their indices (before the
+# clear) kept in state["cleared_rows"] until the next lock, for animations
+# and scoring events.
+
+def row_fills(board):
+    """Computes the fill count of every row from scratch."""
+    return [BOARD_WIDTH - row.count(0) for row in board]
+
+
+def stamp_row_fills(fills, board, orientation, y):
+    """
+    Returns the row fill counts after `orientation` was stamped at row y;
+    `board` is the stamped board, rescanned when there are no counts yet.
+    """
+    if fills is None:
+        return row_fills(board)
+    fills = list(fills)
+    for row_i, mask in orientation.row_bits:
+        fills[y + row_i] += mask.bit_count()
+    return fills
+
+
+def check_row_fills(fills, board):
+    """
+    Returns `fills`, or the counts rebuilt from the board when they disagree
+    with it about which rows are full.
+    """
+    if isinstance(board, BitBoard):
+        board_full = [bits == FULL_ROW for bits in board.bits]
+    else:
+        board_full = [0 not in row for row in board]
+    if board_full == [fill == BOARD_WIDTH for fill in fills]:
+        return fills
+    return row_fills(board)
+
+
+def full_rows(board, rows=None, fills=None):
+    """
+    Returns the full rows among `rows` (default: every row), ascending. With
+    the board's row fill counts (or a BitBoard) each row is one lookup.
+    """
+    if rows is None:
+        rows = range(BOARD_HEIGHT)
+    if isinstance(board, BitBoard):
+        bits = board.bits
+        return sorted(r for r in rows if bits[r] == FULL_ROW)
+    if fills is not None:
+        return sorted(r for r in rows if fills[r] == BOARD_WIDTH)
+    return sorted(r for r in rows if 0 not in board[r])
+
+
+def remove_rows(board, full):
+    """
+    Removes the `full` rows (ascending) from a board in place, tops it up with
+    empty rows and returns it. Only for a board no state holds yet, such as
+    the one apply_piece_to_board just returned.
+    """
+    if isinstance(board, BitBoard):
+        return board.remove_rows(full)
+    for row_i in reversed(full):
+        del board[row_i]
+    board[:0] = [[0] * BOARD_WIDTH for _ in full]
+    return board
+
+
+def remove_row_fills(fills, full):
+    """remove_rows() for a list of row fill counts."""
+    for row_i in reversed(full):
+        del fills[row_i]
+    fills[:0] = [0] * len(full)
+    return fills
+
+
+# ── Column tops ───────────────────────────────────────────────────────────────
+# state["column_tops"][c] is the row of the highest filled cell in column c,
+# or BOARD_HEIGHT when the column is empty. lock_piece keeps it in step with
+# the board, so hard drops and the ghost need one lookup per piece column
+# instead of a collision check per row. Code that edits state["board"]
+# directly must refresh it with column_tops(board); get_ghost_position still
+# checks the landing it gets from them and rescans when it does not fit.
+
+def column_tops(board):
+    """Computes the column tops of a board from scratch."""
+    tops = []
+    for col in range(BOARD_WIDTH):
+        top = BOARD_HEIGHT
+        for row in range(BOARD_HEIGHT):
+            if board[row][col]:
+                top = row
+                break
+        tops.append(top)
+    return tops
+
+
+def update_column_tops(tops, board, cells, x, y, cleared=()):
+    """
+    Returns the column tops after a piece's cells were stamped at (x, y) and
+    the `cleared` rows (indices before the clear) were removed; `board` is
+    the board after the clear.
+    """
+    if tops is None:
+        return column_tops(board)
+    tops = list(tops)
+    for row_i, col_i in cells:
+        col = x + col_i
+        if y + row_i < tops[col]:
+            tops[col] = y + row_i
+    if cleared:
+        # a row that stays moves down by the cleared rows below it; a column
+        # whose top was cleared goes on at the first filled cell under it
+        for col, top in enumerate(tops):
+            row = top
+            while row in cleared:
+                row += 1
+            row += sum(1 for r in cleared if r > row)
+            while row < BOARD_HEIGHT and not board[row][col]:
+                row += 1
+            tops[col] = row
+    return tops
 
 # ── Pieces ────────────────────────────────────────────────────────────────────
 
@@ -41,26 +193,51 @@ def get_piece_matrix(shape, rotation):
     return np.rot90(matrix, k=-rotation)   # clockwise
 
 
+def get_piece_orientation(shape, rotation):
+    """Returns the precomputed PieceOrientation for a piece at a given rotation."""
+    return PIECE_TABLE[shape][rotation % 4]
+
+
 def random_piece():
-    return random.choice(list(TETROMINOES.keys()))
+    """Uniform pick from the global RNG; only used by states without a generator."""
+    return random.choice(SHAPES)
+
+
+def draw_piece(state):
+    """
+    Draws the next shape from the state's own generator, storing the advanced
+    generator back on the state. Call it only on a state you already copied.
+    """
+    if not state.get("generator"):
+        return random_piece()
+    generator = PieceGenerator.from_dict(state["generator"])
+    shape = generator.next()
+    state["generator"] = generator.to_dict()
+    return shape
+
+
+def upcoming_pieces(state):
+    """Returns next_piece followed by the generator's lookahead queue."""
+    queue = state["generator"]["queue"] if state.get("generator") else []
+    return [state["next_piece"]] + list(queue)
 
 
 # ── Collision ─────────────────────────────────────────────────────────────────
 
 def is_valid_position(board, piece, x, y, rotation=0):
     """Returns True if the piece can exist at (x, y) without overlap or OOB."""
-    matrix = get_piece_matrix(piece, rotation)
-    for row_i, row in enumerate(matrix):
-        for col_i, cell in enumerate(row):
-            if cell:
-                new_x = x + col_i
-                new_y = y + row_i
-                if new_x < 0 or new_x >= BOARD_WIDTH:
-                    return False
-                if new_y >= BOARD_HEIGHT:
-                    return False
-                if new_y >= 0 and board[new_y][new_x] != 0:
-                    return False
+    orientation = PIECE_TABLE[piece][rotation % 4]
+    if isinstance(board, BitBoard):
+        return board.fits(orientation, x, y)
+    # bounding box first: walls and floor are rejected without touching cells
+    if x + orientation.min_col < 0 or x + orientation.max_col >= BOARD_WIDTH:
+        return False
+    if y + orientation.max_row >= BOARD_HEIGHT:
+        return False
+    for row_i, col_i in orientation.cells:
+        new_y = y + row_i
+        if new_y >= 0 and board[new_y][x + col_i] != 0:
+            return False
     return True
 
 
@@ -83,12 +260,39 @@ def calculate_speed(level):
 
 # ── Ghost piece ───────────────────────────────────────────────────────────────
 
-def get_ghost_position(board, piece, x, y, rotation):
-    """Returns the y position where the piece would land if hard dropped."""
-    ghost_y = y
-    while is_valid_position(board, piece, x, ghost_y + 1, rotation):
-        ghost_y += 1
-    return ghost_y
+def get_ghost_position(board, piece, x, y, rotation, tops=None):
+    """
+    Returns the y position where the piece would land if hard dropped.
+    The drop is the smallest gap under the piece's bottom profile; with the
+    state's column tops most columns need a single lookup, and only columns
+    where the piece sits below the top (an overhang) are scanned.
+    """
+    orientation = PIECE_TABLE[piece][rotation % 4]
+    if tops is not None:
+        # the tops are a cache: when the board was edited without refreshing
+        # them, the landing they give is not trusted and the columns are scanned
+        ghost_y = _drop_on_tops(board, orientation, x, y, tops)
+        if ghost_y is not None and is_valid_position(board, piece, x, ghost_y, rotation):
+            return ghost_y
+    return _drop_on_tops(board, orientation, x, y, None)
+
+
+def _drop_on_tops(board, orientation, x, y, tops):
+    """The landing row from the bottom profile; None when a top is no filled cell."""
+    drop = BOARD_HEIGHT
+    for col_i, row_i in orientation.bottom:
+        col = x + col_i
+        below = y + row_i + 1          # first row under this column of the piece
+        if tops is not None and tops[col] >= below:
+            floor = tops[col]
+            if floor < BOARD_HEIGHT and not board[floor][col]:
+                return None
+        else:
+            floor = below
+            while floor < BOARD_HEIGHT and not board[floor][col]:
+                floor += 1
+        drop = min(drop, floor - below)
+    return y + drop
 
 
 # ── Piece actions ─────────────────────────────────────────────────────────────
@@ -108,15 +312,32 @@ def lock_piece(state):
     Called when a piece can't move down anymore.
     Stamps it on the board, clears lines, spawns next piece.
     """
-    state = copy.deepcopy(state)
+    state = dict(state)
     cp = state["current_piece"]
-    matrix = get_piece_matrix(cp["shape"], cp["rotation"])
-
-    state["board"] = apply_piece_to_board(
-        state["board"], matrix, cp["x"], cp["y"], cp["color_id"]
+    x, y = cp["x"], cp["y"]
+    orientation = get_piece_orientation(cp["shape"], cp["rotation"])
+
+    # a new board, so full rows can be removed from it in place
+    board = apply_piece_to_board(state["board"], orientation, x, y, cp["color_id"])
+    fills = stamp_row_fills(state.get("row_fills"), board, orientation, y)
+    fills = check_row_fills(fills, board)
+    full = full_rows(board, fills=fills)
+
+    h = state.get("board_hash")
+    if h is not None:
+        h = stamp_hash(h, orientation.cells, x, y, cp["color_id"])
+        state["board_hash"] = clear_hash(h, board, full) if full else h
+    if full:
+        remove_rows(board, full)
+        remove_row_fills(fills, full)
+    lines = len(full)
+
+    state["board"] = board
+    state["row_fills"] = fills
+    state["cleared_rows"] = full
+    state["column_tops"] = update_column_tops(
+        state.get("column_tops"), board, orientation.cells, x, y, full,
     )
-
-    state["board"], lines = clear_lines(state["board"])
     state["lines_cleared"] += lines
     state["score"] += calculate_score(lines, state["level"])
     state["level"] = calculate_level(state["lines_cleared"])
@@ -124,7 +345,7 @@ def lock_piece(state):
 
     next_shape = state["next_piece"]
     state["current_piece"] = spawn_piece(next_shape)
-    state["next_piece"] = random_piece()
+    state["next_piece"] = draw_piece(state)
 
     # check game over — if new piece immediately collides
     cp = state["current_piece"]
@@ -134,6 +355,17 @@ def lock_piece(state):
     return state
 
 
+# ── State updates ─────────────────────────────────────────────────────────────
+# Transitions never mutate the state they are given. Instead of deep-copying,
+# they copy the top-level dict and the current_piece dict, and keep sharing the
+# board rows; apply_piece_to_board copies only the rows it writes to.
+
+def _copy_for_update(state):
+    state = dict(state)
+    state["current_piece"] = dict(state["current_piece"])
+    return state
+
+
 # ── Keyboard input ────────────────────────────────────────────────────────────
 
 def handle_key_input(state, key):
@@ -150,7 +382,7 @@ def handle_key_input(state, key):
         return state
 
     if action == "pause":
-        state = copy.deepcopy(state)
+        state = dict(state)
         if state["status"] == STATE_RUNNING:
             state["status"] = STATE_PAUSED
         elif state["status"] == STATE_PAUSED:
@@ -160,7 +392,7 @@ def handle_key_input(state, key):
     if state["status"] != STATE_RUNNING:
         return state
 
-    state = copy.deepcopy(state)
+    state = _copy_for_update(state)
     cp = state["current_piece"]
 
     if action == "move_left":
@@ -179,7 +411,8 @@ def handle_key_input(state, key):
 
     elif action == "hard_drop":
         cp["y"] = get_ghost_position(
-            state["board"], cp["shape"], cp["x"], cp["y"], cp["rotation"]
+            state["board"], cp["shape"], cp["x"], cp["y"], cp["rotation"],
+            state.get("column_tops"),
         )
         state = lock_piece(state)
 
@@ -199,13 +432,67 @@ def handle_key_input(state, key):
             state["held_piece"] = cp["shape"]
             next_shape = held if held else state["next_piece"]
             if not held:
-                state["next_piece"] = random_piece()
+                state["next_piece"] = draw_piece(state)
             state["current_piece"] = spawn_piece(next_shape)
             state["can_hold"] = False
 
     return state
 
 
+# ── Batched input ─────────────────────────────────────────────────────────────
+# assets/input_buffer.js sends the keyboard activity of a time window as one
+# batch: {"start": t0, "end": t1, "held": {key: t_down}, "events": [[t, key,
+# pressed], ...]} (milliseconds, browser clock). "held" lists the keys that
+# were already down at t0. A press plays its key once; a repeating key that
+# stays down plays again DAS_MS after the press and then every ARR_MS until it
+# is released. Repeats are derived from the press time alone, so a key held
+# across several batches repeats on the same schedule as within one.
+
+def _repeat_times(down, up, start, end, das_ms, arr_ms):
+    """Repeat times of a key pressed at `down`, within (start, end] and before `up`."""
+    first = down + das_ms
+    if first <= start:
+        first += (math.floor((start - first) / arr_ms) + 1) * arr_ms
+    t = first
+    while t <= end and t < up:
+        yield t
+        t += arr_ms
+
+
+def batch_keys(batch, das_ms=DAS_MS, arr_ms=ARR_MS):
+    """The keys a batch plays, in time order (presses and repeats)."""
+    start, end = batch["start"], batch["end"]
+    presses = []   # (time, order, key)
+    down = dict(batch.get("held") or {})
+    spans = []     # (key, down, up) of every press of a repeating key
+
+    for order, (t, key, pressed) in enumerate(batch.get("events") or []):
+        if pressed:
+            if key in down:
+                continue              # no release seen: the browser's own repeat
+            down[key] = t
+            presses.append((t, order, key))
+        elif key in down:
+            spans.append((key, down.pop(key), t))
+    spans.extend((key, t, math.inf) for key, t in down.items())
+
+    for key, t_down, t_up in spans:
+        if KEY_ACTIONS.get(key) in REPEAT_ACTIONS:
+            presses.extend(
+                (t, math.inf, key)
+                for t in _repeat_times(t_down, t_up, start, end, das_ms, arr_ms)
+            )
+    presses.sort(key=lambda press: press[:2])
+    return [key for _, _, key in presses]
+
+
+def apply_key_batch(state, batch, das_ms=DAS_MS, arr_ms=ARR_MS):
+    """Applies a whole input batch in one call; see batch_keys."""
+    for key in batch_keys(batch, das_ms, arr_ms):
+        state = handle_key_input(state, key)
+    return state
+
+
 # ── Game tick ─────────────────────────────────────────────────────────────────
 
 def apply_game_tick(state):
@@ -216,7 +503,7 @@ def apply_game_tick(state):
     if state["status"] != STATE_RUNNING:
         return state
 
-    state = copy.deepcopy(state)
+    state = _copy_for_update(state)
     cp = state["current_piece"]
 
     if is_valid_position(state["board"], cp["shape"], cp["x"], cp["y"] + 1, cp["rotation"]):
@@ -230,11 +517,25 @@ def apply_game_tick(state):
 
 # ── Game control ──────────────────────────────────────────────────────────────
 
-def start_game():
-    """Returns a fresh game state."""
-    state = copy.deepcopy(INITIAL_GAME_STATE)
-    state["board"] = create_empty_board()
-    state["current_piece"] = spawn_piece(random_piece())
-    state["next_piece"] = random_piece()
+def start_game(backend=None, seed=None, mode=None, lookahead=None, hashing=None):
+    """
+    Returns a fresh game state. `backend` overrides BOARD_BACKEND; `seed`,
+    `mode` and `lookahead` configure the piece generator (a random seed is
+    picked when none is given, and is kept in the state for replays);
+    `hashing` overrides ZOBRIST_HASHING.
+    """
+    state = dict(INITIAL_GAME_STATE)
+    state["board"] = create_empty_board(backend)
+    state["column_tops"] = column_tops(state["board"])
+    state["row_fills"] = row_fills(state["board"])
+    if ZOBRIST_HASHING if hashing is None else hashing:
+        state["board_hash"] = board_hash(state["board"])
+    state["generator"] = PieceGenerator(
+        seed=seed,
+        mode=mode or RANDOMIZER_MODE,
+        lookahead=LOOKAHEAD if lookahead is None else lookahead,
+    ).to_dict()
+    state["current_piece"] = spawn_piece(draw_piece(state))
+    state["next_piece"] = draw_piece(state)
     state["status"] = STATE_RUNNING
     return state
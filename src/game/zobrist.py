@@ -0,0 +1,166 @@
+from collections import OrderedDict
+
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT, COLORS
+from game.pieces import PIECE_TABLE
+from game.randomizer import mulberry32
+
+# ── Zobrist hashing ───────────────────────────────────────────────────────────
+# Every (row, col, color) a board cell can hold gets a fixed random key, and a
+# board's hash is the XOR of the keys of its filled cells. Stamping a piece
+# XORs in its 4 cells; a line clear XORs out the cleared rows and re-keys only
+# the non-empty rows that moved down. The falling piece adds one key for its
+# shape and rotation and one per coordinate, so a move costs a few XORs and
+# needs no bookkeeping: state_hash() combines the two parts on demand.
+#
+# Keys come from mulberry32 with a fixed seed, so hashes are stable across
+# processes and runs. They are 53 bits wide (XORs stay below 2**53): a hash
+# kept in the game state survives the JSON round-trip through the browser.
+
+ZOBRIST_SEED = 0x2B0B215
+_KEY_BITS = 53
+
+_PAD = 4   # pieces can sit a few columns off the board edge (see PIECE_TABLE)
+
+
+def _keys(seed):
+    state = seed
+    while True:
+        state, high = mulberry32(state)
+        state, low = mulberry32(state)
+        yield (high >> (64 - _KEY_BITS)) << 32 | low
+
+
+def _build_tables():
+    keys = _keys(ZOBRIST_SEED)
+    colors = [color for color in COLORS if isinstance(color, int) and color]
+    cell = [
+        [[0] * (max(colors) + 1) for _ in range(BOARD_WIDTH)]
+        for _ in range(BOARD_HEIGHT)
+    ]
+    for row in range(BOARD_HEIGHT):
+        for col in range(BOARD_WIDTH):
+            for color in colors:
+                cell[row][col][color] = next(keys)
+    piece = {
+        shape: [next(keys) for _ in rotations]
+        for shape, rotations in PIECE_TABLE.items()
+    }
+    xs = [next(keys) for _ in range(BOARD_WIDTH + 2 * _PAD)]
+    ys = [next(keys) for _ in range(BOARD_HEIGHT + _PAD)]
+    return cell, piece, xs, ys
+
+
+CELL_KEYS, PIECE_KEYS, X_KEYS, Y_KEYS = _build_tables()
+
+
+def row_hash(row, r):
+    """XOR of the keys of a row's filled cells, as if it sat at board row r."""
+    keys = CELL_KEYS[r]
+    h = 0
+    for col, color in enumerate(row):
+        if color:
+            h ^= keys[col][color]
+    return h
+
+
+def board_hash(board):
+    """Hashes a whole board from scratch."""
+    h = 0
+    for r, row in enumerate(board):
+        if any(row):
+            h ^= row_hash(row, r)
+    return h
+
+
+def piece_hash(piece):
+    return (
+        PIECE_KEYS[piece["shape"]][piece["rotation"] % 4]
+        ^ X_KEYS[piece["x"] + _PAD]
+        ^ Y_KEYS[piece["y"]]
+    )
+
+
+def state_hash(state):
+    """Hash of the board plus the falling piece."""
+    h = state.get("board_hash")
+    if h is None:
+        h = board_hash(state["board"])
+    return h ^ piece_hash(state["current_piece"])
+
+
+def stamp_hash(h, cells, x, y, color_id):
+    """Board hash after apply_piece_to_board stamped `cells` at (x, y)."""
+    for row_i, col_i in cells:
+        h ^= CELL_KEYS[y + row_i][x + col_i][color_id]
+    return h
+
+
+def clear_hash(h, board, full):
+    """
+    Board hash after remove_rows(board, full). The `full` rows (ascending)
+    are XORed out; rows above them move down by the number of cleared rows
+    below, so only those that are not empty are re-keyed. Rows under the
+    lowest cleared row keep their keys and are not read.
+    """
+    cleared = set(full)
+    shift = 0
+    for r in range(full[-1], -1, -1):
+        row = board[r]
+        if r in cleared:
+            h ^= row_hash(row, r)
+            shift += 1
+        elif any(row):
+            h ^= row_hash(row, r) ^ row_hash(row, r + shift)
+    return h
+
+
+# ── Transposition table ───────────────────────────────────────────────────────
+
+class TranspositionTable:
+    """
+    A bounded LRU map from position hashes (or any hashable key) to values.
+    get() counts hits and misses so cache sizes can be tuned.
+    """
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    __setitem__ = put
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries":  len(self._entries),
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,8 @@
+# gunicorn settings, taken from game/constants.py. From src/:
+#     gunicorn -c gunicorn.conf.py wsgi:server
+from game.constants import SERVER_BIND, SERVER_THREADS, SERVER_WORKERS
+
+bind = SERVER_BIND
+workers = SERVER_WORKERS
+threads = SERVER_THREADS
+worker_class = "gthread"     # each worker serves SERVER_THREADS requests at once
@@ -0,0 +1,74 @@
+from game.constants import (
+    BOARD_WIDTH, BOARD_HEIGHT, PIECE_IDS, KEY_ACTIONS,
+    INITIAL_SPEED_MS, SPEED_INCREMENT, MIN_SPEED_MS,
+    STATE_IDLE, STATE_RUNNING, STATE_PAUSED, STATE_OVER,
+)
+from game.pieces import PIECE_TABLE
+from game.randomizer import SHAPES
+from game.tetris_engine import (
+    apply_game_tick, calculate_score, handle_key_input, spawn_piece,
+)
+
+# ── Clientside game loop support ──────────────────────────────────────────────
+# With GAME_LOOP = "clientside" the browser runs assets/tetris_engine.js and
+# only talks to the server at checkpoints (each lock, pause or game over).
+# A checkpoint carries the inputs recorded since the previous one — a key
+# string per key press, None per tick — and the state the client reached.
+# The server replays those inputs from its own copy of the state with the
+# Python engine; the replayed state is the authoritative one.
+
+
+def engine_config():
+    """Everything assets/tetris_engine.js needs, so rules live only in Python."""
+    return {
+        "width":  BOARD_WIDTH,
+        "height": BOARD_HEIGHT,
+        "shapes": list(SHAPES),
+        "pieces": {
+            shape: [
+                {
+                    "cells":   [list(cell) for cell in o.cells],
+                    "min_col": o.min_col,
+                    "max_col": o.max_col,
+                    "max_row": o.max_row,
+                    "bottom":  [list(cell) for cell in o.bottom],
+                }
+                for o in rotations
+            ]
+            for shape, rotations in PIECE_TABLE.items()
+        },
+        "piece_ids":       dict(PIECE_IDS),
+        "spawn_x":         spawn_piece(SHAPES[0])["x"],
+        "score_table":     [calculate_score(lines, 1) for lines in range(5)],
+        "initial_speed":   INITIAL_SPEED_MS,
+        "speed_increment": SPEED_INCREMENT,
+        "min_speed":       MIN_SPEED_MS,
+        "key_actions":     dict(KEY_ACTIONS),
+        "pause_key":       next(k for k, a in KEY_ACTIONS.items() if a == "pause"),
+        "states": {
+            "idle":    STATE_IDLE,
+            "running": STATE_RUNNING,
+            "paused":  STATE_PAUSED,
+            "over":    STATE_OVER,
+        },
+    }
+
+
+def replay_events(state, events):
+    """Applies recorded inputs (key strings, None for a tick) to a state."""
+    for event in events:
+        if event is None:
+            state = apply_game_tick(state)
+        else:
+            state = handle_key_input(state, event)
+    return state
+
+
+def validate_checkpoint(authoritative, checkpoint):
+    """
+    Replays a checkpoint's inputs on the authoritative state.
+    Returns (ok, replayed_state); ok is False when the client's reported
+    state differs from the replay and must be resynced.
+    """
+    replayed = replay_events(authoritative, checkpoint.get("events") or [])
+    return replayed == checkpoint.get("state"), replayed
@@ -0,0 +1,304 @@
+import importlib
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import Response, g, has_request_context, request
+from loguru import logger
+
+import game.tetris_engine as tetris_engine
+from game.constants import METRICS_ENABLED, METRICS_LOG_INTERVAL_S, METRICS_PATH
+
+# ── Instrumentation ───────────────────────────────────────────────────────────
+# Opt-in (METRICS_ENABLED). When on:
+#   - every Dash callback is timed (instrument_app), with the net number of
+#     memory blocks it left allocated;
+#   - the engine functions in ENGINE_FUNCTIONS are timed, and state copies
+#     (tetris_engine._copy_for_update) counted (instrument_engine), in the
+#     engine and in every ENGINE_MODULES module that imported them by name;
+#   - request and response bytes of every callback request are recorded;
+#   - METRICS_PATH serves it all in the Prometheus text format and a
+#     structured log line summarizes it every METRICS_LOG_INTERVAL_S.
+# When off, install() and instrument_app() return without wrapping anything,
+# so the hot path runs exactly the code it runs without this module.
+
+PREFIX = "tetris"
+
+# seconds; roughly x2.5 apart from 10us to 2.5s
+LATENCY_BUCKETS = (
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+BYTES_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+BLOCKS_BUCKETS = (0, 10, 100, 1000, 10000, 100000)
+
+# engine functions worth a histogram; is_valid_position is left out, since a
+# timer would cost as much as the call itself
+ENGINE_FUNCTIONS = (
+    "handle_key_input", "apply_game_tick", "apply_key_batch", "lock_piece",
+    "clear_lines", "get_ghost_position", "draw_piece", "start_game",
+)
+
+# modules that call the engine functions through names they imported; each
+# gets the timed versions too (imported when instrumenting, as callbacks
+# imports this module)
+ENGINE_MODULES = (
+    "game.tetris_engine", "game.batch_engine", "game.replay", "game.simulator",
+    "server.serving", "server.clientside", "server.profiling", "components.board",
+    "callbacks",
+)
+
+# what the metrics mean, for the Prometheus HELP lines
+METRICS_HELP = {
+    "callback_seconds":      ("histogram", "Dash callback latency", LATENCY_BUCKETS),
+    "callback_alloc_blocks": ("histogram", "Memory blocks left allocated by a callback",
+                              BLOCKS_BUCKETS),
+    "engine_seconds":        ("histogram", "Engine function latency", LATENCY_BUCKETS),
+    "request_bytes":         ("histogram", "Callback request body size", BYTES_BUCKETS),
+    "response_bytes":        ("histogram", "Callback response body size", BYTES_BUCKETS),
+    "state_copies_total":    ("counter", "Game states copied for an update", None),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus exposes them."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (inf past the last)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Histograms and counters keyed by (metric, label value)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, metric, label, value):
+        with self._lock:
+            histogram = self.histograms.get((metric, label))
+            if histogram is None:
+                histogram = Histogram(METRICS_HELP[metric][2])
+                self.histograms[(metric, label)] = histogram
+            histogram.observe(value)
+
+    def inc(self, metric, label="", value=1):
+        with self._lock:
+            self.counters[(metric, label)] = self.counters.get((metric, label), 0) + value
+
+    def clear(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render_prometheus(self):
+        """The Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for metric, (kind, help_text, _) in METRICS_HELP.items():
+                name = f"{PREFIX}_{metric}"
+                label_name = _label_name(metric)
+                if kind == "counter":
+                    values = [(l, v) for (m, l), v in self.counters.items() if m == metric]
+                else:
+                    values = [(l, h) for (m, l), h in self.histograms.items() if m == metric]
+                if not values:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for label, value in sorted(values, key=lambda item: item[0]):
+                    labels = f'{label_name}="{label}"'
+                    if kind == "counter":
+                        lines.append(f"{name}{{{labels}}} {value}" if label else f"{name} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(value.buckets, value.counts):
+                        cumulative += n
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {value.count}')
+                    lines.append(f"{name}_sum{{{labels}}} {value.sum}")
+                    lines.append(f"{name}_count{{{labels}}} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Per metric and label: count, p50, p99 (ms for latencies) — for the log line."""
+        out = {}
+        with self._lock:
+            for (metric, label), h in self.histograms.items():
+                scale = 1e3 if metric.endswith("_seconds") else 1
+                out.setdefault(metric, {})[label] = {
+                    "n":   h.count,
+                    "p50": h.quantile(0.5) * scale,
+                    "p99": h.quantile(0.99) * scale,
+                }
+            for (metric, label), value in self.counters.items():
+                out.setdefault(metric, {})[label or "all"] = value
+        return out
+
+
+def _label_name(metric):
+    if metric.startswith("engine"):
+        return "function"
+    return "callback"
+
+
+METRICS = Metrics()
+
+
+# ── Wrapping ──────────────────────────────────────────────────────────────────
+
+def instrument_callback(fn, metrics=METRICS):
+    """Times a Dash callback and records the memory blocks it leaves allocated."""
+    name = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            metrics.observe("callback_seconds", name, time.perf_counter() - start)
+            metrics.observe(
+                "callback_alloc_blocks", name, max(0, sys.getallocatedblocks() - blocks)
+            )
+            _tag_request(name)
+
+    return wrapper
+
+
+def _tag_request(name):
+    # lets the request hook label the payload sizes with the callback's name
+    if has_request_context():
+        g.metrics_callback = name
+
+
+class _InstrumentedApp:
+    """Stands in for the Dash app while callbacks register, wrapping each one."""
+
+    def __init__(self, app, metrics):
+        self._app = app
+        self._metrics = metrics
+
+    def callback(self, *args, **kwargs):
+        register = self._app.callback(*args, **kwargs)
+        return lambda fn: register(instrument_callback(fn, self._metrics))
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
+
+
+def instrument_app(app, enabled=METRICS_ENABLED, metrics=METRICS):
+    """The app to register callbacks on: app itself, or a wrapper timing them."""
+    return _InstrumentedApp(app, metrics) if enabled else app
+
+
+def _timed(fn, metrics):
+    name = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            metrics.observe("engine_seconds", name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _counted(fn, metrics):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        metrics.inc("state_copies_total")
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument_engine(metrics=METRICS, modules=ENGINE_MODULES):
+    """
+    Replaces the ENGINE_FUNCTIONS (and _copy_for_update) with timed versions
+    wherever `modules` (names) refer to them, so the engine's own internal
+    calls are timed too. Returns the patches, for restore_engine().
+    """
+    wrapped = {name: _timed(getattr(tetris_engine, name), metrics) for name in ENGINE_FUNCTIONS}
+    wrapped["_copy_for_update"] = _counted(tetris_engine._copy_for_update, metrics)
+    patches = []
+    for module in map(importlib.import_module, modules):
+        for name, wrapper in wrapped.items():
+            original = getattr(module, name, None)
+            if original is not None and original is wrapper.__wrapped__:
+                patches.append((module, name, original))
+                setattr(module, name, wrapper)
+    return patches
+
+
+def restore_engine(patches):
+    for module, name, original in patches:
+        setattr(module, name, original)
+
+
+# ── Serving ───────────────────────────────────────────────────────────────────
+
+def _log_loop(metrics, interval):
+    while True:
+        time.sleep(interval)
+        summary = metrics.summary()
+        logger.bind(metrics=summary).info(
+            "metrics {}", json.dumps(summary, separators=(",", ":"))
+        )
+
+
+def install(server, enabled=METRICS_ENABLED, metrics=METRICS,
+            log_interval=METRICS_LOG_INTERVAL_S):
+    """
+    Hooks the metrics into the app's Flask server: engine timing, payload
+    sizes, the METRICS_PATH endpoint and the periodic log line. A no-op
+    unless enabled; otherwise returns the engine patches (see restore_engine).
+    """
+    if not enabled:
+        return None
+    patches = instrument_engine(metrics)
+
+    @server.after_request
+    def record_payload(response):
+        if request.path.endswith("_dash-update-component"):
+            label = g.get("metrics_callback", "unknown")
+            metrics.observe("request_bytes", label, request.content_length or 0)
+            if not response.direct_passthrough:
+                metrics.observe("response_bytes", label, len(response.get_data()))
+        return response
+
+    server.add_url_rule(
+        METRICS_PATH, "metrics",
+        lambda: Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4"),
+    )
+    if log_interval:
+        threading.Thread(
+            target=_log_loop, args=(metrics, log_interval), daemon=True,
+        ).start()
+    return patches
@@ -0,0 +1,231 @@
+"""
+Profiling mode: per-game cProfile and tracemalloc dumps, with a replay.
+
+A profiled game runs its engine steps and renders under cProfile. Every
+PROFILE_EVERY_TICKS ticks, the profile of those ticks and the top
+PROFILE_TOP_N allocation sites are written to PROFILE_DIR, along with the
+game's replay log (game/replay.py) so far. The dumps are named
+<session>-<seed>-<tick>, where session is the server session id or
+"client". Replaying the log re-runs the exact game headless under the
+profiler. From src/:
+
+    TETRIS_PROFILE=1 python app.py                      # profile every game
+    python app.py   # then open http://127.0.0.1:8050/?profile=1 for one player
+    python -m server.profiling profiles/client-1234.trpl
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from game.constants import (
+    KEY_ACTIONS, PROFILE_DIR, PROFILE_ENV, PROFILE_EVERY_TICKS, PROFILE_TOP_N,
+    STATE_RUNNING,
+)
+from game.replay import ReplayRecorder, decode_replay, iter_events
+from game.tetris_engine import handle_key_input, start_game
+from server.serving import tick_step
+
+# ── Profiling mode ────────────────────────────────────────────────────────────
+# Only games started while it is on are profiled: every game when PROFILE_ENV
+# is set at launch, or the games of a page opened with ?profile=1. Others
+# pay one dict lookup per callback. Games are filed by server session id;
+# client storage has no session, so there they are told apart by seed.
+#
+# cProfile allows one active profiler per process, so profiled blocks run one
+# at a time, and tracemalloc traces the whole process while any game is
+# profiled: keep this mode to reproducing a problem, not to serving.
+# With ENGINE_POOL = "process" the engine steps run out of the profiler's
+# sight; the replay shows them.
+
+PROFILE_ALL = os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+PAUSE_KEY = next(key for key, action in KEY_ACTIONS.items() if action == "pause")
+
+_PROFILE_LOCK = threading.Lock()
+
+
+def profiling_requested(search):
+    """Whether a page URL query string (dcc.Location's "search") asks for profiling."""
+    values = parse_qs((search or "").lstrip("?")).get("profile", [])
+    return PROFILE_ALL or any(v not in ("", "0") for v in values)
+
+
+class GameProfiler:
+    """The profiler, allocation dumps and replay recorder of one game."""
+
+    def __init__(self, state, session=None, demo=False,
+                 directory=PROFILE_DIR, every_ticks=PROFILE_EVERY_TICKS, top_n=PROFILE_TOP_N):
+        generator = state["generator"]
+        self.seed = generator["seed"]
+        self.session = session or "client"
+        self.demo = demo
+        self.directory = Path(directory)
+        self.every_ticks = every_ticks
+        self.top_n = top_n
+        self.name = f"{re.sub(r'[^\w-]', '_', self.session)}-{self.seed}"
+        self.recorder = ReplayRecorder.for_state(state)
+        self.profile = cProfile.Profile()
+        self.ticks = 0
+        self.dumps = []
+
+    @contextmanager
+    def measure(self, events=()):
+        """
+        Profiles the block, then records its events (keys, None per tick) for
+        the replay; dumps every `every_ticks` ticks.
+        """
+        with _PROFILE_LOCK:
+            self.profile.enable()
+            try:
+                yield self
+            finally:
+                self.profile.disable()
+                self.record(events)
+
+    def record(self, events):
+        for event in events:
+            self.recorder.record(event)
+            if event is None:
+                self.ticks += 1
+                if self.ticks % self.every_ticks == 0:
+                    self.dump()
+
+    def dump(self):
+        """Writes the profile since the last dump, the top allocations and the replay."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = self.directory / f"{self.name}-{self.ticks:06d}"
+        self.profile.create_stats()
+        if self.profile.stats:
+            self.profile.dump_stats(f"{stem}.prof")
+        self.profile = cProfile.Profile()
+        if tracemalloc.is_tracing():
+            Path(f"{stem}.alloc.txt").write_text(self._top_allocations())
+        replay = self.directory / f"{self.name}.trpl"
+        replay.write_bytes(self.recorder.to_bytes())
+        self.dumps.append(stem.name)
+        meta = {
+            "session":  self.session,
+            "seed":     self.seed,
+            "demo":     self.demo,
+            "ticks":    self.ticks,
+            "dumps":    self.dumps,
+            "replay":   replay.name,
+        }
+        (self.directory / f"{self.name}.json").write_text(json.dumps(meta, indent=2))
+        return stem
+
+    def _top_allocations(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        lines = [f"# {self.name} tick {self.ticks}: top {self.top_n} allocation sites"]
+        lines += [str(stat) for stat in snapshot.statistics("lineno")[:self.top_n]]
+        return "\n".join(lines) + "\n"
+
+
+class ProfileRegistry:
+    """The games being profiled, by session (see _key)."""
+
+    def __init__(self, **options):
+        self._games = {}
+        self._lock = threading.Lock()
+        self._options = options
+
+    def start(self, state, session=None, demo=False):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            profiler = GameProfiler(state, session, demo, **self._options)
+            self._games[_key(state, session)] = profiler
+            return profiler
+
+    def get(self, state, session=None):
+        if not self._games or not state:
+            return None
+        return self._games.get(_key(state, session))
+
+    def record(self, state, events, session=None):
+        """Records events of a profiled game that involve no engine step to time."""
+        profiler = self.get(state, session)
+        if profiler is not None:
+            with _PROFILE_LOCK:
+                profiler.record(events)
+
+    def stop(self, state, session=None):
+        """Final dump of a game (one that ended or was replaced); None if not profiled."""
+        with self._lock, _PROFILE_LOCK:
+            profiler = self._games.pop(_key(state, session), None) if state else None
+            if profiler is None:
+                return None
+            stem = profiler.dump()
+            if not self._games:
+                tracemalloc.stop()
+            return stem
+
+
+def _key(state, session):
+    if session is not None:
+        return session
+    # None for the idle initial state, which has no generator yet
+    generator = state.get("generator")
+    return ("client", generator["seed"]) if generator else None
+
+
+PROFILES = ProfileRegistry()
+
+
+def profiled(state, events=(), session=None):
+    """Profiles the block when state's game is profiled; a no-op context otherwise."""
+    profiler = PROFILES.get(state, session)
+    if profiler is None:
+        return nullcontext()
+    return profiler.measure(events)
+
+
+# ── Replay ────────────────────────────────────────────────────────────────────
+
+def replay_game(data, demo=False):
+    """Re-runs a replay log headless, the way the server loop played it."""
+    header, _ = decode_replay(data)
+    state = start_game(seed=header["seed"], mode=header["mode"], lookahead=header["lookahead"])
+    for event in iter_events(data):
+        if event is not None:
+            state = handle_key_input(state, event)
+        elif state["status"] == STATE_RUNNING:
+            state = tick_step(state, demo)
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replays a profiled game under cProfile.")
+    parser.add_argument("replay", help="a .trpl written by the profiling mode")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key")
+    parser.add_argument("--limit", type=int, default=30, help="rows to print")
+    parser.add_argument("-o", "--output", help="also dump the stats here")
+    args = parser.parse_args(argv)
+
+    path = Path(args.replay)
+    meta_path = path.with_suffix(".json")
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    profile = cProfile.Profile()
+    state = profile.runcall(replay_game, path.read_bytes(), meta.get("demo", False))
+    print(f"replayed seed {state['generator']['seed']}: tick {state['tick']}, "
+          f"score {state['score']}, {state['status']}")
+    if args.output:
+        profile.dump_stats(args.output)
+    pstats.Stats(profile).sort_stats(args.sort).print_stats(args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
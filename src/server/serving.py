@@ -0,0 +1,79 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from game.autoplayer import choose_keys
+from game.constants import (
+    ENGINE_POOL, ENGINE_POOL_SIZE, SERVER_WORKERS, STATE_STORAGE,
+)
+from game.tetris_engine import apply_game_tick, apply_key_batch, handle_key_input
+
+# ── Production serving ────────────────────────────────────────────────────────
+# wsgi.py exposes the Flask server to a WSGI server; gunicorn.conf.py runs it
+# with SERVER_WORKERS processes of SERVER_THREADS request threads each:
+#
+#     gunicorn -c gunicorn.conf.py wsgi:server      (from src/)
+#
+# Callbacks for many games then run side by side. With STATE_STORAGE =
+# "server", those of one game are serialized by SessionStore.lock, so a key
+# press and a tick can never both update the state they read.
+#
+# The engine steps below are what the server-loop callbacks run. They go
+# through run_engine, which calls them in the request thread or hands them to
+# a pool (ENGINE_POOL); a process pool keeps slow steps such as the demo
+# autoplayer off the request threads' GIL.
+
+
+def check_serving_config(workers=SERVER_WORKERS, storage=STATE_STORAGE):
+    if workers > 1 and storage == "server":
+        raise ValueError(
+            'STATE_STORAGE = "server" keeps sessions in one process: '
+            "run a single worker (more threads) or use client storage"
+        )
+
+
+def key_step(state, key):
+    return handle_key_input(state, key)
+
+
+def batch_step(state, batch):
+    return apply_key_batch(state, batch)
+
+
+def tick_step(state, demo=False):
+    if demo:
+        for key in choose_keys(state):
+            state = handle_key_input(state, key)
+    return apply_game_tick(state)
+
+
+POOLS = {
+    "thread":  ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+_pool = None
+
+
+def engine_pool(kind=ENGINE_POOL, size=ENGINE_POOL_SIZE):
+    """The process-wide engine pool, created on first use (None when inline)."""
+    global _pool
+    if kind is None:
+        return None
+    if _pool is None:
+        try:
+            pool_class = POOLS[kind]
+        except KeyError:
+            raise ValueError(
+                f"Unknown engine pool {kind!r}, expected None or one of {list(POOLS)}"
+            ) from None
+        _pool = pool_class(max_workers=size)
+        atexit.register(_pool.shutdown)
+    return _pool
+
+
+def run_engine(step, *args, pool=None):
+    """Runs an engine step inline or on the engine pool and returns its result."""
+    pool = pool or engine_pool()
+    if pool is None:
+        return step(*args)
+    return pool.submit(step, *args).result()
@@ -0,0 +1,196 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from game.constants import (
+    SESSION_TTL_S, SESSION_MAX, SESSION_BACKEND, SESSION_DB_PATH,
+)
+
+# ── Server-side session store ─────────────────────────────────────────────────
+# With STATE_STORAGE = "server" the browser's dcc.Store only holds a session
+# id; the game state itself stays here, in process. Recently used sessions
+# live in an LRU dict (no JSON encode/decode on the hot path). A backend, if
+# configured, is written through on every put and read on a cache miss, so
+# sessions survive LRU eviction and worker restarts.
+#
+# lock(sid) hands out one lock per session, so callbacks running in parallel
+# request threads can serialize their read-modify-write of the same game. A
+# lock counts the requests holding or waiting for it, and is only dropped
+# (with its session, or once its session is gone) when that count is zero:
+# otherwise the next request would get a fresh lock and run alongside them.
+
+
+class SqliteBackend:
+    """Keeps states as JSON rows in a local SQLite file."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, sid):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, updated FROM sessions WHERE id = ?", (sid,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, sid, state, updated):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, updated) VALUES (?, ?, ?)",
+                (sid, json.dumps(state), updated),
+            )
+            self._conn.commit()
+
+    def delete(self, sid):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+            self._conn.commit()
+
+    def purge(self, older_than):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE updated < ?", (older_than,))
+            self._conn.commit()
+
+
+BACKENDS = {
+    "memory": lambda: None,
+    "sqlite": lambda: SqliteBackend(SESSION_DB_PATH),
+}
+
+
+class SessionStore:
+    """In-process session states with TTL and LRU eviction."""
+
+    def __init__(
+        self, backend=None, ttl=SESSION_TTL_S, max_sessions=SESSION_MAX,
+        clock=time.monotonic,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions = OrderedDict()   # sid -> (state, last_used)
+        self._locks = {}                 # sid -> [per-session lock, users]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, sid):
+        return self.get(sid) is not None
+
+    def new_id(self):
+        return uuid.uuid4().hex
+
+    def get(self, sid):
+        """Returns the state for sid, or None if unknown or expired."""
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is not None:
+                state, last_used = entry
+                if now - last_used <= self.ttl:
+                    self._sessions[sid] = (state, now)
+                    self._sessions.move_to_end(sid)
+                    return state
+                del self._sessions[sid]
+                self._drop_lock(sid)
+        if self.backend is None:
+            return None
+
+        stored = self.backend.get(sid)
+        if stored is None:
+            return None
+        state, updated = stored
+        if time.time() - updated > self.ttl:
+            self.backend.delete(sid)
+            return None
+        self._remember(sid, state, now)
+        return state
+
+    def put(self, sid, state):
+        """Stores state under sid (a new id when sid is None); returns the id."""
+        if sid is None:
+            sid = self.new_id()
+        self._remember(sid, state, self._clock())
+        if self.backend is not None:
+            self.backend.put(sid, state, time.time())
+        return sid
+
+    @contextmanager
+    def lock(self, sid):
+        """Holds the lock that serializes updates to one session."""
+        with self._lock:
+            entry = self._locks.get(sid)
+            if entry is None:
+                entry = self._locks[sid] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1] and sid not in self._sessions:
+                    self._drop_lock(sid)
+
+    def _drop_lock(self, sid):
+        # callers hold self._lock
+        entry = self._locks.get(sid)
+        if entry is not None and not entry[1]:
+            del self._locks[sid]
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+            self._drop_lock(sid)
+        if self.backend is not None:
+            self.backend.delete(sid)
+
+    def purge_expired(self):
+        """Drops every expired session; returns how many were dropped in memory."""
+        now = self._clock()
+        with self._lock:
+            expired = [
+                sid for sid, (_, used) in self._sessions.items()
+                if now - used > self.ttl
+            ]
+            for sid in expired:
+                del self._sessions[sid]
+                self._drop_lock(sid)
+        if self.backend is not None:
+            self.backend.purge(time.time() - self.ttl)
+        return len(expired)
+
+    def _remember(self, sid, state, now):
+        with self._lock:
+            self._sessions[sid] = (state, now)
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self._drop_lock(evicted)
+
+
+def create_session_store():
+    """Builds the store configured by SESSION_BACKEND in game/constants.py."""
+    try:
+        backend_class = BACKENDS[SESSION_BACKEND]
+    except KeyError:
+        raise ValueError(
+            f"Unknown session backend {SESSION_BACKEND!r}, "
+            f"expected one of {list(BACKENDS)}"
+        ) from None
+    return SessionStore(backend=backend_class())
@@ -0,0 +1,39 @@
+import pytest
+from dash import no_update
+
+
+class FakeApp:
+    """Collects the callbacks register_callbacks defines, by function name."""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.clientside = []
+        self.title = "fake"
+
+    def callback(self, *args, **kwargs):
+        def decorator(fn):
+            self.callbacks[fn.__name__] = fn
+            return fn
+        return decorator
+
+    def clientside_callback(self, *args, **kwargs):
+        self.clientside.append(args)
+
+
+def keep_stores(outputs, data, hot):
+    """The game-state and game-hot store contents after a callback's outputs."""
+    new_data, new_hot = outputs[:2]
+    return (
+        data if new_data is no_update else new_data,
+        hot if new_hot is no_update else new_hot,
+    )
+
+
+@pytest.fixture
+def fake_app():
+    return FakeApp()
+
+
+@pytest.fixture
+def keep():
+    return keep_stores
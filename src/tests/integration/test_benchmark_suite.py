@@ -0,0 +1,48 @@
+import json
+
+from benchmarks import suite
+
+
+def _results(**ops):
+    return {"results": {name: {"ops_per_sec": value} for name, value in ops.items()}}
+
+
+def test_measure_reports_throughput_latency_and_memory():
+    result = suite.measure(lambda n: [0] * n, [(10,), (1000,)], min_time=0.01)
+    assert result["calls"] >= 2
+    assert result["ops_per_sec"] > 0
+    assert 0 < result["p50_us"] <= result["p95_us"] <= result["p99_us"]
+    assert 0 <= result["noise"] < 1
+    assert result["peak_kib"] > 0
+
+def test_compare_flags_drops_beyond_the_threshold():
+    baseline = _results(a=1000, b=1000, c=1000)
+    results = _results(a=900, b=700, c=2000, d=5)
+    regressions = suite.compare(results, baseline, threshold=0.25)
+    assert [name for name, *_ in regressions] == ["b"]
+    assert suite.compare(results, baseline, threshold=0.05)[0][0] == "a"
+
+def test_compare_allows_for_measured_noise():
+    baseline = _results(a=1000, b=1000)
+    results = _results(a=700, b=700)
+    results["results"]["a"]["noise"] = 0.1
+    regressions = suite.compare(results, baseline, threshold=0.25)
+    assert [name for name, *_ in regressions] == ["b"]
+
+def test_run_writes_results_and_exits_on_regression(tmp_path):
+    out = tmp_path / "results.json"
+    baseline = tmp_path / "baseline.json"
+    assert suite.main(["--quick", "--filter", "clear_lines",
+                       "--baseline", str(baseline), "--save-baseline"]) == 0
+
+    saved = json.loads(baseline.read_text())
+    saved["results"]["clear_lines"]["ops_per_sec"] *= 100
+    baseline.write_text(json.dumps(saved))
+    assert suite.main(["--quick", "--filter", "clear_lines",
+                       "--baseline", str(baseline), "-o", str(out)]) == 1
+    assert set(json.loads(out.read_text())["results"]) == {"clear_lines"}
+
+def test_cases_cover_every_key_action():
+    names = {case.name for case in suite.CASES}
+    assert {"handle_key_input[move_left]", "handle_key_input[hard_drop]",
+            "render_board", "render_mini_board"} <= names
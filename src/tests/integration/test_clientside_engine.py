@@ -0,0 +1,121 @@
+import json
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import callbacks
+from game.constants import KEY_ACTIONS
+from game.tetris_engine import start_game
+from server.clientside import engine_config, replay_events, validate_checkpoint
+from server.session_store import SessionStore
+
+ENGINE_JS = Path(__file__).resolve().parents[2] / "assets" / "tetris_engine.js"
+
+# runs a list of games through the JS port and prints every intermediate state
+NODE_RUNNER = """
+const engine = require(process.argv[1]);
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+const out = input.games.map(({state, events}) => events.map((event) => {
+    state = event === null
+        ? engine.applyGameTick(input.config, state)
+        : engine.handleKeyInput(input.config, state, event);
+    return state;
+}));
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def _random_events(seed, n):
+    rng = random.Random(seed)
+    keys = list(KEY_ACTIONS) + ["q"]
+    return [None if rng.random() < 0.4 else rng.choice(keys) for _ in range(n)]
+
+
+def _python_states(state, events):
+    states = []
+    for event in events:
+        state = replay_events(state, [event])
+        states.append(state)
+    return states
+
+
+# ── JS port parity ────────────────────────────────────────────────────────────
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+@pytest.mark.parametrize("mode", ["uniform", "bag"])
+def test_js_engine_matches_python_engine(mode):
+    games = [
+        {"state": start_game(seed=seed, mode=mode), "events": _random_events(seed, 1500)}
+        for seed in range(4)
+    ]
+    result = subprocess.run(
+        ["node", "-e", NODE_RUNNER, str(ENGINE_JS)],
+        input=json.dumps({"config": engine_config(), "games": games}),
+        capture_output=True, text=True, check=True,
+    )
+    js_games = json.loads(result.stdout)
+    for game, js_states in zip(games, js_games):
+        expected = json.loads(json.dumps(_python_states(game["state"], game["events"])))
+        assert js_states == expected
+
+
+# ── Checkpoints ───────────────────────────────────────────────────────────────
+
+def test_engine_config_is_json_serializable():
+    config = engine_config()
+    assert json.loads(json.dumps(config)) == config
+    assert len(config["pieces"]["T"]) == 4
+
+def test_valid_checkpoint_is_accepted():
+    state = start_game(seed=1)
+    events = ["ArrowLeft", None, " ", None]
+    reached = replay_events(state, events)
+    ok, replayed = validate_checkpoint(state, {"events": events, "state": reached})
+    assert ok and replayed == reached
+
+def test_tampered_checkpoint_is_rejected():
+    state = start_game(seed=1)
+    events = [" ", None]
+    reached = dict(replay_events(state, events), score=99_999)
+    ok, replayed = validate_checkpoint(state, {"events": events, "state": reached})
+    assert not ok
+    assert replayed["score"] != 99_999
+
+@pytest.fixture
+def clientside_callbacks(monkeypatch, fake_app):
+    monkeypatch.setattr(callbacks, "GAME_LOOP", "clientside")
+    monkeypatch.setattr(callbacks, "SESSIONS", SessionStore())
+    callbacks.register_callbacks(fake_app)
+    return fake_app.callbacks
+
+def test_checkpoint_callback_advances_authoritative_state(clientside_callbacks):
+    state = start_game(seed=2)
+    sid = callbacks.SESSIONS.put(None, state)
+    events = [" ", None]
+    reached = replay_events(state, events)
+    checkpoint = {"session": sid, "events": events, "state": reached}
+    new_state, log, status = clientside_callbacks["on_checkpoint"](checkpoint)
+    assert status["ok"] is True
+    assert callbacks.SESSIONS.get(sid) == reached
+
+def test_checkpoint_callback_resyncs_drifted_client(clientside_callbacks):
+    state = start_game(seed=3)
+    sid = callbacks.SESSIONS.put(None, state)
+    checkpoint = {"session": sid, "events": [None], "state": dict(state, score=5)}
+    new_state, log, status = clientside_callbacks["on_checkpoint"](checkpoint)
+    assert status["ok"] is False
+    assert new_state == replay_events(state, [None])
+    assert log == []
+
+def test_checkpoint_for_unknown_session(clientside_callbacks):
+    _, _, status = clientside_callbacks["on_checkpoint"]({"session": "nope", "events": []})
+    assert status["ok"] is False
+
+def test_clientside_loop_requires_client_storage(monkeypatch, fake_app):
+    monkeypatch.setattr(callbacks, "GAME_LOOP", "clientside")
+    monkeypatch.setattr(callbacks, "STATE_STORAGE", "server")
+    with pytest.raises(ValueError):
+        callbacks.register_callbacks(fake_app)
@@ -0,0 +1,97 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import callbacks
+from components import layout
+from game.constants import ARR_MS, DAS_MS, INPUT_BATCH_MS, KEY_ACTIONS, REPEAT_ACTIONS
+from game.tetris_engine import batch_keys, handle_key_input, start_game
+
+BUFFER_JS = Path(__file__).resolve().parents[2] / "assets" / "input_buffer.js"
+
+# pushes timed key events through InputBuffer, flushing every window, and
+# prints the batches it produced
+NODE_RUNNER = """
+const {InputBuffer} = require(process.argv[1]);
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+const buffer = new InputBuffer(input.config);
+const batches = [];
+let next = input.config.window_ms;
+for (const event of input.events.concat([{type: "end", timeStamp: input.end}])) {
+    while (next <= event.timeStamp) {
+        const batch = buffer.flush(next);
+        if (batch) batches.push(batch);
+        next += input.config.window_ms;
+    }
+    if (event.type !== "end") buffer.push(event);
+}
+process.stdout.write(JSON.stringify(batches));
+"""
+
+CONFIG = {
+    "window_ms":      INPUT_BATCH_MS,
+    "arr_ms":         ARR_MS,
+    "key_actions":    dict(KEY_ACTIONS),
+    "repeat_actions": list(REPEAT_ACTIONS),
+}
+
+
+def _key(t, key, kind="keydown", repeat=False):
+    return {"type": kind, "key": key, "timeStamp": t, "repeat": repeat}
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_js_buffer_batches_play_the_held_key_schedule():
+    hold = DAS_MS + 3 * ARR_MS + 10
+    events = [
+        _key(3, "ArrowLeft"),
+        _key(40, "ArrowLeft", repeat=True),        # the browser's own repeat
+        _key(41, "x"),                             # not a game key
+        _key(50, "ArrowUp"),
+        _key(52, "ArrowUp", "keyup"),
+        _key(3 + hold, "ArrowLeft", "keyup"),
+    ]
+    result = subprocess.run(
+        ["node", "-e", NODE_RUNNER, str(BUFFER_JS)],
+        input=json.dumps({"config": CONFIG, "events": events, "end": 2000}),
+        capture_output=True, text=True, check=True,
+    )
+    batches = json.loads(result.stdout)
+    keys = [key for batch in batches for key in batch_keys(batch)]
+    assert keys == ["ArrowLeft", "ArrowUp"] + ["ArrowLeft"] * 4
+    # far fewer requests than frames, and none once every key is up
+    assert len(batches) < 2000 / INPUT_BATCH_MS / 4
+    assert batches[-1]["events"][-1][1:] == ["ArrowLeft", False]
+
+
+def test_batch_callback_plays_the_whole_batch(monkeypatch, fake_app):
+    monkeypatch.setattr(callbacks, "INPUT_MODE", "batch")
+    callbacks.register_callbacks(fake_app)
+    assert "on_key" not in fake_app.callbacks
+    assert any(f.namespace == "input" for f, *_ in fake_app.clientside)
+
+    state = start_game(seed=2)
+    data, hot = callbacks.save_state(None, state)
+    batch = {"start": 0, "end": 16, "held": {}, "events": [
+        [1, "ArrowLeft", True], [2, "ArrowLeft", False], [5, "ArrowUp", True],
+    ]}
+    cold, new_hot = fake_app.callbacks["on_key_batch"](batch, data, hot)
+    expected = handle_key_input(handle_key_input(state, "ArrowLeft"), "ArrowUp")
+    assert cold is callbacks.no_update
+    assert new_hot["current_piece"] == expected["current_piece"]
+
+def test_batch_input_needs_the_server_loop(monkeypatch, fake_app):
+    monkeypatch.setattr(callbacks, "GAME_LOOP", "clientside")
+    monkeypatch.setattr(callbacks, "INPUT_MODE", "batch")
+    with pytest.raises(ValueError):
+        callbacks.register_callbacks(fake_app)
+
+def test_batch_layout_listens_for_releases(monkeypatch):
+    monkeypatch.setattr(layout, "INPUT_MODE", "batch")
+    events = [e["event"] for e in layout._keyboard_events()]
+    assert events == ["keydown", "keyup"]
+    config, _ = layout._input_stores()
+    assert config.data == CONFIG
@@ -0,0 +1,123 @@
+from dash import Dash, Input, Output, dcc, html
+
+import callbacks
+import game.tetris_engine as tetris_engine
+from game.constants import METRICS_PATH
+from game.replay import apply_event
+from game.simulator import simulate_game
+from game.tetris_engine import start_game
+from server.metrics import (
+    Histogram, Metrics, install, instrument_app, instrument_engine, restore_engine,
+)
+
+
+# ── Histograms ────────────────────────────────────────────────────────────────
+
+def test_histogram_quantiles_are_bucket_bounds():
+    h = Histogram((1, 10, 100))
+    for value in (0.5, 2, 3, 50, 500):
+        h.observe(value)
+    assert h.counts == [1, 2, 1, 1]
+    assert h.quantile(0.5) == 10
+    assert h.quantile(0.8) == 100
+    assert h.quantile(1.0) == float("inf")
+    assert Histogram((1,)).quantile(0.5) == 0.0
+
+def test_prometheus_text_has_cumulative_buckets():
+    metrics = Metrics()
+    metrics.observe("engine_seconds", "lock_piece", 3e-5)
+    metrics.observe("engine_seconds", "lock_piece", 2.0)
+    metrics.inc("state_copies_total", value=3)
+    text = metrics.render_prometheus()
+    assert "# TYPE tetris_engine_seconds histogram" in text
+    assert 'tetris_engine_seconds_bucket{function="lock_piece",le="5e-05"} 1' in text
+    assert 'tetris_engine_seconds_bucket{function="lock_piece",le="+Inf"} 2' in text
+    assert 'tetris_engine_seconds_count{function="lock_piece"} 2' in text
+    assert "tetris_state_copies_total 3" in text
+    assert "callback_seconds" not in text                  # nothing observed
+
+
+# ── Instrumentation ───────────────────────────────────────────────────────────
+
+def test_disabled_metrics_wrap_nothing(fake_app):
+    assert instrument_app(fake_app, enabled=False) is fake_app
+    assert install(fake_app, enabled=False) is None
+
+def test_instrumented_callbacks_are_timed(fake_app):
+    metrics = Metrics()
+    wrapped = instrument_app(fake_app, enabled=True, metrics=metrics)
+    assert wrapped.title == "fake"
+
+    @wrapped.callback("out", "in")
+    def on_thing(n):
+        return [0] * n
+
+    assert fake_app.callbacks["on_thing"](3) == [0, 0, 0]
+    summary = metrics.summary()
+    assert summary["callback_seconds"]["on_thing"]["n"] == 1
+    assert summary["callback_alloc_blocks"]["on_thing"]["n"] == 1
+
+def test_engine_timing_reaches_internal_calls():
+    metrics = Metrics()
+    original = tetris_engine.handle_key_input
+    patches = instrument_engine(metrics)
+    try:
+        # a hard drop locks the piece through the module's own lock_piece
+        tetris_engine.handle_key_input(start_game(seed=3), " ")
+    finally:
+        restore_engine(patches)
+    assert tetris_engine.handle_key_input is original
+    summary = metrics.summary()
+    assert {"handle_key_input", "lock_piece"} <= set(summary["engine_seconds"])
+    assert summary["state_copies_total"]["all"] >= 1
+
+
+def test_engine_timing_reaches_names_imported_elsewhere(monkeypatch, fake_app):
+    monkeypatch.setattr(callbacks, "set_props", lambda *args: None)
+    callbacks.register_callbacks(fake_app)
+    metrics = Metrics()
+    patches = instrument_engine(metrics)
+    try:
+        data, _ = fake_app.callbacks["on_start_restart"](1, 0, None, None)
+        fake_app.callbacks["on_start_restart"](1, 1, data, None)      # restart
+        simulate_game(1, max_ticks=3)
+        apply_event(start_game(seed=2), None)
+    finally:
+        restore_engine(patches)
+    assert callbacks.start_game is tetris_engine.start_game
+    engine = metrics.summary()["engine_seconds"]
+    assert engine["start_game"]["n"] == 3
+    assert engine["apply_game_tick"]["n"] == 4
+
+
+# ── Serving ───────────────────────────────────────────────────────────────────
+
+def test_installed_server_serves_metrics_and_payload_sizes():
+    metrics = Metrics()
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Store(id="src", data=1), html.Div(id="dst")])
+
+    @instrument_app(app, enabled=True, metrics=metrics).callback(
+        Output("dst", "children"), Input("src", "data"),
+    )
+    def show(data):
+        # through the module, as server.serving does, so the patch applies
+        return str(tetris_engine.handle_key_input(start_game(seed=data), "ArrowLeft")["score"])
+
+    patches = install(app.server, enabled=True, metrics=metrics, log_interval=0)
+    try:
+        client = app.server.test_client()
+        response = client.post("/_dash-update-component", json={
+            "output": "dst.children",
+            "outputs": {"id": "dst", "property": "children"},
+            "inputs": [{"id": "src", "property": "data", "value": 1}],
+            "changedPropIds": ["src.data"],
+        })
+        assert response.status_code == 200
+        text = client.get(METRICS_PATH).get_data(as_text=True)
+    finally:
+        restore_engine(patches)
+    assert 'tetris_callback_seconds_count{callback="show"} 1' in text
+    assert 'tetris_request_bytes_count{callback="show"} 1' in text
+    assert 'tetris_response_bytes_count{callback="show"} 1' in text
+    assert 'tetris_engine_seconds_count{function="handle_key_input"} 1' in text
@@ -0,0 +1,126 @@
+import json
+import pstats
+import tracemalloc
+
+import pytest
+
+import callbacks
+import server.profiling as profiling
+from game.constants import STATE_OVER
+from game.tetris_engine import start_game
+from server.profiling import ProfileRegistry, profiling_requested, replay_game
+from server.session_store import SessionStore
+
+
+@pytest.fixture
+def profiles(monkeypatch, tmp_path):
+    registry = ProfileRegistry(directory=tmp_path, every_ticks=3, top_n=5)
+    monkeypatch.setattr(profiling, "PROFILES", registry)
+    monkeypatch.setattr(callbacks, "PROFILES", registry)
+    monkeypatch.setattr(callbacks, "set_props", lambda *args: None)
+    yield registry
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _play(app, keep, search):
+    """Starts a game, then plays keys, ticks, a pause and renders; returns the last state."""
+    cb = app.callbacks
+    data, hot = cb["on_start_restart"](1, 0, None, search)
+    for key in ("ArrowLeft", "ArrowUp", " ", "ArrowRight"):
+        data, hot = keep(cb["on_key"]({"key": key}, data, hot), data, hot)
+    for n in range(1, 5):
+        data, hot = keep(cb["on_tick"](n, data, hot), data, hot)
+        cb["render"](data, hot)
+        cb["update_ui"](data)
+    for _ in range(2):                                  # pause, then resume
+        data, hot = keep(cb["on_pause"](1, data, hot), data, hot)
+    data, hot = keep(cb["on_tick"](5, data, hot), data, hot)
+    return callbacks.load_state(data, hot), data
+
+
+def test_profiling_is_asked_for_in_the_query_string():
+    assert profiling_requested("?profile=1")
+    assert profiling_requested("?x=2&profile=yes")
+    assert not profiling_requested("?profile=0")
+    assert not profiling_requested("")
+    assert not profiling_requested(None)
+
+def test_profiled_game_dumps_stats_and_a_replay_of_itself(profiles, tmp_path, fake_app, keep):
+    callbacks.register_callbacks(fake_app)
+    state, data = _play(fake_app, keep, "?profile=1")
+    seed = state["generator"]["seed"]
+    assert profiles.get(state) is not None
+    assert tracemalloc.is_tracing()
+
+    # one dump after the 3rd tick
+    stem = tmp_path / f"client-{seed}-000003"
+    stats = pstats.Stats(f"{stem}.prof")
+    assert any(func[2] == "apply_game_tick" for func in stats.stats)
+    assert any(func[2] == "render_board" for func in stats.stats)
+    assert "top 5 allocation sites" in (tmp_path / f"{stem.name}.alloc.txt").read_text()
+
+    # a restart makes the final dump and stops tracing
+    fake_app.callbacks["on_start_restart"](0, 1, data, None)
+    assert profiles.get(state) is None
+    assert not tracemalloc.is_tracing()
+    meta = json.loads((tmp_path / f"client-{seed}.json").read_text())
+    assert meta["ticks"] == 5
+    assert meta["dumps"] == [stem.name, f"client-{seed}-000005"]
+
+    replayed = replay_game((tmp_path / meta["replay"]).read_bytes())
+    assert replayed == state
+
+def test_unprofiled_games_write_nothing(profiles, tmp_path, fake_app, keep):
+    callbacks.register_callbacks(fake_app)
+    state, _ = _play(fake_app, keep, "")
+    assert profiles.get(state) is None
+    assert not tracemalloc.is_tracing()
+    assert list(tmp_path.iterdir()) == []
+
+def test_profiling_works_with_the_compact_codec(monkeypatch, profiles, tmp_path, fake_app, keep):
+    monkeypatch.setattr(callbacks, "STATE_CODEC", "compact")
+    callbacks.register_callbacks(fake_app)
+    state, data = _play(fake_app, keep, "?profile=1")
+    assert isinstance(data, str)
+    seed = state["generator"]["seed"]
+    fake_app.callbacks["on_start_restart"](0, 1, data, "?profile=1")
+    meta = json.loads((tmp_path / f"client-{seed}.json").read_text())
+    assert replay_game((tmp_path / meta["replay"]).read_bytes()) == state
+
+def test_sessions_with_the_same_seed_keep_their_own_profiles(
+    monkeypatch, profiles, tmp_path, fake_app, keep,
+):
+    monkeypatch.setattr(callbacks, "STATE_STORAGE", "server")
+    monkeypatch.setattr(callbacks, "SESSIONS", SessionStore())
+    monkeypatch.setattr(callbacks, "start_game", lambda: start_game(seed=8))
+    callbacks.register_callbacks(fake_app)
+    cb = fake_app.callbacks
+    games = [cb["on_start_restart"](1, 0, None, "?profile=1") for _ in range(2)]
+    sessions = [data["session"] for data, _ in games]
+    for n, (data, hot) in enumerate(games, start=1):
+        for _ in range(n):
+            keep(cb["on_tick"](1, data, hot), data, hot)
+    for sid, (data, hot) in zip(sessions, games):
+        state = callbacks.load_state(data, hot)
+        assert profiles.get(state, sid).session == sid
+        profiles.stop(state, sid)
+    ticks = [json.loads((tmp_path / f"{sid}-8.json").read_text())["ticks"] for sid in sessions]
+    assert ticks == [1, 2]
+
+def test_game_over_ends_the_profile(profiles, tmp_path):
+    state = callbacks.start_game(seed=4)
+    profiles.start(state)
+    over = {**state, "status": STATE_OVER}
+    assert profiles.stop(over) == tmp_path / "client-4-000000"
+    assert profiles.stop(over) is None
+
+def test_replay_command_profiles_the_game(profiles, tmp_path, capsys, fake_app, keep):
+    callbacks.register_callbacks(fake_app)
+    state, data = _play(fake_app, keep, "?profile=1")
+    profiles.stop(state)
+    out = tmp_path / "replay.prof"
+    seed = state["generator"]["seed"]
+    assert profiling.main([str(tmp_path / f"client-{seed}.trpl"), "-o", str(out)]) == 0
+    assert f"replayed seed {seed}: tick {state['tick']}" in capsys.readouterr().out
+    assert out.exists()
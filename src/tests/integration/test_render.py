@@ -0,0 +1,88 @@
+from dash import no_update
+from plotly.io.json import to_json_plotly
+
+from components.board import (
+    board_with_piece, encode_frame, render_board, render_board_patch,
+    encode_canvas_frame, canvas_palette, render_cell, render_mini_board,
+)
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT, COLORS
+from game.tetris_engine import handle_key_input, start_game, spawn_piece
+
+
+def _state():
+    state = start_game(seed=1)
+    state["current_piece"] = spawn_piece("O")
+    return state
+
+
+def test_board_with_piece_draws_piece_without_mutating_state():
+    state = _state()
+    board = board_with_piece(state)
+    x = state["current_piece"]["x"]
+    assert board[0][x + 0] == board[0][x + 1] == 2
+    assert state["board"][0][x] == 0
+    assert board[10] is state["board"][10]
+
+def test_encode_frame_has_one_char_per_cell():
+    frame = encode_frame(_state())
+    assert len(frame) == BOARD_WIDTH * BOARD_HEIGHT
+    assert frame.count("2") == 4
+
+def test_patch_without_previous_frame_renders_full_board():
+    state = _state()
+    children, frame = render_board_patch(state, None)
+    assert to_json_plotly(children) == to_json_plotly(render_board(state))
+    assert frame == encode_frame(state)
+
+def test_unchanged_frame_sends_nothing():
+    state = _state()
+    children, frame = render_board_patch(state, encode_frame(state))
+    assert children is no_update and frame is no_update
+
+def test_patch_only_touches_changed_cells():
+    state = _state()
+    moved = handle_key_input(state, "ArrowLeft")
+    patch, frame = render_board_patch(moved, encode_frame(state))
+    operations = patch.to_plotly_json()["operations"]
+    # an O piece moving one column uncovers two cells and covers two new ones
+    assert len(operations) == 4
+    values = sorted(op["params"]["value"] for op in operations)
+    assert values == sorted([COLORS[0], COLORS[0], COLORS[2], COLORS[2]])
+    assert frame == encode_frame(moved)
+
+
+# ── Canvas frames ─────────────────────────────────────────────────────────────
+
+def test_canvas_frame_layout():
+    state = _state()
+    frame = encode_canvas_frame(state)
+    assert len(frame["cells"]) == BOARD_WIDTH * BOARD_HEIGHT
+    assert set(frame["cells"]) == {"0"}           # the falling piece is an overlay
+    assert frame["piece"][0] == 2
+    x = state["current_piece"]["x"]
+    assert frame["piece"][1:] == [x, x + 1, BOARD_WIDTH + x, BOARD_WIDTH + x + 1]
+
+def test_canvas_frame_ghost_sits_on_the_floor():
+    frame = encode_canvas_frame(_state())
+    bottom = (BOARD_HEIGHT - 1) * BOARD_WIDTH
+    assert max(frame["ghost"]) >= bottom
+    assert len(frame["ghost"]) == 4
+
+def test_canvas_frame_is_much_smaller_than_divs():
+    state = _state()
+    canvas_bytes = len(to_json_plotly(encode_canvas_frame(state)))
+    assert canvas_bytes * 50 < len(to_json_plotly(render_board(state)))
+
+def test_canvas_palette_covers_every_color_id():
+    palette = canvas_palette()
+    assert set(palette["colors"]) == {str(i) for i in range(8)}
+
+def test_previews_are_built_once_per_shape():
+    assert render_mini_board("T") is render_mini_board("T")
+    assert render_mini_board("T") is not render_mini_board("S")
+    assert render_mini_board(None) is not render_mini_board(None, "HOLD")
+
+def test_board_cells_are_shared_between_renders():
+    board = render_board(_state())
+    cells = [cell for row in board.children for cell in row.children]
+    assert cells[0] is cells[1] is render_cell(0)
@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import callbacks
+from benchmarks import load_test
+from game.tetris_engine import handle_key_input, start_game
+from server.serving import check_serving_config, key_step, run_engine, tick_step
+from server.session_store import SessionStore
+
+
+# ── Per-session locks ─────────────────────────────────────────────────────────
+
+def _blocks(store, sid):
+    """Whether another thread has to wait for store.lock(sid)."""
+    entered = threading.Event()
+
+    def take():
+        with store.lock(sid):
+            entered.set()
+
+    thread = threading.Thread(target=take, daemon=True)
+    thread.start()
+    blocked = not entered.wait(0.05)
+    return blocked, thread, entered
+
+def test_one_lock_per_session():
+    store = SessionStore()
+    first, second = store.put(None, {"n": 1}), store.put(None, {"n": 2})
+    with store.lock(first):
+        blocked, waiting, _ = _blocks(store, first)
+        assert blocked
+        assert not _blocks(store, second)[0]
+    waiting.join(1)
+    store.delete(first)
+    store.delete(second)
+    assert not store._locks
+
+def test_held_locks_survive_delete_and_eviction():
+    store = SessionStore(max_sessions=1)
+    first = store.put(None, {"n": 1})
+    with store.lock(first):
+        store.delete(first)
+        store.put(None, {"n": 2})
+        blocked, thread, entered = _blocks(store, first)
+        assert blocked                  # still the same lock, not a fresh one
+    thread.join(1)
+    assert entered.is_set()
+    assert first not in store._locks    # dropped once nobody held it
+
+def test_evicted_sessions_drop_their_lock():
+    store = SessionStore(max_sessions=1)
+    first = store.put(None, {"n": 1})
+    with store.lock(first):
+        pass
+    assert first in store._locks
+    store.put(None, {"n": 2})
+    assert first not in store._locks
+
+def test_concurrent_keys_for_one_game_are_not_lost(monkeypatch, fake_app):
+    monkeypatch.setattr(callbacks, "STATE_STORAGE", "server")
+    monkeypatch.setattr(callbacks, "SESSIONS", SessionStore())
+
+    def slow_key_step(state, key):
+        time.sleep(0.001)              # widens the read-modify-write window
+        return key_step(state, key)
+
+    monkeypatch.setattr(callbacks, "key_step", slow_key_step)
+    callbacks.register_callbacks(fake_app)
+    on_key = fake_app.callbacks["on_key"]
+
+    state = start_game(seed=1)
+    data, _ = callbacks.save_state(None, state)
+    barrier = threading.Barrier(12)
+
+    def press():
+        barrier.wait()
+        on_key({"key": "ArrowDown"}, data)
+
+    threads = [threading.Thread(target=press) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    y = callbacks.load_state(data)["current_piece"]["y"]
+    assert y == state["current_piece"]["y"] + 12
+
+
+# ── Engine pool ───────────────────────────────────────────────────────────────
+
+def test_engine_steps_run_the_same_on_a_pool():
+    state = start_game(seed=2)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert run_engine(key_step, state, "ArrowLeft", pool=pool) == handle_key_input(
+            state, "ArrowLeft"
+        )
+        assert run_engine(tick_step, state, True, pool=pool) == tick_step(state, True)
+
+def test_server_storage_needs_a_single_worker():
+    check_serving_config(workers=4, storage="client")
+    with pytest.raises(ValueError):
+        check_serving_config(workers=4, storage="server")
+
+
+# ── Load generator ────────────────────────────────────────────────────────────
+
+def test_load_generator_plays_in_process():
+    latencies, errors, _ = load_test.run(
+        players=3, duration=0.3, tick_ms=50, keys_per_tick=2, render=True,
+    )
+    assert errors == 0
+    assert {"start", "tick", "key", "render"} <= set(latencies)
+    p50, p99 = load_test.percentiles(latencies["tick"])
+    assert 0 < p50 <= p99
@@ -0,0 +1,197 @@
+import pytest
+
+from dash import no_update
+from plotly.io.json import to_json_plotly
+
+import callbacks
+from game.constants import STATE_PAUSED, STATE_RUNNING
+from game.tetris_engine import handle_key_input, start_game
+from server.session_store import SessionStore, SqliteBackend
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ── SessionStore ──────────────────────────────────────────────────────────────
+
+def test_put_and_get_round_trip():
+    store = SessionStore()
+    state = start_game(seed=1)
+    sid = store.put(None, state)
+    assert store.get(sid) is state
+
+def test_unknown_session_is_none():
+    assert SessionStore().get("missing") is None
+
+def test_sessions_expire_after_ttl():
+    clock = _Clock()
+    store = SessionStore(ttl=10, clock=clock)
+    sid = store.put(None, {"tick": 0})
+    clock.now = 5
+    assert store.get(sid) is not None
+    clock.now = 16
+    assert store.get(sid) is None
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_sessions=2)
+    first = store.put(None, {"n": 1})
+    second = store.put(None, {"n": 2})
+    store.get(first)                     # first is now the most recent
+    store.put(None, {"n": 3})
+    assert first in store
+    assert second not in store
+
+def test_purge_expired():
+    clock = _Clock()
+    store = SessionStore(ttl=10, clock=clock)
+    store.put(None, {"n": 1})
+    clock.now = 20
+    store.put(None, {"n": 2})
+    assert store.purge_expired() == 1
+    assert len(store) == 1
+
+def test_sqlite_backend_survives_eviction(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "sessions.sqlite3"))
+    store = SessionStore(backend=backend, max_sessions=1)
+    state = start_game(seed=2)
+    sid = store.put(None, state)
+    store.put(None, {"other": True})     # evicts sid from memory
+    assert store.get(sid) == state
+
+def test_sqlite_backend_shared_between_stores(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    sid = SessionStore(backend=SqliteBackend(path)).put(None, {"tick": 3})
+    assert SessionStore(backend=SqliteBackend(path)).get(sid) == {"tick": 3}
+
+def test_delete_session(tmp_path):
+    store = SessionStore(backend=SqliteBackend(str(tmp_path / "s.sqlite3")))
+    sid = store.put(None, {"tick": 0})
+    store.delete(sid)
+    assert store.get(sid) is None
+
+
+# ── Callbacks in server storage mode ──────────────────────────────────────────
+
+@pytest.fixture
+def server_callbacks(monkeypatch, fake_app):
+    monkeypatch.setattr(callbacks, "STATE_STORAGE", "server")
+    monkeypatch.setattr(callbacks, "SESSIONS", SessionStore())
+    callbacks.register_callbacks(fake_app)
+    return fake_app.callbacks
+
+def test_store_payload_only_holds_session_reference(server_callbacks, keep):
+    data, hot = callbacks.save_state(None, start_game(seed=3))
+    assert set(data) == {"session", "rev"}
+    data, hot = keep(server_callbacks["on_tick"](1, data, hot), data, hot)
+    assert set(data) == {"session", "rev"}
+    assert data["rev"] == 2
+    assert hot is no_update                # the hot store is client storage only
+    assert callbacks.load_state(data)["tick"] == 1
+
+def test_key_callback_updates_server_state(server_callbacks, keep):
+    state = start_game(seed=4)
+    data, hot = callbacks.save_state(None, state)
+    data, hot = keep(server_callbacks["on_key"]({"key": "ArrowDown"}, data, hot), data, hot)
+    assert callbacks.load_state(data)["current_piece"]["y"] == state["current_piece"]["y"] + 1
+
+def test_pause_callback_in_server_mode(server_callbacks, keep):
+    data, hot = callbacks.save_state(None, start_game(seed=5))
+    *outputs, disabled = server_callbacks["on_pause"](1, data, hot)
+    assert disabled is True
+    data, hot = keep(outputs, data, hot)
+    *outputs, disabled = server_callbacks["on_pause"](2, data, hot)
+    assert disabled is False
+    data, hot = keep(outputs, data, hot)
+    assert callbacks.load_state(data)["status"] == STATE_RUNNING
+
+def test_unknown_session_renders_idle(server_callbacks):
+    data = {"session": "gone", "rev": 7}
+    assert server_callbacks["render"](data) == []
+    assert server_callbacks["update_ui"](data) == ([], [], "0", "1", "0", None)
+
+def test_side_panels_only_send_changed_fields(server_callbacks, keep):
+    state = start_game(seed=7)
+    data, hot = callbacks.save_state(None, state)
+    *outputs, panel = server_callbacks["update_ui"](data, None)
+    assert no_update not in outputs
+    assert panel == callbacks.panel_fields(state)
+
+    # a tick moves the piece but no panel field
+    data, hot = keep(server_callbacks["on_tick"](1, data, hot), data, hot)
+    assert server_callbacks["update_ui"](data, panel) == (no_update,) * 6
+
+    # a hard drop that clears nothing only brings in a new next piece
+    data, hot = keep(server_callbacks["on_key"]({"key": " "}, data, hot), data, hot)
+    next_display, held, score, level, lines, panel = server_callbacks["update_ui"](data, panel)
+    assert next_display is not no_update
+    assert held is score is level is lines is no_update
+    assert panel == callbacks.panel_fields(callbacks.load_state(data))
+
+def test_demo_tick_lets_the_autoplayer_play(server_callbacks, keep):
+    data, hot = callbacks.save_state(None, start_game(seed=6))
+    for n in range(3):
+        data, hot = keep(server_callbacks["on_tick"](n, data, hot, True), data, hot)
+    state = callbacks.load_state(data)
+    # every demo tick hard drops one piece
+    assert sum(cell != 0 for row in state["board"] for cell in row) == 12
+
+
+# ── Hot / cold stores in client storage mode ─────────────────────────────────
+
+@pytest.fixture
+def client_callbacks(fake_app):
+    callbacks.register_callbacks(fake_app)
+    return fake_app.callbacks
+
+def test_state_is_split_over_hot_and_cold_stores():
+    state = start_game(seed=9)
+    data, hot = callbacks.save_state(None, state)
+    assert set(hot) == set(callbacks.HOT_FIELDS)
+    assert not set(data) & set(callbacks.HOT_FIELDS)
+    assert callbacks.load_state(data, hot) == state
+
+def test_moves_only_write_the_hot_store(client_callbacks):
+    data, hot = callbacks.save_state(None, start_game(seed=10))
+    cold, new_hot = client_callbacks["on_key"]({"key": "ArrowRight"}, data, hot)
+    assert cold is no_update
+    assert new_hot["current_piece"]["x"] == hot["current_piece"]["x"] + 1
+    cold, new_hot, _ = client_callbacks["on_tick"](1, data, hot)
+    assert cold is no_update
+    assert new_hot["tick"] == 1
+
+def test_lock_and_hold_write_the_cold_store(client_callbacks):
+    data, hot = callbacks.save_state(None, start_game(seed=11))
+    cold, _ = client_callbacks["on_key"]({"key": " "}, data, hot)
+    assert cold["board"] != data["board"]
+    cold, _ = client_callbacks["on_key"]({"key": "c"}, data, hot)
+    assert cold["held_piece"] == hot["current_piece"]["shape"]
+
+def test_board_render_follows_the_hot_store(client_callbacks):
+    data, hot = callbacks.save_state(None, start_game(seed=12))
+    _, moved = client_callbacks["on_key"]({"key": "ArrowLeft"}, data, hot)
+    render = client_callbacks["render"]
+    assert to_json_plotly(render(data, moved)) != to_json_plotly(render(data, hot))
+    assert to_json_plotly(render(data, hot)) == to_json_plotly(
+        render(callbacks.load_state(data, hot))
+    )
+
+def test_pause_only_writes_the_cold_store(client_callbacks):
+    data, hot = callbacks.save_state(None, start_game(seed=13))
+    cold, new_hot, disabled = client_callbacks["on_pause"](1, data, hot)
+    assert new_hot is no_update and disabled is True
+    assert cold["status"] == STATE_PAUSED
+
+def test_compact_codec_round_trips_through_the_callbacks(monkeypatch, client_callbacks):
+    monkeypatch.setattr(callbacks, "STATE_CODEC", "compact")
+    state = start_game(seed=14)
+    data, hot = callbacks.save_state(None, state)
+    assert isinstance(data, str)
+    assert callbacks.load_state(data, hot) == state
+    cold, new_hot = client_callbacks["on_key"]({"key": " "}, data, hot)
+    assert isinstance(cold, str)
+    assert callbacks.load_state(cold, new_hot) == handle_key_input(state, " ")
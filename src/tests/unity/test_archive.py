@@ -0,0 +1,69 @@
+import pytest
+
+from game.archive import Archive, ArchiveWriter, write_archive
+from game.replay import Replay, encode_replay
+from game.simulator import run_batch
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    results = run_batch(range(6), policy="hard_drop", max_ticks=300, workers=1, record=True)
+    path = tmp_path / "games.trar"
+    write_archive(path, [(100 + r["seed"], r["replay"]) for r in results])
+    return path, results
+
+
+def test_index_holds_id_seed_and_score(archive_path):
+    path, results = archive_path
+    with Archive(path) as archive:
+        assert len(archive) == len(results)
+        for entry, result in zip(archive.entries(), results):
+            assert entry.game_id == 100 + result["seed"]
+            assert entry.seed == result["seed"]
+            assert entry.score == result["score"]
+
+def test_find_and_read_back(archive_path):
+    path, results = archive_path
+    with Archive(path) as archive:
+        entry = archive.find(103)
+        assert archive.replay_bytes(entry) == results[3]["replay"]
+        with pytest.raises(KeyError):
+            archive.find(7)
+
+def test_games_filters_by_score_and_seed(archive_path):
+    path, results = archive_path
+    best = max(r["score"] for r in results)
+    with Archive(path) as archive:
+        top = [entry.score for entry, _ in archive.games(min_score=best)]
+        assert top and all(score == best for score in top)
+        assert [entry.seed for entry, _ in archive.games(seed=2)] == [2]
+
+def test_lock_events_replay_the_game(archive_path):
+    path, results = archive_path
+    with Archive(path) as archive:
+        entry = archive.entry(0)
+        locks = list(archive.lock_events(entry))
+        final = Replay(archive.replay_bytes(entry)).final_state()
+        assert locks
+        assert locks[-1]["score"] == final["score"]
+        assert sum(lock["lines"] for lock in locks) == final["lines_cleared"]
+        assert len(list(archive.all_lock_events(seed=0))) == len(locks)
+
+def test_verify_flags_a_wrong_score(tmp_path, archive_path):
+    path, results = archive_path
+    with Archive(path) as archive:
+        assert list(archive.mismatches()) == []
+
+    # a log that clears no lines, stored with a claimed score
+    forged = tmp_path / "forged.trar"
+    with ArchiveWriter(forged) as writer:
+        writer.add(1, encode_replay(9, [None] * 10), score=800)
+    with Archive(forged) as archive:
+        (entry, recomputed), = archive.mismatches()
+        assert entry.game_id == 1 and recomputed == 0
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.trar"
+    path.write_bytes(b"hello world, not an archive")
+    with pytest.raises(ValueError):
+        Archive(path)
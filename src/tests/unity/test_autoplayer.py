@@ -0,0 +1,77 @@
+from game.autoplayer import (
+    best_placement, choose_keys, count_holes, enumerate_placements,
+)
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT, STATE_PAUSED
+from game.simulator import simulate_game
+from game.tetris_engine import (
+    column_tops, create_empty_board, get_ghost_position, handle_key_input,
+    is_valid_position, row_fills, spawn_piece, start_game,
+)
+
+
+def _board_with_well(depth, well=0):
+    board = create_empty_board()
+    for row in range(BOARD_HEIGHT - depth, BOARD_HEIGHT):
+        board[row] = [1] * BOARD_WIDTH
+        board[row][well] = 0
+    return board
+
+
+def test_count_holes():
+    board = create_empty_board()
+    board[20][3] = 1
+    board[22][3] = 1
+    assert count_holes(board, column_tops(board)) == 3   # rows 21, 23, 24
+
+def test_placements_cover_every_column():
+    board = create_empty_board()
+    placements = list(enumerate_placements(board, "O", x=6, y=0, rotation=0))
+    assert sorted(p[1] for p in placements) == list(range(BOARD_WIDTH - 1))
+
+def test_placements_land_where_the_engine_would():
+    board = _board_with_well(4, well=5)
+    board[18][9] = 1
+    for shape in "IOTSZJL":
+        for rotation, x, y, _ in enumerate_placements(board, shape, 6, 0, 0):
+            assert is_valid_position(board, shape, x, y, rotation)
+            assert get_ghost_position(board, shape, x, 0, rotation) == y
+
+def test_i_piece_goes_into_the_well():
+    state = start_game(seed=1)
+    state["board"] = _board_with_well(4)
+    state["column_tops"] = column_tops(state["board"])
+    state["row_fills"] = row_fills(state["board"])
+    state["current_piece"] = spawn_piece("I")
+    placement, keys = best_placement(state)
+    assert (placement.x + 2, placement.rotation % 2) == (0, 1)   # vertical I in column 0
+    for key in keys:
+        state = handle_key_input(state, key)
+    assert state["lines_cleared"] == 4
+
+def test_hold_is_considered():
+    state = start_game(seed=1)
+    state["board"] = _board_with_well(4)
+    state["column_tops"] = column_tops(state["board"])
+    state["row_fills"] = row_fills(state["board"])
+    state["current_piece"] = spawn_piece("O")
+    state["next_piece"] = "I"
+    placement, keys = best_placement(state)
+    assert placement.hold and placement.shape == "I"
+    assert keys[0] == "c"
+
+def test_no_keys_when_not_running():
+    state = dict(start_game(seed=1), status=STATE_PAUSED)
+    assert choose_keys(state) == []
+
+def test_autoplay_outlasts_random_play():
+    bot = simulate_game(3, policy="autoplay", max_ticks=400)
+    assert bot["status"] == "running"
+    assert bot["lines"] > 0
+
+def test_no_placement_on_a_full_stack():
+    state = start_game(seed=1)
+    state["board"] = _board_with_well(BOARD_HEIGHT - 1)
+    state["column_tops"] = column_tops(state["board"])
+    state["row_fills"] = row_fills(state["board"])
+    state["can_hold"] = False
+    assert best_placement(state) == (None, [])
@@ -0,0 +1,100 @@
+import random
+
+from game.batch_engine import BatchGames, ACTION_CODES, OVER
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT, KEY_ACTIONS, STATE_PAUSED
+from game.tetris_engine import (
+    apply_game_tick, column_tops, handle_key_input, row_fills, start_game, spawn_piece,
+)
+
+
+def _run_both(states, steps, seed, keys=tuple(KEY_ACTIONS)):
+    """Plays the same keys on scalar states and a batch, comparing each step."""
+    rng = random.Random(seed)
+    games = BatchGames.from_states(states)
+    for step in range(steps):
+        step_keys = [rng.choice(keys) for _ in states]
+
+        states = [handle_key_input(s, k) for s, k in zip(states, step_keys)]
+        games.act([KEY_ACTIONS[k] for k in step_keys])
+        assert games.to_states() == states
+
+        states = [apply_game_tick(s) for s in states]
+        games.tick()
+        assert games.to_states() == states
+    return games
+
+
+def test_round_trip_through_states():
+    states = [start_game(seed=i) for i in range(3)]
+    assert BatchGames.from_states(states).to_states() == states
+
+def test_start_draws_like_start_game():
+    expected = [start_game(seed=i) for i in range(5)]
+    assert BatchGames.start(5, seeds=range(5)).to_states() == expected
+
+def test_states_without_generator_use_global_rng():
+    states = [start_game(seed=i) for i in range(4)]
+    for state in states:
+        state["generator"] = None
+    random.seed(6)
+    expected = [handle_key_input(s, " ") for s in states]
+    games = BatchGames.from_states(states)
+    random.seed(6)
+    games.act("hard_drop")
+    assert games.to_states() == expected
+
+def test_tick_moves_all_pieces_down():
+    games = BatchGames.start(4)
+    games.tick()
+    assert (games.y == 1).all()
+    assert (games.tick_count == 1).all()
+
+def test_action_by_name_applies_to_all_games():
+    games = BatchGames.start(3)
+    x_before = games.x.copy()
+    games.act("move_left")
+    assert (games.x == x_before - 1).all()
+
+def test_hard_drop_locks_every_game():
+    games = BatchGames.start(3)
+    games.act(ACTION_CODES["hard_drop"])
+    assert (games.boards.reshape(3, -1) != 0).any(axis=1).all()
+
+def test_line_clear_scores():
+    state = start_game()
+    state["board"][BOARD_HEIGHT - 1] = [1] * (BOARD_WIDTH - 2) + [0, 0]
+    state["current_piece"] = spawn_piece("O")
+    state["current_piece"]["x"] = BOARD_WIDTH - 2
+    games = BatchGames.from_states([state])
+    games.act("hard_drop")
+    assert games.lines[0] == 1
+    assert games.score[0] == 100
+
+def test_pause_toggles_status():
+    games = BatchGames.start(2)
+    games.act(["pause", "none"])
+    assert games.to_state(0)["status"] == STATE_PAUSED
+    games.tick()
+    assert games.y[0] == 0 and games.y[1] == 1
+
+def test_matches_scalar_engine_random_play():
+    states = [start_game(seed=i) for i in range(8)]
+    _run_both(states, steps=300, seed=1)
+
+def test_matches_scalar_engine_until_game_over():
+    states = [start_game(seed=i, mode="bag") for i in range(6)]
+    keys = [key for key, action in KEY_ACTIONS.items() if action != "pause"]
+    games = _run_both(states, steps=400, seed=2, keys=keys)
+    assert (games.status == OVER).any()
+
+def test_matches_scalar_engine_with_line_clears():
+    states = [start_game(seed=i) for i in range(8)]
+    for state in states:
+        # a well in column 0 that pieces pushed to the left wall will fill
+        for row in range(BOARD_HEIGHT - 6, BOARD_HEIGHT):
+            state["board"][row] = [0] + [1] * (BOARD_WIDTH - 1)
+        state["column_tops"] = column_tops(state["board"])
+        state["row_fills"] = row_fills(state["board"])
+    keys = ["ArrowLeft"] * 6 + ["ArrowUp", " "]
+    games = _run_both(states, steps=150, seed=3, keys=keys)
+    assert games.lines.sum() > 0
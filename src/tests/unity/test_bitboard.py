@@ -0,0 +1,90 @@
+import json
+import random
+
+from game.bitboard import BitBoard, FULL_ROW, row_to_bits
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT, KEY_ACTIONS
+from game.pieces import TETROMINOES, PIECE_TABLE
+from game.tetris_engine import (
+    create_empty_board, is_valid_position,
+    clear_lines, apply_piece_to_board,
+    apply_game_tick, handle_key_input, start_game,
+)
+
+
+def _random_board(seed):
+    rng = random.Random(seed)
+    board = create_empty_board()
+    for row in range(BOARD_HEIGHT // 2, BOARD_HEIGHT):
+        board[row] = [rng.choice([0, 0, 1, 4]) for _ in range(BOARD_WIDTH)]
+    return board
+
+
+# ── Construction ──────────────────────────────────────────────────────────────
+
+def test_row_to_bits():
+    row = [0] * BOARD_WIDTH
+    row[0] = 1
+    row[3] = 5
+    assert row_to_bits(row) == 0b1001
+
+def test_create_empty_bitboard():
+    board = create_empty_board("bitboard")
+    assert isinstance(board, BitBoard)
+    assert board == create_empty_board()
+    assert board.bits == [0] * BOARD_HEIGHT
+
+def test_start_game_with_bitboard_backend():
+    state = start_game(backend="bitboard")
+    assert isinstance(state["board"], BitBoard)
+
+def test_bitboard_serializes_as_list_of_lists():
+    board = BitBoard.from_board(_random_board(1))
+    assert json.loads(json.dumps(board)) == board.to_list()
+
+
+# ── Equivalence with the list backend ─────────────────────────────────────────
+
+def test_fits_matches_list_backend():
+    rng = random.Random(7)
+    board = _random_board(7)
+    bitboard = BitBoard.from_board(board)
+    for _ in range(5000):
+        shape = rng.choice(list(TETROMINOES))
+        x = rng.randint(-3, BOARD_WIDTH)
+        y = rng.randint(-1, BOARD_HEIGHT)
+        rotation = rng.randint(0, 3)
+        assert is_valid_position(bitboard, shape, x, y, rotation) == \
+            is_valid_position(board, shape, x, y, rotation)
+
+def test_stamp_matches_list_backend():
+    board = create_empty_board()
+    bitboard = create_empty_board("bitboard")
+    orientation = PIECE_TABLE["T"][2]
+    stamped = apply_piece_to_board(bitboard, orientation, 4, 10, 3)
+    assert stamped == apply_piece_to_board(board, orientation, 4, 10, 3)
+    assert stamped.bits == [row_to_bits(row) for row in stamped]
+    assert bitboard.bits == [0] * BOARD_HEIGHT   # original untouched
+
+def test_clear_lines_matches_list_backend():
+    board = _random_board(3)
+    board[BOARD_HEIGHT - 1] = [2] * BOARD_WIDTH
+    board[BOARD_HEIGHT - 4] = [6] * BOARD_WIDTH
+    bitboard = BitBoard.from_board(board)
+    assert bitboard.bits[BOARD_HEIGHT - 1] == FULL_ROW
+    new_bitboard, cleared = clear_lines(bitboard)
+    new_board, expected = clear_lines(board)
+    assert cleared == expected == 2
+    assert new_bitboard == new_board
+    assert new_bitboard.bits == [row_to_bits(row) for row in new_board]
+
+def test_random_game_matches_list_backend():
+    keys = list(KEY_ACTIONS)
+    state = start_game(seed=11)
+    bit_state = start_game(backend="bitboard", seed=11)
+    rng = random.Random(11)
+    for _ in range(600):
+        key = rng.choice(keys)
+        state = apply_game_tick(handle_key_input(state, key))
+        bit_state = apply_game_tick(handle_key_input(bit_state, key))
+        assert isinstance(bit_state["board"], BitBoard)
+        assert bit_state == state
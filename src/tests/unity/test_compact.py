@@ -0,0 +1,89 @@
+import base64
+import json
+import random
+
+import pytest
+
+from game.bitboard import BitBoard
+from game.compact import CompactState, decode_state, encode_state
+from game.constants import BOARD_HEIGHT, BOARD_WIDTH, INITIAL_GAME_STATE
+from game.simulator import hard_drop_policy
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+
+
+def _states(seed, n=300, **options):
+    """Every state of a seeded hard-drop game, until it ends or n ticks pass."""
+    rng = random.Random(seed)
+    state = start_game(seed=seed, **options)
+    states = [state]
+    while state["status"] == "running" and state["tick"] < n:
+        for key in hard_drop_policy(state, rng):
+            state = handle_key_input(state, key)
+            states.append(state)
+        state = apply_game_tick(state)
+        states.append(state)
+    return states
+
+
+# ── Round trips ───────────────────────────────────────────────────────────────
+
+def test_initial_state_round_trips():
+    assert decode_state(encode_state(INITIAL_GAME_STATE)) == INITIAL_GAME_STATE
+
+def test_game_states_round_trip():
+    for state in _states(1):
+        assert decode_state(encode_state(state)) == state
+
+def test_bitboard_and_hash_survive():
+    for state in _states(2, n=100, backend="bitboard", hashing=True)[::7]:
+        decoded = decode_state(encode_state(state))
+        assert isinstance(decoded["board"], BitBoard)
+        assert decoded["board"].bits == state["board"].bits
+        assert decoded == state
+
+def test_unusual_fields_survive():
+    state = start_game(seed=3)
+    state = {
+        **state,
+        "current_piece": {**state["current_piece"], "x": -2, "y": -1},
+        "held_piece": "Z",
+        "can_hold": False,
+        "score": 2**40,
+        "column_tops": [0] * BOARD_WIDTH,       # not what the board says
+        "row_fills":   [1] * BOARD_HEIGHT,
+        "cleared_rows": [3, BOARD_HEIGHT - 1],
+    }
+    assert decode_state(encode_state(state)) == state
+
+def test_compact_board_is_a_bytearray():
+    state = _states(4)[-1]
+    compact = CompactState.from_state(state)
+    assert isinstance(compact.board, bytearray)
+    assert len(compact.board) == BOARD_WIDTH * BOARD_HEIGHT
+    assert compact.rows() == [list(row) for row in state["board"]]
+    assert not hasattr(compact, "__dict__")
+
+
+# ── Wire format ───────────────────────────────────────────────────────────────
+
+def test_blob_is_far_smaller_than_json():
+    state = _states(5)[-1]
+    assert len(encode_state(state)) * 4 < len(json.dumps(state))
+
+def test_empty_rows_cost_nothing():
+    assert len(CompactState.from_state(start_game(seed=6)).to_bytes()) < 48
+
+def test_foreign_states_are_rejected():
+    with pytest.raises(ValueError):
+        encode_state({**start_game(seed=7), "extra": 1})
+    board = [[0] * BOARD_WIDTH for _ in range(BOARD_HEIGHT)]
+    board[-1][0] = 16
+    with pytest.raises(ValueError):
+        encode_state({**start_game(seed=7), "board": board})
+
+def test_bad_blobs_are_rejected():
+    data = CompactState.from_state(start_game(seed=8)).to_bytes()
+    with pytest.raises(ValueError):
+        CompactState.from_bytes(bytes([99]) + data[1:])
+    with pytest.raises(ValueError):
+        decode_state(base64.b64encode(data[:-5]))
@@ -2,13 +2,15 @@ from game.tetris_engine import (
     create_empty_board, is_valid_position,
     clear_lines, apply_piece_to_board,
     lock_piece, spawn_piece, get_ghost_position,
-    apply_game_tick, handle_key_input, start_game,
+    apply_game_tick, handle_key_input, start_game, column_tops, row_fills,
+    apply_key_batch, batch_keys, full_rows, remove_rows,
 )
 from game.constants import (
     BOARD_WIDTH, BOARD_HEIGHT,
-    STATE_RUNNING, STATE_PAUSED, STATE_OVER,
+    STATE_RUNNING, STATE_PAUSED, STATE_OVER, DAS_MS, ARR_MS,
 )
-from game.pieces import TETROMINOES
+from game.pieces import TETROMINOES, PIECE_TABLE
+from game.autoplayer import choose_keys
 
 
 # ── create_empty_board ────────────────────────────────────────────────────────
@@ -147,7 +149,9 @@ def test_lock_piece_clears_completed_lines():
     state["current_piece"] = spawn_piece("O")
     state["current_piece"]["y"] = 16
     result = lock_piece(state)
-    assert result["lines_cleared"] >= 0   # may or may not clear depending on placement
+    assert result["lines_cleared"] == 2
+    assert result["cleared_rows"] == [18, 19]
+    assert result["row_fills"] == row_fills(result["board"])
 
 
 # ── handle_key_input ──────────────────────────────────────────────────────────
@@ -300,3 +304,209 @@ def test_start_game_score_is_zero():
 def test_start_game_level_is_one():
     state = start_game()
     assert state["level"] == 1
+
+
+# ── apply_piece_to_board with PIECE_TABLE ─────────────────────────────────────
+
+def test_apply_piece_accepts_orientation():
+    board = create_empty_board()
+    orientation = PIECE_TABLE["I"][1]
+    result = apply_piece_to_board(board, orientation, x=0, y=0, color_id=1)
+    assert [result[r][2] for r in range(4)] == [1, 1, 1, 1]
+
+def test_valid_position_vertical_i_against_wall():
+    board = create_empty_board()
+    # vertical I occupies column x + 2, so x = -2 is still on the board
+    assert is_valid_position(board, "I", x=-2, y=0, rotation=1) is True
+    assert is_valid_position(board, "I", x=-3, y=0, rotation=1) is False
+
+
+# ── Structural sharing ────────────────────────────────────────────────────────
+
+def test_key_input_does_not_mutate_input_state():
+    state = start_game()
+    state["current_piece"]["x"] = 4
+    result = handle_key_input(state, "ArrowLeft")
+    assert state["current_piece"]["x"] == 4
+    assert result["current_piece"] is not state["current_piece"]
+
+def test_tick_shares_unchanged_board():
+    state = start_game()
+    result = apply_game_tick(state)
+    assert result["board"] is state["board"]
+
+def test_lock_copies_only_touched_rows():
+    state = start_game()
+    state["current_piece"] = spawn_piece("O")
+    state["current_piece"]["y"] = 10
+    result = lock_piece(state)
+    assert all(cell == 0 for row in state["board"] for cell in row)
+    assert result["board"][0] is state["board"][0]
+    assert result["board"][10] is not state["board"][10]
+
+
+# ── Column tops ───────────────────────────────────────────────────────────────
+
+def _ghost_by_steps(board, piece, x, y, rotation):
+    while is_valid_position(board, piece, x, y + 1, rotation):
+        y += 1
+    return y
+
+def test_column_tops_of_empty_board():
+    assert column_tops(create_empty_board()) == [BOARD_HEIGHT] * BOARD_WIDTH
+
+def test_start_game_has_column_tops():
+    state = start_game()
+    assert state["column_tops"] == column_tops(state["board"])
+
+def test_ghost_matches_stepwise_drop():
+    board = create_empty_board()
+    board[20][3] = 1
+    board[15][7] = 1
+    board[22] = [1] * (BOARD_WIDTH - 1) + [0]
+    tops = column_tops(board)
+    for shape, rotations in PIECE_TABLE.items():
+        for rotation, o in enumerate(rotations):
+            for x in range(-o.min_col, BOARD_WIDTH - o.max_col):
+                expected = _ghost_by_steps(board, shape, x, 0, rotation)
+                assert get_ghost_position(board, shape, x, 0, rotation) == expected
+                assert get_ghost_position(board, shape, x, 0, rotation, tops) == expected
+
+def test_ghost_scans_under_overhang():
+    board = create_empty_board()
+    board[10][4] = 1                 # roof above the piece
+    board[20][4] = 1
+    tops = column_tops(board)
+    # an O piece already below the roof lands on row 20, not on the roof
+    assert get_ghost_position(board, "O", x=3, y=11, rotation=0, tops=tops) == 18
+
+def test_ghost_does_not_trust_stale_tops():
+    board = create_empty_board()
+    tops = column_tops(board)
+    board[BOARD_HEIGHT - 1][4] = 1                     # edited, tops not refreshed
+    assert get_ghost_position(board, "O", x=3, y=0, rotation=0, tops=tops) == BOARD_HEIGHT - 3
+
+    board = create_empty_board()
+    board[BOARD_HEIGHT - 1] = [1] * BOARD_WIDTH
+    tops = column_tops(board)
+    board[BOARD_HEIGHT - 1] = [0] * BOARD_WIDTH        # cleared, tops not refreshed
+    assert get_ghost_position(board, "O", x=3, y=0, rotation=0, tops=tops) == BOARD_HEIGHT - 2
+
+def test_hard_drop_on_an_edited_board_does_not_overlap_it():
+    state = start_game(seed=2)
+    state["board"][BOARD_HEIGHT - 1] = [1] * (BOARD_WIDTH - 1) + [0]   # tops left stale
+    result = handle_key_input(state, " ")
+    assert result["board"][BOARD_HEIGHT - 1] == state["board"][BOARD_HEIGHT - 1]
+    assert any(result["board"][BOARD_HEIGHT - 2])
+
+def test_lock_piece_updates_column_tops():
+    state = start_game()
+    state["current_piece"] = spawn_piece("O")
+    state["current_piece"]["y"] = 18
+    result = lock_piece(state)
+    x = state["current_piece"]["x"]
+    assert result["column_tops"] == column_tops(result["board"])
+    assert result["column_tops"][x + 1] == 18
+
+def test_column_tops_follow_line_clears():
+    state = start_game()
+    for row in range(BOARD_HEIGHT - 2, BOARD_HEIGHT):
+        state["board"][row] = [1] * (BOARD_WIDTH - 2) + [0, 0]
+    state["board"][BOARD_HEIGHT - 3][0] = 1
+    state["column_tops"] = column_tops(state["board"])
+    state["row_fills"] = row_fills(state["board"])
+    state["current_piece"] = spawn_piece("O")
+    state["current_piece"]["x"] = BOARD_WIDTH - 2
+    result = handle_key_input(state, " ")
+    assert result["lines_cleared"] == 2
+    assert result["column_tops"] == column_tops(result["board"])
+    assert result["column_tops"][0] == BOARD_HEIGHT - 1
+
+
+# ── Line clears ───────────────────────────────────────────────────────────────
+
+def test_lock_reports_cleared_rows_before_the_clear():
+    state = start_game()
+    for row in (BOARD_HEIGHT - 3, BOARD_HEIGHT - 1):
+        state["board"][row] = [1] * (BOARD_WIDTH - 1) + [0]
+    state["board"][BOARD_HEIGHT - 2][0] = 1
+    state["column_tops"] = column_tops(state["board"])
+    state["row_fills"] = row_fills(state["board"])
+    state["current_piece"] = {**spawn_piece("I"), "rotation": 1}
+    state["current_piece"]["x"] = BOARD_WIDTH - 1 - PIECE_TABLE["I"][1].min_col
+    result = handle_key_input(state, " ")
+    assert result["cleared_rows"] == [BOARD_HEIGHT - 3, BOARD_HEIGHT - 1]
+    assert result["lines_cleared"] == 2
+    assert result["board"][BOARD_HEIGHT - 1][0] == 1
+    assert result["row_fills"] == row_fills(result["board"])
+    assert result["column_tops"] == column_tops(result["board"])
+    assert handle_key_input(result, " ")["cleared_rows"] == []
+
+def test_row_fills_and_tops_stay_exact_through_a_game():
+    state = start_game(seed=11)
+    for _ in range(60):
+        for key in choose_keys(state):
+            state = handle_key_input(state, key)
+        assert state["row_fills"] == row_fills(state["board"])
+        assert state["column_tops"] == column_tops(state["board"])
+    assert state["lines_cleared"] > 0
+
+def test_full_rows_only_checks_the_given_rows():
+    board = create_empty_board()
+    board[5] = [1] * BOARD_WIDTH
+    board[9] = [1] * BOARD_WIDTH
+    assert full_rows(board) == [5, 9]
+    assert full_rows(board, [9, 4]) == [9]
+    assert full_rows(board, [5, 9], row_fills(board)) == [5, 9]
+
+def test_remove_rows_works_in_place():
+    board = create_empty_board()
+    board[5] = [1] * BOARD_WIDTH
+    board[6][0] = 2
+    assert remove_rows(board, [5]) is board
+    assert len(board) == BOARD_HEIGHT
+    assert board[6][0] == 2
+    assert not any(board[5])
+
+
+# ── Batched input ─────────────────────────────────────────────────────────────
+
+def _batch(start, end, events=(), held=None):
+    return {"start": start, "end": end, "held": held or {}, "events": list(events)}
+
+def test_tap_plays_key_once():
+    batch = _batch(0, 500, [[10, "ArrowLeft", True], [60, "ArrowLeft", False]])
+    assert batch_keys(batch) == ["ArrowLeft"]
+
+def test_held_key_repeats_after_das_then_every_arr():
+    up = 10 + DAS_MS + 2 * ARR_MS + 1
+    batch = _batch(0, 1000, [[10, "ArrowRight", True], [up, "ArrowRight", False]])
+    assert batch_keys(batch) == ["ArrowRight"] * 4
+
+def test_repeats_do_not_depend_on_batch_boundaries():
+    events = [[5, "ArrowLeft", True], [20, " ", True], [640, "ArrowLeft", False]]
+    whole = batch_keys(_batch(0, 1000, events))
+    split = (
+        batch_keys(_batch(0, 300, events[:2]))
+        + batch_keys(_batch(300, 450, held={"ArrowLeft": 5, " ": 20}))
+        + batch_keys(_batch(450, 1000, events[2:], held={"ArrowLeft": 5, " ": 20}))
+    )
+    assert whole == split
+    assert whole[:2] == ["ArrowLeft", " "]
+
+def test_browser_key_repeat_and_non_repeating_keys():
+    events = [[0, "ArrowUp", True], [30, "ArrowUp", True], [60, "ArrowUp", True]]
+    assert batch_keys(_batch(0, 1000, events)) == ["ArrowUp"]
+
+def test_apply_key_batch_matches_key_by_key():
+    state = start_game(seed=3)
+    batch = _batch(0, 400, [
+        [0, "ArrowLeft", True], [40, "ArrowUp", True], [45, "ArrowUp", False],
+        [350, "ArrowLeft", False], [360, " ", True],
+    ])
+    expected = state
+    for key in batch_keys(batch):
+        expected = handle_key_input(expected, key)
+    result = apply_key_batch(state, batch)
+    assert result == expected
+    assert result["board"] != state["board"]
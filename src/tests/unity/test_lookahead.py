@@ -0,0 +1,147 @@
+import random
+
+import numpy as np
+import pytest
+
+import game.lookahead as lookahead
+from game.autoplayer import (
+    SPAWN_X, WEIGHTS, best_placement, count_holes, reachable_placements,
+)
+from game.constants import BOARD_WIDTH, BOARD_HEIGHT, PIECE_IDS
+from game.lookahead import (
+    board_features, line_values, place_all, place_hashes, search, spawn_placements,
+)
+from game.pieces import PIECE_TABLE
+from game.simulator import simulate_game
+from game.zobrist import board_hash
+from game.tetris_engine import (
+    apply_piece_to_board, clear_lines, column_tops, create_empty_board, row_fills,
+    handle_key_input, start_game,
+)
+
+
+def _random_board(seed, rows=8):
+    rng = random.Random(seed)
+    board = create_empty_board()
+    for row in range(BOARD_HEIGHT - rows, BOARD_HEIGHT):
+        board[row] = [rng.choice([0, 1, 1, 1]) for _ in range(BOARD_WIDTH)]
+        board[row][rng.randrange(BOARD_WIDTH)] = 0    # never a full row
+    board[BOARD_HEIGHT - 1] = [1] * (BOARD_WIDTH - 1) + [0]
+    return board
+
+
+def _state_on(board, seed=1):
+    state = start_game(seed=seed)
+    state["board"] = board
+    state["column_tops"] = column_tops(board)
+    state["row_fills"] = row_fills(board)
+    return state
+
+
+def test_place_all_matches_engine():
+    board = _random_board(0)
+    stacked = np.array([board], dtype=np.uint8)
+    for shape in PIECE_TABLE:
+        placements = list(reachable_placements(shape, SPAWN_X, 0, 0, column_tops(board)))
+        rotation, x, y = np.array(placements).T
+        parents = np.zeros(len(placements), dtype=np.intp)
+        children, lines = place_all(stacked, parents, shape, rotation, x, y)
+        for child, n, (r, px, py) in zip(children, lines, placements):
+            expected, cleared = clear_lines(apply_piece_to_board(
+                board, PIECE_TABLE[shape][r], px, py, PIECE_IDS[shape]
+            ))
+            assert child.tolist() == expected and n == cleared
+
+def test_spawn_placements_match_reachable_placements():
+    boards = [_random_board(seed, rows=rows) for seed in range(6) for rows in (4, 20, 23)]
+    tops = np.array([column_tops(b) for b in boards])
+    for shape in PIECE_TABLE:
+        parents, rotation, x, y = spawn_placements(tops, shape)
+        found = set(zip(parents.tolist(), rotation.tolist(), x.tolist(), y.tolist()))
+        expected = {
+            (i, *placement)
+            for i, board in enumerate(boards)
+            for placement in reachable_placements(shape, SPAWN_X, 0, 0, column_tops(board))
+        }
+        assert found == expected
+
+def test_board_features():
+    board = create_empty_board()
+    board[20][3] = 1
+    board[22][3] = 1
+    height, holes, bumpiness = board_features(np.array([board], dtype=np.uint8))
+    assert (height[0], holes[0], bumpiness[0]) == (5, count_holes(board, column_tops(board)), 10)
+
+def test_depth_one_matches_autoplayer():
+    for seed in range(4):
+        state = _state_on(_random_board(seed))
+        placement, _ = search(state, depth=1)
+        expected, _ = best_placement(state)
+        assert placement.score == pytest.approx(expected.score)
+
+def test_search_keys_play_the_placement():
+    state = _state_on(_random_board(3))
+    placement, keys = search(state, depth=3)
+    for key in keys[:-1]:
+        state = handle_key_input(state, key)
+    cp = state["current_piece"]
+    assert (cp["shape"], cp["rotation"], cp["x"]) == (
+        placement.shape, placement.rotation, placement.x
+    )
+
+def test_cache_is_reused():
+    state = _state_on(_random_board(4))
+    cache = {}
+    first = search(state, depth=2, cache=cache)
+    assert cache
+    size = len(cache)
+    assert search(state, depth=2, cache=cache) == first
+    assert len(cache) == size
+
+def test_place_hashes_match_the_children():
+    board = _random_board(6)
+    for row in board:
+        row[-1] = 0                   # an open well, so an upright I clears a line
+    stacked = np.array([board], dtype=np.uint8)
+    hashes = np.array([board_hash(board)], dtype=np.uint64)
+    placements = list(reachable_placements("I", SPAWN_X, 0, 0, column_tops(board)))
+    rotation, x, y = np.array(placements).T
+    parents = np.zeros(len(placements), dtype=np.intp)
+    children, lines = place_all(stacked, parents, "I", rotation, x, y)
+    child_hashes = place_hashes(hashes, parents, "I", rotation, x, y, children, lines)
+    assert lines.any()
+    assert child_hashes.tolist() == [board_hash(child.tolist()) for child in children]
+
+def test_hashed_search_keys_the_cache_on_hashes():
+    state = _state_on(_random_board(4))
+    hashed = {**state, "board_hash": board_hash(state["board"])}
+    cache = {}
+    assert search(hashed, depth=3, cache=cache) == search(state, depth=3)
+    assert cache and all(isinstance(key[0], int) for key in cache)
+
+def test_cache_keeps_weights_apart():
+    state = _state_on(_random_board(7))
+    flat = {name: 0.0 for name in WEIGHTS}
+    holes_only = {**flat, "holes": -1.0}
+    cache = {}
+    search(state, depth=2, cache=cache)
+    assert search(state, depth=2, weights=holes_only, cache=cache) == search(
+        state, depth=2, weights=holes_only
+    )
+
+def test_unplaceable_piece_is_minus_infinity():
+    full = np.array([_random_board(0, rows=BOARD_HEIGHT)], dtype=np.uint8)
+    full[0] = 1
+    full[0, 0] = 0
+    assert line_values(full, ["O"])[0] == -np.inf
+
+def test_process_pool_gives_the_same_move():
+    state = _state_on(_random_board(5))
+    assert search(state, depth=2, workers=2) == search(state, depth=2, workers=1)
+    pool = lookahead._POOLS[2]
+    search(state, depth=2, workers=2)
+    assert lookahead._POOLS[2] is pool                 # reused, not rebuilt
+
+def test_lookahead_policy_plays():
+    result = simulate_game(2, policy="lookahead", max_ticks=60)
+    assert result["status"] == "running"
@@ -1,5 +1,5 @@
 import numpy as np
-from game.pieces import TETROMINOES
+from game.pieces import TETROMINOES, PIECE_TABLE
 from game.tetris_engine import get_piece_matrix
 
 def test_all_pieces_defined():
@@ -16,4 +16,32 @@ def test_i_piece_is_4x4():
 
 def test_rotation_returns_numpy_array():
     result = get_piece_matrix("T", rotation=1)
-    assert isinstance(result, np.ndarray)
\ No newline at end of file
+    assert isinstance(result, np.ndarray)
+
+def test_piece_table_has_four_rotations():
+    for name in TETROMINOES:
+        assert len(PIECE_TABLE[name]) == 4
+
+def test_piece_table_matches_rotated_matrix():
+    for name in TETROMINOES:
+        for rotation in range(4):
+            matrix = get_piece_matrix(name, rotation)
+            orientation = PIECE_TABLE[name][rotation]
+            expected = {(r, c) for r, c in zip(*np.nonzero(matrix))}
+            assert set(orientation.cells) == expected
+            assert (orientation.height, orientation.width) == matrix.shape
+
+def test_piece_table_bounding_box():
+    orientation = PIECE_TABLE["I"][1]   # vertical I sits in column 2
+    assert (orientation.min_col, orientation.max_col) == (2, 2)
+    assert (orientation.min_row, orientation.max_row) == (0, 3)
+
+def test_every_orientation_has_four_cells():
+    for rotations in PIECE_TABLE.values():
+        for orientation in rotations:
+            assert len(orientation.cells) == 4
+
+def test_piece_table_bottom_profile():
+    # T points up: the lowest cell of every column is on row 1
+    assert PIECE_TABLE["T"][0].bottom == ((0, 1), (1, 1), (2, 1))
+    assert PIECE_TABLE["I"][1].bottom == ((2, 3),)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from game.randomizer import PieceGenerator, SHAPES, mulberry32
+from game.tetris_engine import start_game, handle_key_input, upcoming_pieces
+
+
+def test_mulberry32_reference_values():
+    # first outputs of the reference JavaScript mulberry32(0)
+    state, first = mulberry32(0)
+    _, second = mulberry32(state)
+    assert (first, second) == (1144304738, 1416247)
+
+def test_same_seed_same_sequence():
+    a = PieceGenerator(seed=123)
+    b = PieceGenerator(seed=123)
+    assert [a.next() for _ in range(50)] == [b.next() for _ in range(50)]
+
+def test_different_seeds_differ():
+    a = PieceGenerator(seed=1)
+    b = PieceGenerator(seed=2)
+    assert [a.next() for _ in range(50)] != [b.next() for _ in range(50)]
+
+def test_bag_mode_deals_every_shape_per_seven():
+    generator = PieceGenerator(seed=5, mode="bag")
+    for _ in range(10):
+        assert sorted(generator.next() for _ in range(7)) == sorted(SHAPES)
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        PieceGenerator(seed=1, mode="nope")
+
+def test_lookahead_queue_matches_draws():
+    generator = PieceGenerator(seed=9, lookahead=4)
+    upcoming = generator.peek()
+    assert len(upcoming) == 4
+    assert [generator.next() for _ in range(4)] == upcoming
+
+def test_lookahead_does_not_change_sequence():
+    plain = PieceGenerator(seed=9)
+    queued = PieceGenerator(seed=9, lookahead=5)
+    assert [plain.next() for _ in range(30)] == [queued.next() for _ in range(30)]
+
+def test_round_trip_through_json():
+    generator = PieceGenerator(seed=77, mode="bag", lookahead=3)
+    generator.next()
+    restored = PieceGenerator.from_dict(json.loads(json.dumps(generator.to_dict())))
+    assert [restored.next() for _ in range(20)] == [generator.next() for _ in range(20)]
+
+def test_start_game_is_replayable_from_seed():
+    first = start_game(seed=42, mode="bag")
+    second = start_game(seed=42, mode="bag")
+    assert first == second
+    for _ in range(5):
+        first = handle_key_input(first, " ")
+        second = handle_key_input(second, " ")
+    assert first == second
+
+def test_upcoming_pieces_starts_with_next_piece():
+    state = start_game(seed=3, lookahead=2)
+    upcoming = upcoming_pieces(state)
+    assert upcoming[0] == state["next_piece"]
+    assert len(upcoming) == 3
+    state = handle_key_input(state, " ")
+    assert state["current_piece"]["shape"] == upcoming[0]
+    assert state["next_piece"] == upcoming[1]
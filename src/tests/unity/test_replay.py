@@ -0,0 +1,104 @@
+import io
+
+import pytest
+
+from game.replay import (
+    Replay, ReplayRecorder, decode_replay, encode_replay, iter_events,
+    read_varint, write_varint,
+)
+from game.simulator import simulate_game
+from game.tetris_engine import apply_game_tick, handle_key_input, start_game
+
+
+def _play(state, events):
+    for event in events:
+        state = apply_game_tick(state) if event is None else handle_key_input(state, event)
+    return state
+
+
+def _ticks_then_keys(n):
+    events = []
+    for i in range(n):
+        events += [None] * (i % 5) + ["ArrowLeft", "ArrowUp"] * (i % 2) + [" "]
+    return events
+
+
+# ── Encoding ──────────────────────────────────────────────────────────────────
+
+def test_varint_roundtrip():
+    buf = bytearray()
+    values = [0, 1, 127, 128, 300, 2**32 - 1]
+    for value in values:
+        write_varint(buf, value)
+    pos = 0
+    for value in values:
+        decoded, pos = read_varint(buf, pos)
+        assert decoded == value
+    assert pos == len(buf)
+
+def test_events_roundtrip():
+    events = [None, None, "ArrowLeft", "ArrowLeft", " ", None, "c"]
+    data = encode_replay(7, events, mode="bag", lookahead=2)
+    header, runs = decode_replay(data)
+    assert header == {"seed": 7, "mode": "bag", "lookahead": 2}
+    assert len(runs) == 5
+    assert list(iter_events(data)) == events
+
+def test_keys_without_action_are_dropped():
+    data = encode_replay(1, ["q", None, "Escape"])
+    assert list(iter_events(data)) == [None, "p"]
+
+def test_tick_runs_are_compact():
+    data = encode_replay(1, [None] * 1000)
+    header_size = len(encode_replay(1, []))
+    assert len(data) - header_size == 2
+
+def test_bad_magic_is_rejected():
+    with pytest.raises(ValueError):
+        decode_replay(b"JSON{}")
+
+def test_recorder_appends_to_stream():
+    stream = io.BytesIO()
+    recorder = ReplayRecorder(3, stream=stream)
+    recorder.tick()
+    recorder.flush()
+    first = stream.getvalue()
+    recorder.key(" ")
+    recorder.flush()
+    assert stream.getvalue().startswith(first)
+    assert stream.getvalue() == recorder.to_bytes()
+
+
+# ── Playback ──────────────────────────────────────────────────────────────────
+
+def test_replay_reproduces_simulated_game():
+    result = simulate_game(5, policy="hard_drop", max_ticks=400, record=True)
+    final = Replay(result["replay"]).final_state()
+    assert final["score"] == result["score"]
+    assert final["lines_cleared"] == result["lines"]
+    assert final["tick"] == result["ticks"]
+
+def test_seek_matches_direct_play():
+    events = _ticks_then_keys(120)
+    data = encode_replay(11, events)
+    replay = Replay(data, snapshot_every=16)
+    for tick in (0, 1, 40, 17, 230, 16):
+        played, seen = start_game(seed=11), 0
+        for i, event in enumerate(events):
+            if seen == tick:
+                break
+            played = _play(played, [event])
+            seen += event is None
+        assert replay.seek(tick) == played
+
+def test_seek_keeps_snapshots():
+    data = encode_replay(2, [None] * 100)
+    replay = Replay(data, snapshot_every=10)
+    replay.seek(95)
+    assert [s[0] for s in replay.snapshots] == list(range(0, 100, 10))
+    assert replay.seek(30) == replay.snapshots[3][3]
+
+def test_seek_out_of_range():
+    replay = Replay(encode_replay(2, [None] * 3))
+    with pytest.raises(ValueError):
+        replay.seek(4)
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from game.constants import STATE_OVER
+from game.simulator import simulate_game, run_batch, POLICIES
+
+
+def _without_wall_time(results):
+    return [{k: v for k, v in r.items() if k != "wall_time"} for r in results]
+
+
+def test_same_seed_gives_same_game():
+    first = simulate_game(42, policy="random", max_ticks=500)
+    second = simulate_game(42, policy="random", max_ticks=500)
+    first.pop("wall_time")
+    second.pop("wall_time")
+    assert first == second
+
+def test_summary_fields():
+    result = simulate_game(1, policy="hard_drop", max_ticks=300)
+    assert set(result) == {"seed", "score", "lines", "level", "ticks", "status", "wall_time"}
+    assert result["ticks"] > 0
+
+def test_idle_game_ends_in_game_over():
+    result = simulate_game(3, policy="idle", max_ticks=10_000)
+    assert result["status"] == STATE_OVER
+
+def test_max_ticks_caps_the_game():
+    result = simulate_game(3, policy="idle", max_ticks=10)
+    assert result["ticks"] == 10
+
+def test_script_drives_the_game():
+    result = simulate_game(5, script=[["ArrowLeft"], [" "], []])
+    assert result["ticks"] == 3
+
+def test_simulation_does_not_touch_global_rng():
+    random.seed(9)
+    expected = random.random()
+    random.seed(9)
+    simulate_game(1, policy="idle", max_ticks=50)
+    assert random.random() == expected
+
+def test_bag_mode_game_is_deterministic():
+    first = simulate_game(8, policy="hard_drop", max_ticks=300, mode="bag")
+    second = simulate_game(8, policy="hard_drop", max_ticks=300, mode="bag")
+    assert first["score"] == second["score"]
+    assert first["ticks"] == second["ticks"]
+
+def test_unknown_policy_raises():
+    with pytest.raises(ValueError) as err:
+        simulate_game(1, policy="nope")
+    assert err.value.__suppress_context__          # no KeyError chained in
+
+def test_all_policies_registered():
+    assert {"idle", "random", "hard_drop"} <= set(POLICIES)
+
+def test_batch_matches_single_games():
+    results = run_batch(range(4), policy="hard_drop", max_ticks=200, workers=1)
+    assert [r["seed"] for r in results] == [0, 1, 2, 3]
+    single = simulate_game(2, policy="hard_drop", max_ticks=200)
+    assert results[2]["score"] == single["score"]
+    assert results[2]["ticks"] == single["ticks"]
+
+def test_batch_in_process_pool_is_deterministic():
+    pooled = run_batch(range(4), policy="hard_drop", max_ticks=200, workers=2)
+    local = run_batch(range(4), policy="hard_drop", max_ticks=200, workers=1)
+    assert _without_wall_time(pooled) == _without_wall_time(local)
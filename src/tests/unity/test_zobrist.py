@@ -0,0 +1,88 @@
+import json
+import random
+
+from game.autoplayer import choose_keys
+from game.constants import BOARD_HEIGHT, BOARD_WIDTH, KEY_ACTIONS
+from game.tetris_engine import handle_key_input, apply_game_tick, remove_rows, start_game
+from game.zobrist import (
+    CELL_KEYS, TranspositionTable, board_hash, clear_hash, piece_hash, state_hash,
+)
+
+
+def _play(state, steps, seed, keys):
+    rng = random.Random(seed)
+    for _ in range(steps):
+        state = handle_key_input(state, rng.choice(keys))
+        state = apply_game_tick(state)
+        yield state
+
+
+def test_keys_fit_in_53_bits():
+    assert all(
+        key < 2**53 for row in CELL_KEYS for col in row for key in col
+    )
+
+def test_empty_board_hashes_to_zero():
+    assert start_game(seed=1, hashing=True)["board_hash"] == 0
+
+def test_hashing_is_off_by_default():
+    assert start_game(seed=1)["board_hash"] is None
+
+def test_incremental_hash_matches_full_rehash():
+    keys = [k for k, a in KEY_ACTIONS.items() if a != "pause"]
+    for state in _play(start_game(seed=3, hashing=True), 300, 3, keys):
+        assert state["board_hash"] == board_hash(state["board"])
+
+def test_incremental_hash_survives_line_clears():
+    state = start_game(seed=5, hashing=True)
+    for _ in range(150):
+        for key in choose_keys(state):    # the autoplayer clears lines
+            state = handle_key_input(state, key)
+        state = apply_game_tick(state)
+        assert state["board_hash"] == board_hash(state["board"])
+    assert state["lines_cleared"] > 0
+
+def test_clear_hash_rekeys_only_the_rows_that_move():
+    rng = random.Random(4)
+    board = [[rng.choice((0, 0, 1, 3)) for _ in range(BOARD_WIDTH)]
+             for _ in range(BOARD_HEIGHT)]
+    board[3] = [0] * BOARD_WIDTH
+    full = [BOARD_HEIGHT - 6, BOARD_HEIGHT - 3]
+    for r in full:
+        board[r] = [2] * BOARD_WIDTH
+    h = clear_hash(board_hash(board), board, full)
+    assert h == board_hash(remove_rows([list(row) for row in board], full))
+
+def test_state_hash_tracks_the_piece():
+    state = start_game(seed=2, hashing=True)
+    moved = handle_key_input(state, "ArrowLeft")
+    assert state_hash(moved) != state_hash(state)
+    back = handle_key_input(moved, "ArrowRight")
+    assert state_hash(back) == state_hash(state)
+    assert state_hash(dict(state, board_hash=None)) == state_hash(state)
+    assert piece_hash(state["current_piece"]) == state_hash(state)
+
+def test_hash_survives_json_round_trip():
+    state = next(_play(start_game(seed=7, hashing=True), 40, 7, [" "]))
+    assert json.loads(json.dumps(state))["board_hash"] == state["board_hash"]
+
+
+# ── TranspositionTable ────────────────────────────────────────────────────────
+
+def test_table_counts_hits_and_misses():
+    table = TranspositionTable()
+    assert table.get(1) is None
+    table[1] = "a"
+    assert table.get(1) == "a"
+    assert table.stats() == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+def test_table_evicts_least_recently_used():
+    table = TranspositionTable(max_entries=2)
+    table.put("a", 1)
+    table.put("b", 2)
+    table.get("a")
+    table.put("c", 3)
+    assert "a" in table and "c" in table and "b" not in table
+    assert len(table) == 2
+    table.clear()
+    assert len(table) == 0 and table.hits == 0
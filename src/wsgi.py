@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production serving (see server/serving.py). From src/:
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+"""
+from app import app
+from server.serving import check_serving_config
+
+check_serving_config()
+server = app.server